@@ -14,7 +14,7 @@ import logging
 import os
 import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union, Any
 import uuid
 
 import numpy as np
@@ -22,6 +22,19 @@ import pandas as pd
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from config import CommunityAnalysisConfig, CommunityCatalystConfig, RecommendationConfig
+from connection_graph import ConnectionGraph
+from encoding_pool import EncodingPool
+from feedback_store import RecommendationFeedbackStore
+from group_formation import form_balanced_groups
+from field_embeddings import FieldEmbeddingCache, FieldEmbeddingEngine
+from interest_stats import InterestStatistics
+from profile_dedup import ProfileDeduplicator
+from reranker import CrossEncoderReranker
+
+if TYPE_CHECKING:
+    from incremental_topk import IncrementalTopKIndex
+
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +50,8 @@ class UserProfile:
     project_history: List[Dict[str, Any]]
     consent_status: str = "opted_out"
     
-    def to_profile_text(self) -> str:
-        """Convert profile to text suitable for embedding."""
+    def field_texts(self) -> Dict[str, str]:
+        """Return the text of each embeddable profile field, keyed by field name."""
         # Extract project descriptions from history
         project_descriptions = []
         if self.project_history:
@@ -49,17 +62,23 @@ class UserProfile:
                         project_descriptions.append(str(desc))
         
         # Clean and format text components
-        skills_text = ', '.join(self.skills) if self.skills else ''
-        interests_text = ', '.join(self.interests) if self.interests else ''
-        projects_text = '. '.join(project_descriptions)
-        about_text = self.about_me or ''
+        return {
+            'skills': ', '.join(self.skills) if self.skills else '',
+            'interests': ', '.join(self.interests) if self.interests else '',
+            'projects': '. '.join(project_descriptions),
+            'about': self.about_me or ''
+        }
+    
+    def to_profile_text(self) -> str:
+        """Convert profile to text suitable for embedding."""
+        fields = self.field_texts()
         
         # Combine with clear structure
         profile_text = f"""
-        Skills: {skills_text}
-        Interests: {interests_text}
-        Projects: {projects_text}
-        About: {about_text}
+        Skills: {fields['skills']}
+        Interests: {fields['interests']}
+        Projects: {fields['projects']}
+        About: {fields['about']}
         """.strip()
         
         return profile_text
@@ -92,14 +111,29 @@ class ConnectionRecommendation:
 class ProfileEmbeddingEngine:
     """Handles user profile text embedding using SentenceTransformers."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2",
+                 encoding_workers: int = 0,
+                 threads_per_worker: Optional[int] = None,
+                 parallel_min_batch: int = 2000,
+                 encoding_pool: Optional[EncodingPool] = None):
         """Initialize with specified embedding model.
         
         Args:
             model_name: HuggingFace model name for SentenceTransformers
+            encoding_workers: Worker processes for large batches
+                (0 = encode in-process, -1 = calibrate on the first large batch)
+            threads_per_worker: Intra-op threads per worker (default: cores // workers)
+            parallel_min_batch: Smallest batch sent to the encoding pool
+            encoding_pool: Pre-started pool to use instead of creating one
+                (owned by the caller; close() only stops a pool this engine started)
         """
         self.model_name = model_name
         self.model = None
+        self.encoding_workers = encoding_workers
+        self.threads_per_worker = threads_per_worker
+        self.parallel_min_batch = parallel_min_batch
+        self.encoding_pool = encoding_pool
+        self._owns_pool = False
         self._load_model()
     
     def _load_model(self):
@@ -147,6 +181,53 @@ class ProfileEmbeddingEngine:
             # Return zero vector on error
             return np.zeros(self.get_embedding_dimension())
     
+    def _get_encoding_pool(self, texts: List[str]) -> Optional[EncodingPool]:
+        """Return the worker pool for a batch this large, starting it on first use."""
+        if len(texts) < self.parallel_min_batch:
+            return None
+        if self.encoding_pool is None and self.encoding_workers != 0:
+            if self.encoding_workers < 0:
+                self.encoding_pool, report = EncodingPool.auto(texts[:256], model_name=self.model_name)
+                logger.info(f"Encoding pool calibration: {report}")
+            else:
+                self.encoding_pool = EncodingPool(self.model_name, num_workers=self.encoding_workers,
+                                                  threads_per_worker=self.threads_per_worker)
+            self._owns_pool = True
+        return self.encoding_pool
+    
+    def close(self) -> None:
+        """Stop the encoding pool if this engine started it."""
+        if self._owns_pool and self.encoding_pool is not None:
+            self.encoding_pool.close()
+            self.encoding_pool = None
+            self._owns_pool = False
+    
+    def __enter__(self) -> 'ProfileEmbeddingEngine':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode raw texts in one batch.
+        
+        Large batches are split across the encoding pool when one is configured.
+        
+        Args:
+            texts: Texts to encode
+            
+        Returns:
+            (len(texts), dim) array of embeddings
+        """
+        if not self.model:
+            self._load_model()
+        if not texts:
+            return np.zeros((0, self.get_embedding_dimension()))
+        pool = self._get_encoding_pool(texts)
+        if pool is not None:
+            return pool.encode(texts)
+        return self.model.encode(texts, convert_to_numpy=True)
+    
     def create_embeddings_batch(self, user_profiles: List[UserProfile]) -> List[np.ndarray]:
         """Create embeddings for a batch of user profiles.
         
@@ -162,7 +243,7 @@ class ProfileEmbeddingEngine:
         profile_texts = [profile.to_profile_text() for profile in user_profiles]
         
         try:
-            embeddings = self.model.encode(profile_texts, convert_to_numpy=True)
+            embeddings = self.encode_texts(profile_texts)
             logger.info(f"Created embeddings for {len(user_profiles)} profiles")
             return [embedding for embedding in embeddings]
         except Exception as e:
@@ -232,9 +313,69 @@ class SimilarityEngine:
 class RecommendationEngine:
     """Main engine for generating connection recommendations."""
     
-    def __init__(self, embedding_engine: ProfileEmbeddingEngine):
-        """Initialize with an embedding engine."""
+    def __init__(self, embedding_engine: ProfileEmbeddingEngine,
+                 config: Optional[RecommendationConfig] = None,
+                 connection_graph: Optional[ConnectionGraph] = None,
+                 feedback_store: Optional[RecommendationFeedbackStore] = None,
+                 deduplicator: Optional[ProfileDeduplicator] = None,
+                 field_embedding_engine: Optional[FieldEmbeddingEngine] = None,
+                 reranker: Optional[CrossEncoderReranker] = None):
+        """Initialize with an embedding engine.
+        
+        Args:
+            embedding_engine: Engine used to embed profiles
+            config: Recommendation settings (scoring weights etc.)
+            connection_graph: Accepted connections used for the network score
+            feedback_store: Feedback history used to suppress already-seen pairs
+            deduplicator: Near-duplicate detector applied to batch targets
+            field_embedding_engine: Per-field embeddings used instead of whole-profile ones
+            reranker: Cross-encoder applied to the top bi-encoder candidates
+        """
         self.embedding_engine = embedding_engine
+        self.config = config or RecommendationConfig()
+        self.connection_graph = connection_graph
+        self.feedback_store = feedback_store
+        if deduplicator is None and self.config.deduplicate_targets:
+            deduplicator = ProfileDeduplicator(threshold=self.config.near_duplicate_threshold,
+                                               min_shingles=self.config.near_duplicate_min_shingles)
+        self.deduplicator = deduplicator
+        self.field_embedding_engine = field_embedding_engine
+        self.reranker = reranker
+    
+    def _network_scoring_enabled(self) -> bool:
+        """Whether network scores should be blended into similarity scores."""
+        return self.connection_graph is not None and self.config.network_weight > 0
+    
+    def _score_targets(self,
+                       source_profile: UserProfile,
+                       content_scores: np.ndarray,
+                       target_user_ids: List[str],
+                       top_n: int) -> List[Tuple[str, float]]:
+        """Rank targets by content similarity, blended with the network score if enabled.
+        
+        Args:
+            source_profile: Profile of the user receiving recommendations
+            content_scores: Content similarity per target (0.0 to 1.0)
+            target_user_ids: discord_user_ids aligned with content_scores
+            top_n: Number of top matches to return
+            
+        Returns:
+            List of (discord_user_id, score) tuples, sorted by score desc
+        """
+        scores = np.asarray(content_scores, dtype=float)
+        if self._network_scoring_enabled():
+            network_scores = self.connection_graph.network_scores(
+                source_profile.discord_user_id, target_user_ids
+            )
+            content_weight = self.config.content_weight
+            network_weight = self.config.network_weight
+            scores = (content_weight * scores + network_weight * network_scores) / (
+                content_weight + network_weight
+            )
+        
+        user_scores = [(user_id, float(score)) for user_id, score in zip(target_user_ids, scores)]
+        user_scores.sort(key=lambda x: x[1], reverse=True)
+        return user_scores[:top_n]
     
     def _generate_recommendation_reason(self, 
                                       source_profile: UserProfile,
@@ -270,6 +411,14 @@ class RecommendationEngine:
             interests_text = ', '.join(sorted(common_interests)[:3])  # Top 3
             reasons.append(f"mutual interest in {interests_text}")
         
+        # Find shared connections
+        if self._network_scoring_enabled():
+            shared = int(self.connection_graph.shared_connection_counts(
+                source_profile.discord_user_id, [target_profile.discord_user_id]
+            )[0])
+            if shared:
+                reasons.append(f"{shared} shared connection{'s' if shared != 1 else ''}")
+        
         # Find complementary skills (source lacks, target has)
         complementary_skills = target_skills - source_skills
         if complementary_skills:
@@ -312,13 +461,20 @@ class RecommendationEngine:
         target_interests = set(interest.lower() for interest in target_profile.interests)
         common_interests = list(source_interests.intersection(target_interests))
         
-        return {
+        explanations = {
             'similarity_score': float(similarity_score),
             'common_skills': common_skills[:5],  # Top 5
             'complementary_skills': complementary_skills[:5],  # Top 5
             'common_interests': common_interests[:5],  # Top 5
             'recommendation_strength': 'high' if similarity_score > 0.7 else 'medium' if similarity_score > 0.4 else 'low'
         }
+        
+        if self._network_scoring_enabled():
+            explanations['shared_connections'] = int(self.connection_graph.shared_connection_counts(
+                source_profile.discord_user_id, [target_profile.discord_user_id]
+            )[0])
+        
+        return explanations
     
     def generate_recommendations_for_user(self,
                                         source_profile: UserProfile,
@@ -337,6 +493,7 @@ class RecommendationEngine:
             
         Returns:
             List of ConnectionRecommendation objects, sorted by similarity desc
+            (by cross-encoder score for re-ranked candidates)
         """
         if not target_profiles:
             logger.warning(f"No target profiles provided for user {source_profile.discord_user_id}")
@@ -349,24 +506,46 @@ class RecommendationEngine:
         opted_in_targets = [p for p in opted_in_targets 
                            if p.discord_user_id != source_profile.discord_user_id]
         
+        # Filter out pairs already shown, accepted or dismissed (Bloom filter lookup)
+        if self.feedback_store is not None:
+            opted_in_targets = [p for p in opted_in_targets
+                               if not self.feedback_store.has_seen(source_profile.discord_user_id,
+                                                                   p.discord_user_id)]
+        
         if not opted_in_targets:
             logger.info(f"No valid target profiles for user {source_profile.discord_user_id}")
             return []
         
-        # Generate embeddings
-        source_embedding = self.embedding_engine.create_user_embedding(source_profile)
-        target_embeddings = self.embedding_engine.create_embeddings_batch(opted_in_targets)
         target_user_ids = [p.discord_user_id for p in opted_in_targets]
         
+        # Content similarity: weighted per-field fusion, or one whole-profile embedding
+        if self.field_embedding_engine is not None:
+            content_scores = np.clip(
+                self.field_embedding_engine.similarity([source_profile], opted_in_targets)[0], 0.0, 1.0
+            )
+        else:
+            source_embedding = self.embedding_engine.create_user_embedding(source_profile)
+            target_embeddings = self.embedding_engine.create_embeddings_batch(opted_in_targets)
+            content_scores = SimilarityEngine.cosine_similarity_scores(source_embedding, target_embeddings)
+        
         # Find similar users
-        similar_users = SimilarityEngine.find_top_similar(
-            source_embedding, target_embeddings, target_user_ids, top_n * 2  # Get more for filtering
+        candidate_count = top_n * 2  # Get more for filtering
+        if self.reranker is not None:
+            candidate_count = max(candidate_count, self.reranker.top_m)
+        similar_users = self._score_targets(
+            source_profile, content_scores, target_user_ids, candidate_count
         )
         
         # Create recommendations
         recommendations = []
         target_profile_map = {p.discord_user_id: p for p in opted_in_targets}
         
+        # Second stage: re-order the top candidates with the cross-encoder
+        rerank_scores: Dict[str, float] = {}
+        if self.reranker is not None:
+            similar_users = [c for c in similar_users if c[1] >= min_similarity]
+            similar_users, rerank_scores = self.reranker.rerank(source_profile, similar_users, target_profile_map)
+        
         for target_user_id, similarity_score in similar_users:
             if similarity_score < min_similarity:
                 continue
@@ -376,6 +555,8 @@ class RecommendationEngine:
             # Generate reason and explanations
             reason = self._generate_recommendation_reason(source_profile, target_profile, similarity_score)
             explanations = self._create_explanations(source_profile, target_profile, similarity_score)
+            if target_user_id in rerank_scores:
+                explanations['rerank_score'] = rerank_scores[target_user_id]
             
             recommendation = ConnectionRecommendation(
                 source_discord_user_id=source_profile.discord_user_id,
@@ -395,6 +576,48 @@ class RecommendationEngine:
         logger.info(f"Generated {len(recommendations)} recommendations for user {source_profile.discord_user_id}")
         return recommendations
     
+    def generate_recommendations_from_index(self,
+                                            index: 'IncrementalTopKIndex',
+                                            user_id: str,
+                                            top_n: Optional[int] = None,
+                                            min_similarity: float = 0.1,
+                                            campaign_id: Optional[str] = None) -> List[ConnectionRecommendation]:
+        """Build recommendations from an IncrementalTopKIndex's precomputed lists.
+        
+        Args:
+            index: Index holding up-to-date top-k lists and profiles
+            user_id: discord_user_id of the user receiving recommendations
+            top_n: Maximum number of recommendations (defaults to the index k)
+            min_similarity: Minimum similarity score threshold
+            campaign_id: Optional campaign identifier for grouping
+            
+        Returns:
+            List of ConnectionRecommendation objects, sorted by similarity desc
+        """
+        source_profile = index.profiles.get(user_id)
+        if source_profile is None:
+            logger.warning(f"No indexed profile for user {user_id}")
+            return []
+        
+        recommendations = []
+        for target_user_id, similarity_score in index.top_k(user_id)[:top_n or index.k]:
+            target_profile = index.profiles.get(target_user_id)
+            if target_profile is None or similarity_score < min_similarity:
+                continue
+            if self.feedback_store is not None and self.feedback_store.has_seen(user_id, target_user_id):
+                continue
+            
+            recommendations.append(ConnectionRecommendation(
+                source_discord_user_id=user_id,
+                target_discord_user_id=target_user_id,
+                similarity_score=similarity_score,
+                recommendation_reason=self._generate_recommendation_reason(source_profile, target_profile, similarity_score),
+                explanations=self._create_explanations(source_profile, target_profile, similarity_score),
+                guild_id=source_profile.guild_id,
+                campaign_id=campaign_id
+            ))
+        return recommendations
+    
     def generate_recommendations_batch(self,
                                      source_profiles: List[UserProfile],
                                      target_profiles: List[UserProfile],
@@ -416,6 +639,14 @@ class RecommendationEngine:
         if not campaign_id:
             campaign_id = str(uuid.uuid4())
         
+        # Collapse near-duplicate targets before any embedding or scoring work
+        if self.deduplicator is not None:
+            opted_in_targets = [p for p in target_profiles if p.consent_status == "opted_in"]
+            dedup = self.deduplicator.find_duplicates(opted_in_targets, collapse=True)
+            target_profiles = dedup.profiles
+            logger.info(f"Collapsed {dedup.stats['duplicates']} near-duplicate target profiles "
+                        f"({dedup.stats['work_saved_fraction']:.1%} of embedding work saved)")
+        
         all_recommendations = []
         
         for source_profile in source_profiles:
@@ -433,6 +664,10 @@ class RecommendationEngine:
             
             all_recommendations.extend(user_recs)
         
+        if self.feedback_store is not None and all_recommendations:
+            self.feedback_store.record_shown(all_recommendations)
+            self.feedback_store.save()
+        
         logger.info(f"Generated {len(all_recommendations)} total recommendations for {len(source_profiles)} users")
         return all_recommendations
 
@@ -442,16 +677,29 @@ class CommunityAnalyzer:
     
     @staticmethod
     def identify_interest_clusters(profiles: List[UserProfile], 
-                                 min_cluster_size: int = 3) -> List[Dict[str, Any]]:
+                                 min_cluster_size: int = 3,
+                                 interest_stats: Optional[InterestStatistics] = None) -> List[Dict[str, Any]]:
         """Identify clusters of users with similar interests for group activities.
         
         Args:
-            profiles: List of user profiles to analyze
+            profiles: List of user profiles to analyze (ignored if interest_stats is given)
             min_cluster_size: Minimum number of users required for a cluster
+            interest_stats: Incrementally maintained statistics to answer from
+                instead of recounting (returns at most its capacity clusters)
             
         Returns:
             List of cluster dictionaries with user lists and common interests
         """
+        if interest_stats is not None:
+            clusters = []
+            for interest, estimate in interest_stats.top_interests():
+                users = interest_stats.members(interest) if interest_stats.track_members else []
+                size = len(users) if interest_stats.track_members else estimate
+                if size >= min_cluster_size:
+                    clusters.append({'interest': interest, 'users': users, 'size': size, 'type': 'interest_based'})
+            clusters.sort(key=lambda x: x['size'], reverse=True)
+            return clusters
+        
         # Count interest frequencies
         interest_to_users = {}
         for profile in profiles:
@@ -481,26 +729,32 @@ class CommunityAnalyzer:
         return clusters
     
     @staticmethod
-    def suggest_meetup_topics(profiles: List[UserProfile]) -> List[str]:
+    def suggest_meetup_topics(profiles: List[UserProfile],
+                              interest_stats: Optional[InterestStatistics] = None) -> List[str]:
         """Suggest topics for community meetups based on popular interests.
         
         Args:
-            profiles: List of user profiles to analyze
+            profiles: List of user profiles to analyze (ignored if interest_stats is given)
+            interest_stats: Incrementally maintained statistics to answer from
+                instead of recounting
             
         Returns:
             List of suggested meetup topics
         """
-        opted_in_profiles = [p for p in profiles if p.consent_status == "opted_in"]
-        
-        # Count all interests
-        interest_counts = {}
-        for profile in opted_in_profiles:
-            for interest in profile.interests:
-                interest_lower = interest.lower().strip()
-                interest_counts[interest_lower] = interest_counts.get(interest_lower, 0) + 1
-        
-        # Sort by popularity and format as meetup topics
-        popular_interests = sorted(interest_counts.items(), key=lambda x: x[1], reverse=True)
+        if interest_stats is not None:
+            popular_interests = interest_stats.top_interests(10)
+        else:
+            opted_in_profiles = [p for p in profiles if p.consent_status == "opted_in"]
+            
+            # Count all interests
+            interest_counts = {}
+            for profile in opted_in_profiles:
+                for interest in profile.interests:
+                    interest_lower = interest.lower().strip()
+                    interest_counts[interest_lower] = interest_counts.get(interest_lower, 0) + 1
+            
+            # Sort by popularity and format as meetup topics
+            popular_interests = sorted(interest_counts.items(), key=lambda x: x[1], reverse=True)
         
         topics = []
         for interest, count in popular_interests[:10]:  # Top 10
@@ -510,20 +764,129 @@ class CommunityAnalyzer:
                 topics.append(topic)
         
         return topics
+    
+    @staticmethod
+    def form_balanced_groups(profiles: List[UserProfile],
+                             group_size: Optional[int] = None,
+                             embeddings: Optional[np.ndarray] = None,
+                             embedding_engine: Optional[ProfileEmbeddingEngine] = None,
+                             time_limit_seconds: Optional[float] = None,
+                             seed: int = 0,
+                             config: Optional[CommunityAnalysisConfig] = None) -> List[Dict[str, Any]]:
+        """Split opted-in members into similar-minded groups of about group_size.
+        
+        Args:
+            profiles: List of user profiles to group
+            group_size: Target group size, sizes differ by at most one
+                (default: config.study_group_size)
+            embeddings: Cached embeddings aligned with profiles (e.g. GuildData.embeddings)
+            embedding_engine: Used to embed the profiles when embeddings are not given
+            time_limit_seconds: Time limit for improving the initial partition
+                (default: config.group_formation_time_limit_seconds)
+            seed: Random seed for reproducible groups
+            config: Community analysis settings supplying the defaults
+            
+        Returns:
+            List of group dictionaries with user lists, cohesion and shared interests
+        """
+        config = config or CommunityAnalysisConfig()
+        if group_size is None:
+            group_size = config.study_group_size
+        if time_limit_seconds is None:
+            time_limit_seconds = config.group_formation_time_limit_seconds
+        
+        keep = [i for i, p in enumerate(profiles) if p.consent_status == "opted_in"]
+        if not keep:
+            return []
+        members = [profiles[i] for i in keep]
+        if embeddings is not None:
+            member_embeddings = np.asarray(embeddings)[keep]
+        elif embedding_engine is not None:
+            member_embeddings = np.vstack(embedding_engine.create_embeddings_batch(members))
+        else:
+            raise ValueError("form_balanced_groups needs embeddings or an embedding_engine")
+        
+        result = form_balanced_groups(member_embeddings, group_size,
+                                      time_limit_seconds=time_limit_seconds, seed=seed)
+        
+        groups = []
+        for group_id, (rows, cohesion) in enumerate(zip(result['groups'], result['cohesion'])):
+            interest_counts = {}
+            for row in rows:
+                for interest in {i.lower().strip() for i in members[row].interests}:
+                    interest_counts[interest] = interest_counts.get(interest, 0) + 1
+            shared = sorted((i for i, c in interest_counts.items() if c >= 2),
+                            key=lambda i: interest_counts[i], reverse=True)
+            groups.append({
+                'group_id': group_id,
+                'users': [members[row].discord_user_id for row in rows],
+                'size': len(rows),
+                'cohesion': cohesion,
+                'shared_interests': shared[:5],
+                'type': 'balanced_group'
+            })
+        
+        logger.info(f"Formed {len(groups)} balanced groups of ~{group_size} from {len(members)} members")
+        return groups
 
 
 # Convenience factory function
-def create_community_catalyst_engine(model_name: str = "all-MiniLM-L6-v2") -> RecommendationEngine:
+def create_community_catalyst_engine(model_name: str = "all-MiniLM-L6-v2",
+                                     config: Optional[RecommendationConfig] = None,
+                                     connection_graph: Optional[ConnectionGraph] = None,
+                                     feedback_store: Optional[RecommendationFeedbackStore] = None) -> RecommendationEngine:
     """Create a fully configured CommunityCatalyst recommendation engine.
     
     Args:
         model_name: SentenceTransformer model name to use for embeddings
+        config: Optional recommendation settings (defaults to RecommendationConfig())
+        connection_graph: Optional graph of accepted connections for network scoring
+        feedback_store: Optional feedback store for suppressing already-seen pairs
         
     Returns:
         Configured RecommendationEngine instance
     """
     embedding_engine = ProfileEmbeddingEngine(model_name=model_name)
-    return RecommendationEngine(embedding_engine)
+    return RecommendationEngine(embedding_engine, config=config, connection_graph=connection_graph,
+                                feedback_store=feedback_store)
+
+
+def create_community_catalyst_engine_from_config(config: CommunityCatalystConfig,
+                                                 connection_graph: Optional[ConnectionGraph] = None,
+                                                 feedback_store: Optional[RecommendationFeedbackStore] = None) -> RecommendationEngine:
+    """Create a recommendation engine wired from a CommunityCatalystConfig.
+    
+    Args:
+        config: Full configuration (embedding model, field weights, recommendation and re-ranking settings)
+        connection_graph: Optional graph of accepted connections for network scoring
+        feedback_store: Optional feedback store for suppressing already-seen pairs
+        
+    Returns:
+        Configured RecommendationEngine instance
+    """
+    embedding_engine = ProfileEmbeddingEngine(
+        model_name=config.embedding.model_name,
+        encoding_workers=config.embedding.encoding_workers,
+        threads_per_worker=config.embedding.threads_per_worker,
+        parallel_min_batch=config.embedding.parallel_min_batch
+    )
+    field_embedding_engine = None
+    if config.embedding.use_field_embeddings:
+        field_embedding_engine = FieldEmbeddingEngine(
+            embedding_engine,
+            field_weights=config.embedding.field_weights,
+            cache=FieldEmbeddingCache(max_entries=config.embedding.field_cache_size)
+        )
+    reranker = None
+    if config.recommendation.rerank_enabled:
+        reranker = CrossEncoderReranker(
+            model_name=config.recommendation.rerank_model,
+            top_m=config.recommendation.rerank_top_m,
+            latency_budget_ms=config.recommendation.rerank_latency_budget_ms
+        )
+    return RecommendationEngine(embedding_engine, config=config.recommendation,
+                                connection_graph=connection_graph, feedback_store=feedback_store,
+                                field_embedding_engine=field_embedding_engine, reranker=reranker)
 
 
 # Configuration helpers
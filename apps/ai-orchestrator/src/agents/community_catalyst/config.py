@@ -6,11 +6,28 @@ Provides centralized configuration management for embedding models,
 similarity thresholds, and other AI engine parameters.
 """
 
+import json
 import os
-from dataclasses import dataclass
+import warnings
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 
 
+DEFAULT_FIELD_WEIGHTS = {'skills': 1.0, 'interests': 1.0, 'projects': 0.5, 'about': 0.5}
+
+
+def parse_field_weights(value: Optional[str]) -> Dict[str, float]:
+    """Parse 'skills=1.0,interests=0.5' into a field weight dictionary."""
+    if not value:
+        return dict(DEFAULT_FIELD_WEIGHTS)
+    weights = {}
+    for item in value.split(','):
+        if item.strip():
+            name, _, weight = item.partition('=')
+            weights[name.strip()] = float(weight)
+    return weights
+
+
 @dataclass
 class EmbeddingConfig:
     """Configuration for embedding generation."""
@@ -18,6 +35,20 @@ class EmbeddingConfig:
     batch_size: int = 32
     normalize_embeddings: bool = True
     device: Optional[str] = None  # None = auto-detect
+    
+    # Latency budget per profile (ms) checked against model_benchmark.py results
+    latency_budget_ms: Optional[float] = None
+    benchmark_results_path: Optional[str] = None
+    
+    # Per-field embeddings with weighted late fusion (see field_embeddings.py)
+    use_field_embeddings: bool = False
+    field_weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_FIELD_WEIGHTS))
+    field_cache_size: int = 100000
+    
+    # Multi-process CPU encoding (see encoding_pool.py)
+    encoding_workers: int = 0  # 0 = in-process, -1 = auto-calibrate
+    threads_per_worker: Optional[int] = None  # None = cores // workers
+    parallel_min_batch: int = 2000
 
 
 @dataclass
@@ -32,10 +63,21 @@ class RecommendationConfig:
     require_opt_in: bool = True
     exclude_same_user: bool = True
     
+    # Near-duplicate target collapsing (see profile_dedup.py)
+    deduplicate_targets: bool = False
+    near_duplicate_threshold: float = 0.8
+    near_duplicate_min_shingles: int = 8
+    
+    # Cross-encoder re-ranking of the top bi-encoder candidates (see reranker.py)
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_top_m: int = 20
+    rerank_latency_budget_ms: float = 50.0  # per user
+    
     # Scoring weights (for future hybrid approaches)
     content_weight: float = 1.0
     collaborative_weight: float = 0.0  # Not implemented in MVP
-    network_weight: float = 0.0  # Not implemented in MVP
+    network_weight: float = 0.0  # Shared-connection score, see connection_graph.py
 
 
 @dataclass
@@ -45,6 +87,43 @@ class CommunityAnalysisConfig:
     max_clusters_per_analysis: int = 20
     meetup_topic_min_participants: int = 2
     max_suggested_topics: int = 10
+    
+    # Streaming interest statistics (see interest_stats.py)
+    interest_sketch_width: int = 2048
+    interest_sketch_depth: int = 4
+    trending_window_hours: Optional[float] = None  # None = no windowed counts
+    
+    # Balanced group formation (see group_formation.py)
+    study_group_size: int = 5
+    group_formation_time_limit_seconds: float = 5.0
+
+
+@dataclass
+class DeliveryConfig:
+    """Configuration for recommendation delivery (see delivery_dispatcher.py)."""
+    rate_per_second: float = 5.0
+    burst: int = 5
+    max_concurrency: int = 4
+    max_attempts: int = 5
+    max_throttled_attempts: int = 50  # 429 retries, counted separately from max_attempts
+    base_backoff_seconds: float = 1.0
+
+
+@dataclass
+class SchedulerConfig:
+    """Configuration for guild refresh jobs (see guild_scheduler.py)."""
+    refresh_cadence_minutes: float = 60.0
+    cpu_budget_seconds: float = 30.0  # CPU time per run_pending call
+    activity_weight: float = 1.0
+    change_weight: float = 2.0
+    incremental_refresh_fraction: float = 0.1  # patch snapshot when <= this share changed
+
+
+@dataclass
+class GuildCacheConfig:
+    """Configuration for per-guild memory residency (see guild_cache.py)."""
+    memory_budget_mb: int = 512
+    storage_dir: str = "guild_data"
 
 
 @dataclass
@@ -62,6 +141,10 @@ class CommunityCatalystConfig:
     log_level: str = "INFO"
     enable_performance_metrics: bool = False
     
+    delivery: DeliveryConfig = field(default_factory=DeliveryConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    guild_cache: GuildCacheConfig = field(default_factory=GuildCacheConfig)
+    
     @classmethod
     def from_env(cls) -> 'CommunityCatalystConfig':
         """Create configuration from environment variables."""
@@ -70,7 +153,15 @@ class CommunityCatalystConfig:
                 model_name=os.getenv('COMCAT_EMBEDDING_MODEL', 'all-MiniLM-L6-v2'),
                 batch_size=int(os.getenv('COMCAT_BATCH_SIZE', '32')),
                 normalize_embeddings=os.getenv('COMCAT_NORMALIZE_EMBEDDINGS', 'true').lower() == 'true',
-                device=os.getenv('COMCAT_DEVICE')  # None for auto-detect
+                device=os.getenv('COMCAT_DEVICE'),  # None for auto-detect
+                latency_budget_ms=float(os.environ['COMCAT_LATENCY_BUDGET_MS']) if os.getenv('COMCAT_LATENCY_BUDGET_MS') else None,
+                benchmark_results_path=os.getenv('COMCAT_BENCHMARK_RESULTS'),
+                use_field_embeddings=os.getenv('COMCAT_FIELD_EMBEDDINGS', 'false').lower() == 'true',
+                field_weights=parse_field_weights(os.getenv('COMCAT_FIELD_WEIGHTS')),
+                field_cache_size=int(os.getenv('COMCAT_FIELD_CACHE_SIZE', '100000')),
+                encoding_workers=-1 if os.getenv('COMCAT_ENCODING_WORKERS', '0') == 'auto' else int(os.getenv('COMCAT_ENCODING_WORKERS', '0')),
+                threads_per_worker=int(os.environ['COMCAT_THREADS_PER_WORKER']) if os.getenv('COMCAT_THREADS_PER_WORKER') else None,
+                parallel_min_batch=int(os.getenv('COMCAT_PARALLEL_MIN_BATCH', '2000'))
             ),
             recommendation=RecommendationConfig(
                 top_n_default=int(os.getenv('COMCAT_TOP_N', '5')),
@@ -79,6 +170,13 @@ class CommunityCatalystConfig:
                 enable_explanations=os.getenv('COMCAT_ENABLE_EXPLANATIONS', 'true').lower() == 'true',
                 require_opt_in=os.getenv('COMCAT_REQUIRE_OPT_IN', 'true').lower() == 'true',
                 exclude_same_user=os.getenv('COMCAT_EXCLUDE_SAME_USER', 'true').lower() == 'true',
+                deduplicate_targets=os.getenv('COMCAT_DEDUPLICATE_TARGETS', 'false').lower() == 'true',
+                near_duplicate_threshold=float(os.getenv('COMCAT_NEAR_DUPLICATE_THRESHOLD', '0.8')),
+                near_duplicate_min_shingles=int(os.getenv('COMCAT_NEAR_DUPLICATE_MIN_SHINGLES', '8')),
+                rerank_enabled=os.getenv('COMCAT_RERANK', 'false').lower() == 'true',
+                rerank_model=os.getenv('COMCAT_RERANK_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2'),
+                rerank_top_m=int(os.getenv('COMCAT_RERANK_TOP_M', '20')),
+                rerank_latency_budget_ms=float(os.getenv('COMCAT_RERANK_BUDGET_MS', '50')),
                 content_weight=float(os.getenv('COMCAT_CONTENT_WEIGHT', '1.0')),
                 collaborative_weight=float(os.getenv('COMCAT_COLLABORATIVE_WEIGHT', '0.0')),
                 network_weight=float(os.getenv('COMCAT_NETWORK_WEIGHT', '0.0'))
@@ -87,12 +185,36 @@ class CommunityCatalystConfig:
                 interest_cluster_min_size=int(os.getenv('COMCAT_CLUSTER_MIN_SIZE', '3')),
                 max_clusters_per_analysis=int(os.getenv('COMCAT_MAX_CLUSTERS', '20')),
                 meetup_topic_min_participants=int(os.getenv('COMCAT_MEETUP_MIN_PARTICIPANTS', '2')),
-                max_suggested_topics=int(os.getenv('COMCAT_MAX_SUGGESTED_TOPICS', '10'))
+                max_suggested_topics=int(os.getenv('COMCAT_MAX_SUGGESTED_TOPICS', '10')),
+                interest_sketch_width=int(os.getenv('COMCAT_INTEREST_SKETCH_WIDTH', '2048')),
+                interest_sketch_depth=int(os.getenv('COMCAT_INTEREST_SKETCH_DEPTH', '4')),
+                trending_window_hours=float(os.environ['COMCAT_TRENDING_WINDOW_HOURS']) if os.getenv('COMCAT_TRENDING_WINDOW_HOURS') else None,
+                study_group_size=int(os.getenv('COMCAT_STUDY_GROUP_SIZE', '5')),
+                group_formation_time_limit_seconds=float(os.getenv('COMCAT_GROUP_TIME_LIMIT_SECONDS', '5.0'))
             ),
             enable_caching=os.getenv('COMCAT_ENABLE_CACHING', 'true').lower() == 'true',
             cache_ttl_hours=int(os.getenv('COMCAT_CACHE_TTL_HOURS', '24')),
             log_level=os.getenv('COMCAT_LOG_LEVEL', 'INFO'),
-            enable_performance_metrics=os.getenv('COMCAT_ENABLE_METRICS', 'false').lower() == 'true'
+            enable_performance_metrics=os.getenv('COMCAT_ENABLE_METRICS', 'false').lower() == 'true',
+            delivery=DeliveryConfig(
+                rate_per_second=float(os.getenv('COMCAT_DELIVERY_RATE', '5.0')),
+                burst=int(os.getenv('COMCAT_DELIVERY_BURST', '5')),
+                max_concurrency=int(os.getenv('COMCAT_DELIVERY_CONCURRENCY', '4')),
+                max_attempts=int(os.getenv('COMCAT_DELIVERY_MAX_ATTEMPTS', '5')),
+                max_throttled_attempts=int(os.getenv('COMCAT_DELIVERY_MAX_THROTTLED_ATTEMPTS', '50')),
+                base_backoff_seconds=float(os.getenv('COMCAT_DELIVERY_BACKOFF_SECONDS', '1.0'))
+            ),
+            scheduler=SchedulerConfig(
+                refresh_cadence_minutes=float(os.getenv('COMCAT_REFRESH_CADENCE_MINUTES', '60')),
+                cpu_budget_seconds=float(os.getenv('COMCAT_REFRESH_CPU_BUDGET_SECONDS', '30')),
+                activity_weight=float(os.getenv('COMCAT_REFRESH_ACTIVITY_WEIGHT', '1.0')),
+                change_weight=float(os.getenv('COMCAT_REFRESH_CHANGE_WEIGHT', '2.0')),
+                incremental_refresh_fraction=float(os.getenv('COMCAT_INCREMENTAL_REFRESH_FRACTION', '0.1'))
+            ),
+            guild_cache=GuildCacheConfig(
+                memory_budget_mb=int(os.getenv('COMCAT_GUILD_MEMORY_BUDGET_MB', '512')),
+                storage_dir=os.getenv('COMCAT_GUILD_STORAGE_DIR', 'guild_data')
+            )
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -102,7 +224,15 @@ class CommunityCatalystConfig:
                 'model_name': self.embedding.model_name,
                 'batch_size': self.embedding.batch_size,
                 'normalize_embeddings': self.embedding.normalize_embeddings,
-                'device': self.embedding.device
+                'device': self.embedding.device,
+                'latency_budget_ms': self.embedding.latency_budget_ms,
+                'benchmark_results_path': self.embedding.benchmark_results_path,
+                'use_field_embeddings': self.embedding.use_field_embeddings,
+                'field_weights': dict(self.embedding.field_weights),
+                'field_cache_size': self.embedding.field_cache_size,
+                'encoding_workers': self.embedding.encoding_workers,
+                'threads_per_worker': self.embedding.threads_per_worker,
+                'parallel_min_batch': self.embedding.parallel_min_batch
             },
             'recommendation': {
                 'top_n_default': self.recommendation.top_n_default,
@@ -111,6 +241,13 @@ class CommunityCatalystConfig:
                 'enable_explanations': self.recommendation.enable_explanations,
                 'require_opt_in': self.recommendation.require_opt_in,
                 'exclude_same_user': self.recommendation.exclude_same_user,
+                'deduplicate_targets': self.recommendation.deduplicate_targets,
+                'near_duplicate_threshold': self.recommendation.near_duplicate_threshold,
+                'near_duplicate_min_shingles': self.recommendation.near_duplicate_min_shingles,
+                'rerank_enabled': self.recommendation.rerank_enabled,
+                'rerank_model': self.recommendation.rerank_model,
+                'rerank_top_m': self.recommendation.rerank_top_m,
+                'rerank_latency_budget_ms': self.recommendation.rerank_latency_budget_ms,
                 'content_weight': self.recommendation.content_weight,
                 'collaborative_weight': self.recommendation.collaborative_weight,
                 'network_weight': self.recommendation.network_weight
@@ -119,12 +256,36 @@ class CommunityCatalystConfig:
                 'interest_cluster_min_size': self.community_analysis.interest_cluster_min_size,
                 'max_clusters_per_analysis': self.community_analysis.max_clusters_per_analysis,
                 'meetup_topic_min_participants': self.community_analysis.meetup_topic_min_participants,
-                'max_suggested_topics': self.community_analysis.max_suggested_topics
+                'max_suggested_topics': self.community_analysis.max_suggested_topics,
+                'interest_sketch_width': self.community_analysis.interest_sketch_width,
+                'interest_sketch_depth': self.community_analysis.interest_sketch_depth,
+                'trending_window_hours': self.community_analysis.trending_window_hours,
+                'study_group_size': self.community_analysis.study_group_size,
+                'group_formation_time_limit_seconds': self.community_analysis.group_formation_time_limit_seconds
             },
             'enable_caching': self.enable_caching,
             'cache_ttl_hours': self.cache_ttl_hours,
             'log_level': self.log_level,
-            'enable_performance_metrics': self.enable_performance_metrics
+            'enable_performance_metrics': self.enable_performance_metrics,
+            'delivery': {
+                'rate_per_second': self.delivery.rate_per_second,
+                'burst': self.delivery.burst,
+                'max_concurrency': self.delivery.max_concurrency,
+                'max_attempts': self.delivery.max_attempts,
+                'max_throttled_attempts': self.delivery.max_throttled_attempts,
+                'base_backoff_seconds': self.delivery.base_backoff_seconds
+            },
+            'scheduler': {
+                'refresh_cadence_minutes': self.scheduler.refresh_cadence_minutes,
+                'cpu_budget_seconds': self.scheduler.cpu_budget_seconds,
+                'activity_weight': self.scheduler.activity_weight,
+                'change_weight': self.scheduler.change_weight,
+                'incremental_refresh_fraction': self.scheduler.incremental_refresh_fraction
+            },
+            'guild_cache': {
+                'memory_budget_mb': self.guild_cache.memory_budget_mb,
+                'storage_dir': self.guild_cache.storage_dir
+            }
         }
 
 
@@ -176,11 +337,46 @@ def get_model_info(model_name: str) -> Dict[str, Any]:
     return SUPPORTED_EMBEDDING_MODELS[model_name]
 
 
-def validate_config(config: CommunityCatalystConfig) -> None:
+def check_latency_budget(config: CommunityCatalystConfig,
+                         benchmark_results: Dict[str, Any]) -> Optional[str]:
+    """Check the configured model against a latency budget using benchmark results.
+    
+    Compares ms/profile measured by model_benchmark.py at the batch size closest
+    to the configured one with ``latency_budget_ms``.
+    
+    Args:
+        config: Configuration to check
+        benchmark_results: Report produced by model_benchmark.py
+        
+    Returns:
+        Warning message if the budget can't be met, otherwise None
+    """
+    budget = config.embedding.latency_budget_ms
+    if budget is None:
+        return None
+    
+    model_name = config.embedding.model_name
+    result = benchmark_results.get('models', {}).get(model_name)
+    if not result or not result.get('available'):
+        return f"No benchmark results for {model_name}; cannot check latency budget of {budget}ms"
+    
+    ms_per_profile = result['ms_per_profile']
+    batch_size = min(ms_per_profile, key=lambda bs: abs(int(bs) - config.embedding.batch_size))
+    measured = ms_per_profile[batch_size]
+    if measured > budget:
+        return (f"Embedding model {model_name} needs {measured:.2f}ms/profile at batch size {batch_size}, "
+                f"over the {budget}ms latency budget")
+    return None
+
+
+def validate_config(config: CommunityCatalystConfig,
+                    benchmark_results: Optional[Dict[str, Any]] = None) -> None:
     """Validate configuration parameters.
     
     Args:
         config: Configuration to validate
+        benchmark_results: Optional model_benchmark.py report; loaded from
+            ``embedding.benchmark_results_path`` when not given
         
     Raises:
         ValueError: If configuration is invalid
@@ -199,16 +395,61 @@ def validate_config(config: CommunityCatalystConfig) -> None:
     if config.recommendation.min_similarity_threshold > config.recommendation.max_similarity_threshold:
         raise ValueError("min_similarity_threshold cannot be greater than max_similarity_threshold")
     
+    if not 0.0 < config.recommendation.near_duplicate_threshold <= 1.0:
+        raise ValueError("near_duplicate_threshold must be between 0.0 and 1.0")
+    
+    if config.recommendation.near_duplicate_min_shingles <= 0:
+        raise ValueError("near_duplicate_min_shingles must be positive")
+    
     # Validate positive integers
     if config.recommendation.top_n_default <= 0:
         raise ValueError("top_n_default must be positive")
     
+    if config.recommendation.rerank_top_m <= 0 or config.recommendation.rerank_latency_budget_ms <= 0:
+        raise ValueError("rerank_top_m and rerank_latency_budget_ms must be positive")
+    
     if config.embedding.batch_size <= 0:
         raise ValueError("batch_size must be positive")
     
+    if config.embedding.encoding_workers < -1:
+        raise ValueError("encoding_workers must be -1 (auto), 0 (off) or a positive worker count")
+    
+    if config.embedding.threads_per_worker is not None and config.embedding.threads_per_worker <= 0:
+        raise ValueError("threads_per_worker must be positive")
+    
+    unknown_fields = set(config.embedding.field_weights) - set(DEFAULT_FIELD_WEIGHTS)
+    if unknown_fields:
+        raise ValueError(f"Unknown field_weights keys: {sorted(unknown_fields)}")
+    
+    if (any(w < 0 for w in config.embedding.field_weights.values())
+            or sum(config.embedding.field_weights.values()) <= 0):
+        raise ValueError("field_weights must be non-negative with a positive sum")
+    
     if config.community_analysis.interest_cluster_min_size <= 0:
         raise ValueError("interest_cluster_min_size must be positive")
     
+    if config.community_analysis.interest_sketch_width <= 0 or config.community_analysis.interest_sketch_depth <= 0:
+        raise ValueError("interest_sketch_width and interest_sketch_depth must be positive")
+    
+    if config.community_analysis.study_group_size <= 1:
+        raise ValueError("study_group_size must be at least 2")
+    
+    if config.delivery.rate_per_second <= 0:
+        raise ValueError("delivery rate_per_second must be positive")
+    
+    if (config.delivery.burst <= 0 or config.delivery.max_concurrency <= 0 or config.delivery.max_attempts <= 0
+            or config.delivery.max_throttled_attempts <= 0):
+        raise ValueError("delivery burst, max_concurrency, max_attempts and max_throttled_attempts must be positive")
+    
+    if config.scheduler.refresh_cadence_minutes <= 0 or config.scheduler.cpu_budget_seconds <= 0:
+        raise ValueError("refresh_cadence_minutes and cpu_budget_seconds must be positive")
+    
+    if not 0.0 <= config.scheduler.incremental_refresh_fraction <= 1.0:
+        raise ValueError("incremental_refresh_fraction must be between 0.0 and 1.0")
+    
+    if config.guild_cache.memory_budget_mb <= 0:
+        raise ValueError("guild memory_budget_mb must be positive")
+    
     # Validate weights sum to reasonable value for hybrid approaches
     total_weight = (config.recommendation.content_weight + 
                    config.recommendation.collaborative_weight + 
@@ -216,6 +457,21 @@ def validate_config(config: CommunityCatalystConfig) -> None:
     
     if total_weight <= 0:
         raise ValueError("At least one recommendation weight must be positive")
+    
+    # Warn (don't fail) when the model can't meet the latency budget
+    if config.embedding.latency_budget_ms is not None:
+        if config.embedding.latency_budget_ms <= 0:
+            raise ValueError("latency_budget_ms must be positive")
+        
+        results_path = config.embedding.benchmark_results_path
+        if benchmark_results is None and results_path and os.path.exists(results_path):
+            with open(results_path, 'r', encoding='utf-8') as f:
+                benchmark_results = json.load(f)
+        
+        if benchmark_results is not None:
+            message = check_latency_budget(config, benchmark_results)
+            if message:
+                warnings.warn(message)
 
 
 # Default configuration instance
@@ -0,0 +1,51 @@
+"""Shared pytest fixtures for CommunityCatalyst tests."""
+
+import numpy as np
+import pytest
+
+
+class StaticEmbeddingEngine:
+    """Embedding engine stand-in returning the same vector for every profile."""
+
+    def create_user_embedding(self, user_profile):
+        return np.array([1.0, 0.0])
+
+    def create_embeddings_batch(self, user_profiles):
+        return [np.array([1.0, 0.0]) for _ in user_profiles]
+
+
+@pytest.fixture
+def static_embedding_engine():
+    """Embedding engine that needs no model download."""
+    return StaticEmbeddingEngine()
+
+
+class HashingEmbeddingEngine:
+    """Deterministic bag-of-words embedding engine that records what it encodes."""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.encoded = []
+
+    def get_embedding_dimension(self):
+        return self.dim
+
+    def encode_texts(self, texts):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), self.dim))
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(',', ' ').split():
+                vectors[row, sum(map(ord, word)) % self.dim] += 1.0
+        return vectors
+
+    def create_user_embedding(self, user_profile):
+        return self.encode_texts([user_profile.to_profile_text()])[0]
+
+    def create_embeddings_batch(self, user_profiles):
+        return list(self.encode_texts([p.to_profile_text() for p in user_profiles]))
+
+
+@pytest.fixture
+def hashing_embedding_engine():
+    """Text-sensitive embedding engine that needs no model download."""
+    return HashingEmbeddingEngine()
@@ -0,0 +1,208 @@
+"""
+Connection Graph for CommunityCatalyst
+======================================
+
+Keeps the graph of accepted connections between members and derives a
+friend-of-friend (shared connection) score from it. Two-hop counts are
+computed with sparse adjacency products restricted to the candidate set,
+so no dense N x N matrix is ever built, and cached rows are patched in
+place when a new connection is accepted.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionGraph:
+    """Undirected graph of accepted connections with cached two-hop counts."""
+
+    def __init__(self, edges: Optional[Iterable[Tuple[str, str]]] = None):
+        """Initialize the graph, optionally from existing connections.
+
+        Args:
+            edges: Iterable of (discord_user_id, discord_user_id) pairs
+        """
+        self._index: Dict[str, int] = {}
+        self._user_ids: List[str] = []
+        self._neighbors: List[Set[int]] = []
+        self._adjacency: Optional[sparse.csr_matrix] = None
+        # Sparse rows of A.A keyed by node index: {node: {two_hop_node: count}}
+        self._two_hop_cache: Dict[int, Dict[int, int]] = {}
+
+        if edges:
+            for user_a, user_b in edges:
+                self.add_connection(user_a, user_b)
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    @property
+    def num_connections(self) -> int:
+        """Number of undirected connections in the graph."""
+        return sum(len(n) for n in self._neighbors) // 2
+
+    def _node(self, user_id: str) -> int:
+        """Return the node index for a user, registering it if needed."""
+        node = self._index.get(user_id)
+        if node is None:
+            node = len(self._user_ids)
+            self._index[user_id] = node
+            self._user_ids.append(user_id)
+            self._neighbors.append(set())
+        return node
+
+    def has_connection(self, user_a: str, user_b: str) -> bool:
+        """Check whether two users are directly connected."""
+        node_a = self._index.get(user_a)
+        node_b = self._index.get(user_b)
+        if node_a is None or node_b is None:
+            return False
+        return node_b in self._neighbors[node_a]
+
+    def degree(self, user_id: str) -> int:
+        """Number of direct connections of a user."""
+        node = self._index.get(user_id)
+        return len(self._neighbors[node]) if node is not None else 0
+
+    def add_connection(self, user_a: str, user_b: str) -> bool:
+        """Record an accepted connection and patch cached two-hop counts.
+
+        Adding edge (a, b) creates a new two-hop path b-a-w for every existing
+        neighbour w of a, and a-b-w for every neighbour w of b. Only rows
+        already in the cache are touched, so the update is O(deg(a) + deg(b)).
+
+        Args:
+            user_a: discord_user_id of one side
+            user_b: discord_user_id of the other side
+
+        Returns:
+            True if the connection was new, False if ignored
+        """
+        if user_a == user_b:
+            return False
+
+        node_a = self._node(user_a)
+        node_b = self._node(user_b)
+        if node_b in self._neighbors[node_a]:
+            return False
+
+        cache = self._two_hop_cache
+        for center, end in ((node_a, node_b), (node_b, node_a)):
+            for other in self._neighbors[center]:
+                if end in cache:
+                    cache[end][other] = cache[end].get(other, 0) + 1
+                if other in cache:
+                    cache[other][end] = cache[other].get(end, 0) + 1
+
+        self._neighbors[node_a].add(node_b)
+        self._neighbors[node_b].add(node_a)
+        # The CSR matrix is only needed for uncached rows; rebuild lazily
+        self._adjacency = None
+        return True
+
+    def _adjacency_matrix(self) -> sparse.csr_matrix:
+        """Build (or reuse) the sparse symmetric adjacency matrix."""
+        if self._adjacency is None or self._adjacency.shape[0] != len(self._user_ids):
+            n = len(self._user_ids)
+            rows = [node for node, nbrs in enumerate(self._neighbors) for _ in nbrs]
+            cols = [nbr for nbrs in self._neighbors for nbr in nbrs]
+            data = np.ones(len(rows), dtype=np.float32)
+            self._adjacency = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+        return self._adjacency
+
+    def _two_hop_row(self, node: int) -> Dict[int, int]:
+        """Return the cached row of A.A for a node, computing it if needed."""
+        row = self._two_hop_cache.get(node)
+        if row is None:
+            adjacency = self._adjacency_matrix()
+            product = (adjacency[node] @ adjacency).tocoo()
+            row = {int(col): int(val) for col, val in zip(product.col, product.data)
+                   if col != node}
+            self._two_hop_cache[node] = row
+        return row
+
+    def shared_connection_counts(self, source_id: str, candidate_ids: List[str]) -> np.ndarray:
+        """Count shared connections between a source user and each candidate.
+
+        Args:
+            source_id: discord_user_id of the source user
+            candidate_ids: discord_user_ids to score
+
+        Returns:
+            Integer array aligned with candidate_ids
+        """
+        counts = np.zeros(len(candidate_ids), dtype=np.int64)
+        source_node = self._index.get(source_id)
+        if source_node is None or not self._neighbors[source_node]:
+            return counts
+
+        row = self._two_hop_row(source_node)
+        for i, candidate_id in enumerate(candidate_ids):
+            node = self._index.get(candidate_id)
+            if node is not None:
+                counts[i] = row.get(node, 0)
+        return counts
+
+    def shared_connection_matrix(self, source_ids: List[str],
+                                 candidate_ids: List[str]) -> sparse.csr_matrix:
+        """Compute shared-connection counts for many sources at once.
+
+        Evaluates A[S] . A[C]^T, i.e. A.A restricted to the source rows and
+        candidate columns, without materialising the full N x N product.
+
+        Args:
+            source_ids: discord_user_ids of the source users
+            candidate_ids: discord_user_ids of the candidate users
+
+        Returns:
+            Sparse |sources| x |candidates| matrix of counts
+        """
+        n = len(self._user_ids)
+        if n == 0:
+            return sparse.csr_matrix((len(source_ids), len(candidate_ids)), dtype=np.float32)
+
+        adjacency = self._adjacency_matrix()
+        source_rows = self._selector(source_ids, n)
+        candidate_rows = self._selector(candidate_ids, n)
+        product = (source_rows @ adjacency) @ (candidate_rows @ adjacency).T
+        return product.tocsr()
+
+    def _selector(self, user_ids: List[str], n: int) -> sparse.csr_matrix:
+        """Sparse row selector mapping user_ids onto node indices (unknown rows stay empty)."""
+        rows, cols = [], []
+        for i, user_id in enumerate(user_ids):
+            node = self._index.get(user_id)
+            if node is not None:
+                rows.append(i)
+                cols.append(node)
+        data = np.ones(len(rows), dtype=np.float32)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(user_ids), n))
+
+    def network_scores(self, source_id: str, candidate_ids: List[str]) -> np.ndarray:
+        """Normalised friend-of-friend score between a source and each candidate.
+
+        Uses the Salton index shared / sqrt(deg(source) * deg(candidate)),
+        which lies in [0, 1] and does not favour highly connected members.
+
+        Args:
+            source_id: discord_user_id of the source user
+            candidate_ids: discord_user_ids to score
+
+        Returns:
+            Float array of scores aligned with candidate_ids
+        """
+        counts = self.shared_connection_counts(source_id, candidate_ids).astype(float)
+        if not counts.any():
+            return counts
+
+        source_degree = self.degree(source_id)
+        candidate_degrees = np.array([self.degree(c) for c in candidate_ids], dtype=float)
+        denominator = np.sqrt(source_degree * candidate_degrees)
+        scores = np.divide(counts, denominator, out=np.zeros_like(counts), where=denominator > 0)
+        return np.clip(scores, 0.0, 1.0)
@@ -0,0 +1,349 @@
+"""
+Recommendation Delivery for CommunityCatalyst
+===========================================
+
+Takes ConnectionRecommendation objects past ``to_dict`` and delivers them:
+
+- ``OutboxQueue`` persists messages in SQLite and aggregates all pending
+  recommendations for a recipient into a single message.
+- ``TokenBucket`` paces sends and honours ``retry_after`` from the endpoint.
+- ``DeliveryDispatcher`` drains the outbox with bounded concurrency,
+  retrying rate-limited and failed sends with backoff. Rate-limited
+  (throttled) attempts have their own cap and do not use up ``max_attempts``.
+- ``FakeDiscordEndpoint`` mimics Discord's rate limiting for offline tests.
+
+With a send rate of R messages/s and burst B, a campaign of N recipients
+drains in roughly max(0, N - B) / R seconds (see ``estimate_drain_seconds``).
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from config import DeliveryConfig
+
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_IN_FLIGHT = "in_flight"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class DeliveryMessage:
+    """One outbound message carrying all recommendations for a recipient."""
+    message_id: int
+    recipient_id: str
+    guild_id: str
+    campaign_id: Optional[str]
+    recommendations: List[Dict[str, Any]]
+    attempts: int = 0
+    throttles: int = 0  # rate-limited attempts, not counted in attempts
+
+    def render(self) -> str:
+        """Render the message body sent to the recipient."""
+        lines = ["Here are some people you might want to connect with:"]
+        for rec in self.recommendations:
+            lines.append(f"- <@{rec['target_discord_user_id']}>: {rec['recommendation_reason']}")
+        return "\n".join(lines)
+
+
+@dataclass
+class SendResult:
+    """Outcome of a single send attempt."""
+    ok: bool
+    retry_after: Optional[float] = None  # seconds, set when rate limited
+    error: Optional[str] = None
+
+
+MessageSender = Callable[[DeliveryMessage], Awaitable[SendResult]]
+
+
+class OutboxQueue:
+    """SQLite-backed outbox with per-recipient aggregation."""
+
+    def __init__(self, db_path: str):
+        """Open (or create) the outbox.
+
+        Messages left in flight by a crashed dispatcher are returned to pending.
+
+        Args:
+            db_path: SQLite file; use a persistent path so queued messages survive restarts
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recipient_id TEXT NOT NULL,
+                guild_id TEXT NOT NULL,
+                campaign_id TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                throttles INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, available_at)")
+        self._conn.execute("UPDATE outbox SET status = ? WHERE status = ?", (STATUS_PENDING, STATUS_IN_FLIGHT))
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def enqueue_recommendations(self, recommendations: Iterable) -> int:
+        """Queue recommendations, merging them into one message per recipient.
+
+        Recommendations for a recipient that already has a pending message in
+        the same guild and campaign are appended to that message.
+
+        Args:
+            recommendations: ConnectionRecommendation objects
+
+        Returns:
+            Number of recommendations queued
+        """
+        grouped: Dict[tuple, List[Dict[str, Any]]] = {}
+        for rec in recommendations:
+            key = (rec.source_discord_user_id, rec.guild_id, rec.campaign_id)
+            grouped.setdefault(key, []).append(rec.to_dict())
+
+        queued = 0
+        with self._conn:
+            for (recipient_id, guild_id, campaign_id), recs in grouped.items():
+                row = self._conn.execute(
+                    "SELECT id, payload FROM outbox WHERE recipient_id = ? AND guild_id = ? "
+                    "AND campaign_id IS ? AND status = ? AND attempts = 0 AND throttles = 0",
+                    (recipient_id, guild_id, campaign_id, STATUS_PENDING)
+                ).fetchone()
+                if row:
+                    payload = json.loads(row[1]) + recs
+                    self._conn.execute("UPDATE outbox SET payload = ? WHERE id = ?", (json.dumps(payload), row[0]))
+                else:
+                    self._conn.execute(
+                        "INSERT INTO outbox (recipient_id, guild_id, campaign_id, payload, status) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (recipient_id, guild_id, campaign_id, json.dumps(recs), STATUS_PENDING)
+                    )
+                queued += len(recs)
+        return queued
+
+    def claim(self, now: float) -> Optional[DeliveryMessage]:
+        """Claim the oldest message that is due, marking it in flight."""
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT id, recipient_id, guild_id, campaign_id, payload, attempts, throttles FROM outbox "
+                "WHERE status = ? AND available_at <= ? ORDER BY available_at, id LIMIT 1",
+                (STATUS_PENDING, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE outbox SET status = ? WHERE id = ?", (STATUS_IN_FLIGHT, row[0]))
+        return DeliveryMessage(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5], row[6])
+
+    def mark_sent(self, message_id: int) -> None:
+        with self._conn:
+            self._conn.execute("UPDATE outbox SET status = ?, attempts = attempts + 1 WHERE id = ?",
+                               (STATUS_SENT, message_id))
+
+    def mark_retry(self, message_id: int, available_at: float, error: Optional[str] = None) -> None:
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, available_at = ?, last_error = ? WHERE id = ?",
+                (STATUS_PENDING, available_at, error, message_id)
+            )
+
+    def mark_throttled(self, message_id: int, available_at: float, error: Optional[str] = None) -> None:
+        """Requeue a rate-limited message without using up one of its attempts."""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, throttles = throttles + 1, available_at = ?, last_error = ? WHERE id = ?",
+                (STATUS_PENDING, available_at, error, message_id)
+            )
+
+    def mark_failed(self, message_id: int, error: Optional[str] = None) -> None:
+        with self._conn:
+            self._conn.execute("UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ? WHERE id = ?",
+                               (STATUS_FAILED, error, message_id))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of messages per status."""
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def next_available_at(self) -> Optional[float]:
+        """Earliest time a pending message becomes due, or None if nothing is pending."""
+        row = self._conn.execute("SELECT MIN(available_at) FROM outbox WHERE status = ?",
+                                 (STATUS_PENDING,)).fetchone()
+        return row[0]
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter with retry-after pauses."""
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        """Create a bucket refilling ``rate`` tokens/s up to ``capacity``."""
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while True:
+            now = self._clock()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for ``seconds`` (e.g. after an HTTP 429)."""
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated = max(now, self._paused_until)
+
+
+def estimate_drain_seconds(num_messages: int, config: DeliveryConfig) -> float:
+    """Expected time to drain ``num_messages`` when no retries are needed."""
+    return max(0, num_messages - config.burst) / config.rate_per_second
+
+
+class DeliveryDispatcher:
+    """Drains an OutboxQueue through a rate-limited, concurrency-bounded sender."""
+
+    def __init__(self, outbox: OutboxQueue, sender: MessageSender, config: Optional[DeliveryConfig] = None):
+        """Initialize the dispatcher.
+
+        Args:
+            outbox: Queue to drain
+            sender: Async callable delivering one message
+            config: Rate, concurrency and retry settings
+        """
+        self.outbox = outbox
+        self.sender = sender
+        self.config = config or DeliveryConfig()
+        self.bucket = TokenBucket(self.config.rate_per_second, self.config.burst)
+        self._stats: Dict[str, int] = {}
+
+    async def _deliver(self, message: DeliveryMessage) -> None:
+        await self.bucket.acquire()
+        try:
+            result = await self.sender(message)
+        except Exception as e:
+            result = SendResult(ok=False, error=str(e))
+
+        if result.ok:
+            self.outbox.mark_sent(message.message_id)
+            self._stats['sent'] += 1
+            return
+
+        throttled = result.retry_after is not None
+        if throttled:
+            # Rate limited: the message itself is fine, so this has its own cap
+            exhausted = message.throttles + 1 >= self.config.max_throttled_attempts
+        else:
+            exhausted = message.attempts + 1 >= self.config.max_attempts
+        if exhausted:
+            logger.error(f"Giving up on message {message.message_id} to {message.recipient_id}: {result.error}")
+            self.outbox.mark_failed(message.message_id, result.error or "rate limited")
+            self._stats['failed'] += 1
+            return
+
+        if throttled:
+            # Pause everyone, then retry this message once the window reopens
+            self.bucket.pause(result.retry_after)
+            self.outbox.mark_throttled(message.message_id, time.time() + result.retry_after, result.error)
+            self._stats['rate_limited'] += 1
+        else:
+            delay = self.config.base_backoff_seconds * (2 ** message.attempts)
+            self.outbox.mark_retry(message.message_id, time.time() + delay, result.error)
+        self._stats['retries'] += 1
+
+    async def _worker(self) -> None:
+        while True:
+            message = self.outbox.claim(time.time())
+            if message is not None:
+                await self._deliver(message)
+                continue
+
+            next_at = self.outbox.next_available_at()
+            if next_at is None:
+                if self.outbox.counts().get(STATUS_IN_FLIGHT, 0) == 0:
+                    return
+                next_at = time.time() + 0.01  # another worker may requeue a message
+            await asyncio.sleep(max(0.001, min(next_at - time.time(), 1.0)))
+
+    async def drain(self) -> Dict[str, Any]:
+        """Deliver every due and retried message until the outbox is empty.
+
+        Returns:
+            Stats with sent/failed/retry counts, elapsed time and throughput
+        """
+        self._stats = {'sent': 0, 'failed': 0, 'retries': 0, 'rate_limited': 0}
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker() for _ in range(self.config.max_concurrency)))
+        elapsed = time.perf_counter() - start
+
+        stats: Dict[str, Any] = dict(self._stats)
+        stats['elapsed_seconds'] = elapsed
+        stats['messages_per_second'] = stats['sent'] / elapsed if elapsed > 0 else 0.0
+        logger.info(f"Delivery drained: {stats}")
+        return stats
+
+
+class FakeDiscordEndpoint:
+    """Offline stand-in for Discord that enforces a sliding-window rate limit."""
+
+    def __init__(self, max_requests: int = 5, window_seconds: float = 1.0,
+                 latency_seconds: float = 0.0, failing_recipients: Optional[Iterable[str]] = None):
+        """Allow ``max_requests`` per ``window_seconds``; extra requests get a 429-style result."""
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.latency_seconds = latency_seconds
+        self.failing_recipients = set(failing_recipients or [])
+        self.delivered: List[DeliveryMessage] = []
+        self.rate_limited = 0
+        self._window: deque = deque()
+
+    async def __call__(self, message: DeliveryMessage) -> SendResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= self.window_seconds:
+            self._window.popleft()
+        if len(self._window) >= self.max_requests:
+            self.rate_limited += 1
+            return SendResult(ok=False, retry_after=self.window_seconds - (now - self._window[0]),
+                              error="429 Too Many Requests")
+        self._window.append(now)
+
+        if message.recipient_id in self.failing_recipients:
+            return SendResult(ok=False, error="403 Cannot send messages to this user")
+        self.delivered.append(message)
+        return SendResult(ok=True)
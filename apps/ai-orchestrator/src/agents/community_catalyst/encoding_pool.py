@@ -0,0 +1,205 @@
+"""
+Multi-Process Encoding Pool for CommunityCatalyst
+===============================================
+
+Splits large embedding jobs across worker processes on CPU-only nodes.
+Each worker loads the model once and is pinned to a fixed intra-op thread
+count (torch / OpenMP / MKL) so ``workers x threads`` never oversubscribes
+the machine. OpenMP and MKL read their thread counts once, when the library
+loads, so the variables are set in the parent while the workers are spawned
+rather than inside the workers. Workers write their rows straight into a shared-memory output
+array, so results come back in input order without pickling embeddings.
+
+``EncodingPool.auto()`` picks the process/thread split from a short
+calibration run over a sample of the real texts; each pool is warmed up
+before it is timed, so worker startup and model loading are not counted.
+"""
+
+import logging
+import math
+import os
+import time
+from multiprocessing import get_context, shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+# Per-worker state, populated by _init_worker
+_worker_model = None
+_worker_batch_size = 32
+
+
+def load_sentence_transformer(model_name: str):
+    """Default model factory: a CPU SentenceTransformer."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device='cpu')
+
+
+def _init_worker(model_factory: Callable[[str], Any], model_name: str,
+                 threads: int, batch_size: int) -> None:
+    """Pin the worker's torch thread pool and load its model once."""
+    global _worker_model, _worker_batch_size
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = model_factory(model_name)
+    _worker_batch_size = batch_size
+
+
+def _worker_dimension() -> int:
+    return int(_worker_model.encode(["dimension probe"], convert_to_numpy=True).shape[1])
+
+
+def _encode_chunk(shm_name: str, shape: Tuple[int, int], start: int, texts: List[str]) -> int:
+    """Encode texts and write them into rows [start, start + len(texts)) of the shared output."""
+    embeddings = _worker_model.encode(texts, batch_size=_worker_batch_size, convert_to_numpy=True)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        output[start:start + len(texts)] = embeddings
+    finally:
+        shm.close()
+    return len(texts)
+
+
+class EncodingPool:
+    """Pool of model-holding worker processes with bounded intra-op threads."""
+
+    def __init__(self,
+                 model_name: str = "all-MiniLM-L6-v2",
+                 num_workers: int = 2,
+                 threads_per_worker: Optional[int] = None,
+                 chunk_size: int = 512,
+                 batch_size: int = 32,
+                 model_factory: Callable[[str], Any] = load_sentence_transformer):
+        """Start the worker processes.
+
+        Args:
+            model_name: SentenceTransformer model each worker loads
+            num_workers: Number of worker processes
+            threads_per_worker: Intra-op threads per worker (default: cores // workers)
+            chunk_size: Texts per task sent to a worker
+            batch_size: Batch size for model.encode inside workers
+            model_factory: Picklable callable returning a model with .encode()
+        """
+        if num_workers <= 0 or chunk_size <= 0:
+            raise ValueError("num_workers and chunk_size must be positive")
+        cpus = os.cpu_count() or 1
+        self.model_name = model_name
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, cpus // num_workers)
+        self.chunk_size = chunk_size
+
+        ctx = get_context('spawn')  # fork + torch thread pools don't mix
+        # Spawned workers inherit the environment before importing numpy/torch
+        saved_env = {var: os.environ.get(var) for var in _THREAD_ENV_VARS}
+        os.environ.update({var: str(self.threads_per_worker) for var in _THREAD_ENV_VARS})
+        try:
+            self._pool = ctx.Pool(
+                num_workers,
+                initializer=_init_worker,
+                initargs=(model_factory, model_name, self.threads_per_worker, batch_size)
+            )
+        finally:
+            for var, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+        self.dimension = self._pool.apply(_worker_dimension)
+        logger.info(f"Started encoding pool: {num_workers} workers x {self.threads_per_worker} threads")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts across the workers, returning rows in input order.
+
+        Returns:
+            (len(texts), dim) float32 array
+        """
+        shape = (len(texts), self.dimension)
+        if not texts:
+            return np.zeros(shape, dtype=np.float32)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 4))
+        try:
+            # Aim for at least one chunk per worker so small jobs still spread out
+            chunk = min(self.chunk_size, max(1, math.ceil(len(texts) / self.num_workers)))
+            tasks = [(shm.name, shape, start, texts[start:start + chunk])
+                     for start in range(0, len(texts), chunk)]
+            self._pool.starmap(_encode_chunk, tasks)
+            return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> 'EncodingPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def candidate_splits(cpus: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(workers, threads) splits that use every core without oversubscribing."""
+        cpus = cpus or os.cpu_count() or 1
+        splits = []
+        workers = 1
+        while workers <= cpus:
+            splits.append((workers, max(1, cpus // workers)))
+            workers *= 2
+        return splits
+
+    @classmethod
+    def auto(cls, sample_texts: List[str],
+             model_name: str = "all-MiniLM-L6-v2",
+             splits: Optional[List[Tuple[int, int]]] = None,
+             **kwargs) -> Tuple['EncodingPool', Dict[str, Any]]:
+        """Calibrate process/thread splits on sample texts and start the fastest.
+
+        Args:
+            sample_texts: Representative texts (a few hundred is enough)
+            model_name: Model to load in workers
+            splits: (workers, threads) candidates (default: candidate_splits())
+            **kwargs: Passed to the EncodingPool constructor
+
+        Returns:
+            (pool, calibration report)
+        """
+        if not sample_texts:
+            raise ValueError("Calibration needs sample texts")
+
+        results = []
+        best_pool, best_rate = None, -1.0
+        for workers, threads in splits or cls.candidate_splits():
+            pool = cls(model_name, num_workers=workers, threads_per_worker=threads, **kwargs)
+            pool.encode(sample_texts)  # warm-up: wait for every worker to load its model
+            start = time.perf_counter()
+            pool.encode(sample_texts)
+            rate = len(sample_texts) / max(time.perf_counter() - start, 1e-9)
+            results.append({'workers': workers, 'threads': threads, 'texts_per_second': rate})
+
+            if rate > best_rate:
+                if best_pool is not None:
+                    best_pool.close()
+                best_pool, best_rate = pool, rate
+            else:
+                pool.close()
+
+        report = {
+            'candidates': results,
+            'chosen': {'workers': best_pool.num_workers, 'threads': best_pool.threads_per_worker,
+                       'texts_per_second': best_rate}
+        }
+        logger.info(f"Encoding pool calibration chose {report['chosen']}")
+        return best_pool, report
@@ -0,0 +1,305 @@
+"""
+Recommendation Feedback Store for CommunityCatalyst
+=================================================
+
+Records which pairs have been shown, accepted or dismissed, and keeps one
+compact Bloom filter per source user so already-seen targets can be
+excluded during candidate selection without touching the history log.
+
+Layout on disk (inside ``storage_dir``):
+    feedback_events.jsonl   append-only history of feedback events
+    feedback_filters.json   serialized per-source Bloom filters, plus the log
+                            size they cover (later events are replayed on load)
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from connection_graph import ConnectionGraph
+
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_SHOWN = "shown"
+FEEDBACK_ACCEPTED = "accepted"
+FEEDBACK_DISMISSED = "dismissed"
+FEEDBACK_EVENTS = (FEEDBACK_SHOWN, FEEDBACK_ACCEPTED, FEEDBACK_DISMISSED)
+
+EVENTS_FILENAME = "feedback_events.jsonl"
+FILTERS_FILENAME = "feedback_filters.json"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity: int = 256, error_rate: float = 0.01):
+        """Size the filter for an expected number of items.
+
+        Args:
+            capacity: Expected number of items before the error rate degrades
+            error_rate: Target false-positive probability at capacity
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError("error_rate must be between 0.0 and 1.0")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str) -> None:
+        """Insert an item into the filter."""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= np.uint8(1 << (pos & 7))
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def is_saturated(self) -> bool:
+        """Whether more items were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def to_dict(self) -> Dict[str, object]:
+        """Serialize the filter for JSON storage."""
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'count': self.count,
+            'bits': base64.b64encode(self.bits.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> 'BloomFilter':
+        """Restore a filter serialized with to_dict."""
+        bloom = cls(capacity=int(data['capacity']), error_rate=float(data['error_rate']))
+        bits = np.frombuffer(base64.b64decode(data['bits']), dtype=np.uint8).copy()
+        if bits.size != bloom.bits.size:
+            raise ValueError("Serialized Bloom filter has unexpected size")
+        bloom.bits = bits
+        bloom.count = int(data['count'])
+        return bloom
+
+
+@dataclass
+class FeedbackEvent:
+    """A single feedback event for a recommended pair."""
+    source_discord_user_id: str
+    target_discord_user_id: str
+    event: str
+    guild_id: Optional[str] = None
+    campaign_id: Optional[str] = None
+    timestamp: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """Convert to dictionary for storage."""
+        return asdict(self)
+
+
+class RecommendationFeedbackStore:
+    """Persistent feedback history with per-source Bloom filter suppression."""
+
+    def __init__(self,
+                 storage_dir: str,
+                 filter_capacity: int = 256,
+                 error_rate: float = 0.01,
+                 connection_graph: Optional[ConnectionGraph] = None):
+        """Open (or create) a feedback store.
+
+        Args:
+            storage_dir: Directory holding the event log and filters
+            filter_capacity: Initial expected targets per source user
+            error_rate: False-positive rate for suppression filters
+            connection_graph: If given, accepted pairs are added as connections
+        """
+        self.storage_dir = storage_dir
+        self.filter_capacity = filter_capacity
+        self.error_rate = error_rate
+        self.connection_graph = connection_graph
+        self._filters: Dict[str, BloomFilter] = {}
+
+        os.makedirs(storage_dir, exist_ok=True)
+        self.events_path = os.path.join(storage_dir, EVENTS_FILENAME)
+        self.filters_path = os.path.join(storage_dir, FILTERS_FILENAME)
+        self._load_filters()
+
+    def _log_size(self) -> int:
+        return os.path.getsize(self.events_path) if os.path.exists(self.events_path) else 0
+
+    def _load_filters(self) -> None:
+        """Load persisted filters and replay events logged after they were saved.
+
+        Filters are rebuilt from the whole log if the file is missing,
+        corrupt, has no recorded log offset, or the log has since shrunk.
+        """
+        if os.path.exists(self.filters_path):
+            try:
+                with open(self.filters_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                log_offset = int(data['log_offset'])
+                if log_offset <= self._log_size():
+                    self._filters = {source: BloomFilter.from_dict(bloom)
+                                     for source, bloom in data['filters'].items()}
+                    for event in self.iter_events(start=log_offset):
+                        self._add_to_filter(event)
+                    return
+                logger.warning("Feedback log is shorter than the saved filters expect, rebuilding from log")
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Could not load feedback filters, rebuilding from log: {e}")
+        self._rebuild_filters(self.iter_events())
+
+    def _rebuild_filters(self, events: Iterable[FeedbackEvent]) -> None:
+        """Rebuild all filters sized to the number of distinct targets per source."""
+        targets_by_source: Dict[str, set] = {}
+        for event in events:
+            targets_by_source.setdefault(event.source_discord_user_id, set()).add(event.target_discord_user_id)
+
+        self._filters = {}
+        for source, targets in targets_by_source.items():
+            bloom = BloomFilter(capacity=max(self.filter_capacity, 2 * len(targets)),
+                                error_rate=self.error_rate)
+            for target in targets:
+                bloom.add(target)
+            self._filters[source] = bloom
+
+    def _filter_for(self, source_user_id: str) -> BloomFilter:
+        bloom = self._filters.get(source_user_id)
+        if bloom is None:
+            bloom = BloomFilter(capacity=self.filter_capacity, error_rate=self.error_rate)
+            self._filters[source_user_id] = bloom
+        return bloom
+
+    def _add_to_filter(self, event: FeedbackEvent) -> None:
+        if not self.has_seen(event.source_discord_user_id, event.target_discord_user_id):
+            self._filter_for(event.source_discord_user_id).add(event.target_discord_user_id)
+
+    def record(self, events: Iterable[FeedbackEvent]) -> int:
+        """Append feedback events to the history and update filters.
+
+        Args:
+            events: Feedback events to record
+
+        Returns:
+            Number of events recorded
+        """
+        recorded = 0
+        with open(self.events_path, 'a', encoding='utf-8') as f:
+            for event in events:
+                if event.event not in FEEDBACK_EVENTS:
+                    raise ValueError(f"Unknown feedback event: {event.event}")
+                if not event.timestamp:
+                    event.timestamp = datetime.now(timezone.utc).isoformat()
+                f.write(json.dumps(event.to_dict()) + "\n")
+
+                self._add_to_filter(event)
+                if event.event == FEEDBACK_ACCEPTED and self.connection_graph is not None:
+                    self.connection_graph.add_connection(event.source_discord_user_id,
+                                                         event.target_discord_user_id)
+                recorded += 1
+        return recorded
+
+    def record_shown(self, recommendations: Iterable) -> int:
+        """Record a batch of ConnectionRecommendation objects as shown."""
+        return self.record(
+            FeedbackEvent(
+                source_discord_user_id=rec.source_discord_user_id,
+                target_discord_user_id=rec.target_discord_user_id,
+                event=FEEDBACK_SHOWN,
+                guild_id=rec.guild_id,
+                campaign_id=rec.campaign_id,
+            )
+            for rec in recommendations
+        )
+
+    def record_accepted(self, source_user_id: str, target_user_id: str, **kwargs) -> None:
+        """Record that a recommended connection was accepted."""
+        self.record([FeedbackEvent(source_user_id, target_user_id, FEEDBACK_ACCEPTED, **kwargs)])
+
+    def record_dismissed(self, source_user_id: str, target_user_id: str, **kwargs) -> None:
+        """Record that a recommendation was dismissed."""
+        self.record([FeedbackEvent(source_user_id, target_user_id, FEEDBACK_DISMISSED, **kwargs)])
+
+    def has_seen(self, source_user_id: str, target_user_id: str) -> bool:
+        """Check whether a pair was probably already shown/accepted/dismissed.
+
+        False positives are possible at the configured error rate; false
+        negatives are not.
+        """
+        bloom = self._filters.get(source_user_id)
+        return bloom is not None and target_user_id in bloom
+
+    def filter_unseen(self, source_user_id: str, target_user_ids: List[str]) -> List[str]:
+        """Return only the targets not yet seen by a source user."""
+        bloom = self._filters.get(source_user_id)
+        if bloom is None:
+            return list(target_user_ids)
+        return [t for t in target_user_ids if t not in bloom]
+
+    def iter_events(self, start: int = 0) -> Iterable[FeedbackEvent]:
+        """Iterate over the recorded feedback history, optionally from a byte offset."""
+        if not os.path.exists(self.events_path):
+            return
+        with open(self.events_path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield FeedbackEvent(**json.loads(line.decode('utf-8')))
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Whether any filter is over capacity and should be resized."""
+        return any(bloom.is_saturated for bloom in self._filters.values())
+
+    def save(self) -> None:
+        """Persist the current filters with the log size they cover."""
+        tmp_path = self.filters_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'log_offset': self._log_size(),
+                       'filters': {source: bloom.to_dict() for source, bloom in self._filters.items()}}, f)
+        os.replace(tmp_path, self.filters_path)
+
+    def compact(self) -> Dict[str, int]:
+        """Rewrite the history keeping the latest event per pair and rebuild filters.
+
+        Returns:
+            Dictionary with events before/after compaction and filter count
+        """
+        latest: Dict[tuple, FeedbackEvent] = {}
+        events_before = 0
+        for event in self.iter_events():
+            events_before += 1
+            latest[(event.source_discord_user_id, event.target_discord_user_id)] = event
+
+        tmp_path = self.events_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for event in latest.values():
+                f.write(json.dumps(event.to_dict()) + "\n")
+        os.replace(tmp_path, self.events_path)
+
+        self._rebuild_filters(latest.values())
+        self.save()
+
+        stats = {'events_before': events_before, 'events_after': len(latest), 'filters': len(self._filters)}
+        logger.info(f"Compacted feedback store: {stats}")
+        return stats
@@ -0,0 +1,151 @@
+"""
+Field-Level Profile Embeddings for CommunityCatalyst
+==================================================
+
+Embeds skills, interests, projects and about-me separately instead of one
+combined profile string. Each field vector is cached by the hash of its
+text, so editing a skill re-encodes only the short skills text, and field
+weights are applied at query time (late fusion) so they can be tuned
+without re-embedding anything.
+
+Fused similarity is the weighted mean of per-field cosine similarities,
+computed in a single product over weight-scaled, concatenated field
+vectors:
+
+    S = [sqrt(w_f) * A_f]_f . [sqrt(w_f) * B_f]_f^T / sum(w_f)
+      = sum_f w_f * cos(A_f, B_f) / sum(w_f)
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from community_catalyst_ai import ProfileEmbeddingEngine, UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = ('skills', 'interests', 'projects', 'about')
+
+
+class FieldEmbeddingCache:
+    """Bounded LRU cache of field vectors keyed by (field, text hash)."""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], np.ndarray]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(field: str, text: str) -> Tuple[str, str]:
+        return field, hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def get(self, field: str, text: str) -> Optional[np.ndarray]:
+        key = self.key(field, text)
+        vector = self._entries.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return vector
+
+    def put(self, field: str, text: str, vector: np.ndarray) -> None:
+        key = self.key(field, text)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FieldEmbeddingEngine:
+    """Per-field profile embeddings with cached vectors and weighted late fusion."""
+
+    def __init__(self,
+                 embedding_engine: 'ProfileEmbeddingEngine',
+                 field_weights: Optional[Dict[str, float]] = None,
+                 cache: Optional[FieldEmbeddingCache] = None):
+        """Initialize the engine.
+
+        Args:
+            embedding_engine: Engine whose encode_texts() encodes field texts
+            field_weights: Weight per field name (see PROFILE_FIELDS)
+            cache: Field vector cache (a new one is created if omitted)
+        """
+        self.embedding_engine = embedding_engine
+        self.cache = cache or FieldEmbeddingCache()
+        self.field_weights: Dict[str, float] = {}
+        self.set_weights(field_weights or {field: 1.0 for field in PROFILE_FIELDS})
+        self.encoded_texts = 0
+
+    def set_weights(self, field_weights: Dict[str, float]) -> None:
+        """Change field weights; takes effect at the next query, no re-embedding."""
+        unknown = set(field_weights) - set(PROFILE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {sorted(unknown)}")
+        if any(w < 0 for w in field_weights.values()) or sum(field_weights.values()) <= 0:
+            raise ValueError("Field weights must be non-negative with a positive sum")
+        self.field_weights = {field: float(field_weights.get(field, 0.0)) for field in PROFILE_FIELDS}
+
+    def embed_fields(self, profiles: List['UserProfile']) -> Dict[str, np.ndarray]:
+        """Return per-field, L2-normalised embedding matrices for the profiles.
+
+        Only texts missing from the cache are encoded (one batch per field);
+        empty fields get a zero vector so they contribute nothing.
+
+        Returns:
+            {field: (len(profiles), dim) array}
+        """
+        field_texts = [p.field_texts() for p in profiles]
+        result: Dict[str, np.ndarray] = {}
+        dim = None
+
+        for field in PROFILE_FIELDS:
+            if self.field_weights[field] == 0:
+                continue
+            texts = [ft[field].strip() for ft in field_texts]
+            vectors: List[Optional[np.ndarray]] = [self.cache.get(field, t) if t else None for t in texts]
+
+            missing = sorted({t for t, v in zip(texts, vectors) if t and v is None})
+            if missing:
+                encoded = np.asarray(self.embedding_engine.encode_texts(missing), dtype=np.float32)
+                norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+                encoded = encoded / np.where(norms > 0, norms, 1.0)
+                for text, vector in zip(missing, encoded):
+                    self.cache.put(field, text, vector)
+                self.encoded_texts += len(missing)
+                lookup = dict(zip(missing, encoded))
+                vectors = [lookup.get(t, v) if v is None else v for t, v in zip(texts, vectors)]
+
+            if dim is None:
+                known = next((v for v in vectors if v is not None), None)
+                dim = known.shape[0] if known is not None else self.embedding_engine.get_embedding_dimension()
+            zeros = np.zeros(dim, dtype=np.float32)
+            result[field] = np.vstack([v if v is not None else zeros for v in vectors]) if vectors else np.zeros((0, dim))
+
+        return result
+
+    def _fused_matrix(self, fields: Dict[str, np.ndarray]) -> np.ndarray:
+        """Concatenate sqrt(weight)-scaled field matrices into one (n, F * dim) matrix."""
+        return np.hstack([np.sqrt(self.field_weights[f]) * fields[f] for f in PROFILE_FIELDS if f in fields])
+
+    def similarity(self, source_profiles: List['UserProfile'],
+                   target_profiles: List['UserProfile']) -> np.ndarray:
+        """Weighted late-fusion similarity between two sets of profiles.
+
+        Returns:
+            (len(sources), len(targets)) array of weighted mean field cosines
+        """
+        if not source_profiles or not target_profiles:
+            return np.zeros((len(source_profiles), len(target_profiles)))
+        source = self._fused_matrix(self.embed_fields(source_profiles))
+        target = self._fused_matrix(self.embed_fields(target_profiles))
+        return (source @ target.T) / sum(self.field_weights.values())
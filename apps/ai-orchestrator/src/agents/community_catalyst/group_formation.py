@@ -0,0 +1,161 @@
+"""
+Balanced Group Formation for CommunityCatalyst
+============================================
+
+Partitions members into groups of a target size (sizes differ by at most
+one) while keeping similar members together.
+
+1. Recursive balanced bisection: each set is split in two by a short
+   balanced 2-means run, cut at exactly the required sizes along the
+   direction between the two centroids. O(n * dim * log(groups)).
+2. Swap refinement: for groups with nearby centroids, the best member swap
+   is applied while it increases total intra-group similarity, until no
+   swap helps or the time limit is reached.
+
+With unit-length embeddings and group vector sum ``s_g``, the sum of
+pairwise cosine similarities in a group is ``(|s_g|^2 - |g|) / 2``, so a
+swap's gain is computed from the two sums without touching other members.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+def group_sizes(n: int, target_size: int) -> List[int]:
+    """Sizes of ceil(n / target_size) groups that differ by at most one."""
+    if target_size <= 0:
+        raise ValueError("target_size must be positive")
+    if n == 0:
+        return []
+    k = math.ceil(n / target_size)
+    return [n // k + (1 if i < n % k else 0) for i in range(k)]
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1.0)
+
+
+def _bisect(x: np.ndarray, indices: np.ndarray, sizes: List[int],
+            rng: np.random.Generator, iterations: int) -> List[np.ndarray]:
+    """Split ``indices`` into len(sizes) groups of the given sizes."""
+    if len(sizes) == 1:
+        return [indices]
+    left_sizes, right_sizes = sizes[:len(sizes) // 2], sizes[len(sizes) // 2:]
+    n_left = sum(left_sizes)
+
+    points = x[indices]
+    centroids = points[rng.choice(len(points), size=2, replace=False)]
+    in_left = None
+    for _ in range(iterations):
+        # Balanced 2-means: cut at the required size along the centroid difference
+        projection = points @ (centroids[0] - centroids[1])
+        new_in_left = np.zeros(len(points), dtype=bool)
+        new_in_left[np.argpartition(-projection, n_left - 1)[:n_left]] = True
+        if in_left is not None and np.array_equal(new_in_left, in_left):
+            break
+        in_left = new_in_left
+        centroids = np.stack([points[in_left].mean(axis=0), points[~in_left].mean(axis=0)])
+
+    return (_bisect(x, indices[in_left], left_sizes, rng, iterations)
+            + _bisect(x, indices[~in_left], right_sizes, rng, iterations))
+
+
+def _nearest_groups(centroids: np.ndarray, m: int, chunk_size: int = 1024) -> np.ndarray:
+    """Indices of each group's m nearest other groups, computed in chunks."""
+    k = len(centroids)
+    m = min(m, k - 1)
+    nearest = np.empty((k, m), dtype=np.int64)
+    for start in range(0, k, chunk_size):
+        sims = centroids[start:start + chunk_size] @ centroids.T
+        sims[np.arange(len(sims)), np.arange(start, start + len(sims))] = -np.inf
+        nearest[start:start + len(sims)] = np.argpartition(-sims, m - 1, axis=1)[:, :m]
+    return nearest
+
+
+def _best_swap(x: np.ndarray, a: np.ndarray, b: np.ndarray, sum_a: np.ndarray, sum_b: np.ndarray):
+    """Best (gain, i, j) for swapping a[i] with b[j], gain in summed intra-group |s|^2."""
+    xa, xb = x[a], x[b]
+    cross = xa @ xb.T
+    # |s_a - x_i + x_j|^2 - |s_a|^2 = 2 s_a.(x_j - x_i) + 2 - 2 x_i.x_j, and symmetrically for b
+    gain = (2 * (xb @ sum_a)[None, :] - 2 * (xa @ sum_a)[:, None]
+            + 2 * (xa @ sum_b)[:, None] - 2 * (xb @ sum_b)[None, :]
+            + 4 - 4 * cross)
+    i, j = np.unravel_index(int(np.argmax(gain)), gain.shape)
+    return float(gain[i, j]), int(i), int(j)
+
+
+def form_balanced_groups(embeddings: np.ndarray,
+                         target_size: int,
+                         time_limit_seconds: float = 5.0,
+                         neighbor_groups: int = 4,
+                         bisect_iterations: int = 10,
+                         seed: int = 0) -> Dict[str, Any]:
+    """Partition rows of ``embeddings`` into balanced, cohesive groups.
+
+    Args:
+        embeddings: (n, dim) member embeddings
+        target_size: Desired group size (actual sizes differ by at most one)
+        time_limit_seconds: Wall-clock limit; refinement stops there (the initial
+            balanced partition is always completed)
+        neighbor_groups: Nearest groups (by centroid) considered for swaps
+        bisect_iterations: 2-means iterations per bisection
+        seed: Random seed (same seed, same result)
+
+    Returns:
+        Dictionary with 'groups' (lists of row indices), 'cohesion' (mean
+        pairwise cosine per group), 'swaps' and 'timed_out'
+    """
+    start = time.perf_counter()
+    x = _normalize(embeddings)
+    n = len(x)
+    sizes = group_sizes(n, target_size)
+    if not sizes:
+        return {'groups': [], 'cohesion': [], 'swaps': 0, 'timed_out': False}
+
+    rng = np.random.default_rng(seed)
+    groups = _bisect(x, np.arange(n), sizes, rng, bisect_iterations) if len(sizes) > 1 else [np.arange(n)]
+    groups = [g.copy() for g in groups]
+    sums = np.stack([x[g].sum(axis=0) for g in groups])
+
+    swaps, timed_out = 0, False
+    improved = len(groups) > 1
+    while improved:
+        improved = False
+        neighbours = _nearest_groups(_normalize(sums), neighbor_groups)
+        for ga in range(len(groups)):
+            for gb in neighbours[ga]:
+                if gb <= ga and ga in neighbours[gb]:
+                    continue  # pair already visited from the other side
+                if time.perf_counter() - start > time_limit_seconds:
+                    timed_out = True
+                    break
+                gain, i, j = _best_swap(x, groups[ga], groups[gb], sums[ga], sums[gb])
+                if gain > 1e-6:
+                    mi, mj = groups[ga][i], groups[gb][j]
+                    groups[ga][i], groups[gb][j] = mj, mi
+                    sums[ga] += x[mj] - x[mi]
+                    sums[gb] += x[mi] - x[mj]
+                    swaps += 1
+                    improved = True
+            if timed_out:
+                break
+        if timed_out:
+            break
+
+    cohesion = []
+    for g, s in zip(groups, sums):
+        pairs = len(g) * (len(g) - 1) / 2
+        cohesion.append(float((s @ s - len(g)) / 2 / pairs) if pairs else 1.0)
+
+    logger.info(f"Formed {len(groups)} groups from {n} members with {swaps} refinement swaps "
+                f"in {time.perf_counter() - start:.2f}s{' (time limit reached)' if timed_out else ''}")
+    return {'groups': [g.tolist() for g in groups], 'cohesion': cohesion, 'swaps': swaps, 'timed_out': timed_out}
@@ -0,0 +1,306 @@
+"""
+Per-Guild Residency Cache for CommunityCatalyst
+=============================================
+
+Keeps only recently used guilds in memory. A guild's profiles, embeddings
+and top-k index are loaded from persistent storage on first use and the
+least recently used guilds are evicted once the estimated resident size
+exceeds the memory budget.
+
+Layout on disk (inside ``storage_dir``), per guild:
+    <guild_id>.meta.json             {"dim": embedding dimension, "version": v}
+    <guild_id>.v<v>.profiles.jsonl   profile records, one per line
+    <guild_id>.v<v>.embeddings.f32   raw float32 rows, aligned with profiles
+
+The meta file names the current data version (files without a version
+number are version 0). ``GuildDataStore.save`` writes a new version and
+switches to it by replacing the meta file, so readers see either the old
+or the new guild, never a mix.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from community_catalyst_ai import UserProfile
+from config import GuildCacheConfig
+from incremental_topk import IncrementalTopKIndex
+
+
+logger = logging.getLogger(__name__)
+
+# Rough per-object overheads used by GuildData.estimate_nbytes
+_TOPK_ENTRY_BYTES = 120   # dict slot + float + reverse-index set entry
+_PROFILE_OVERHEAD_BYTES = 600
+
+
+@dataclass
+class GuildData:
+    """Everything resident for one guild."""
+    guild_id: str
+    profiles: List[UserProfile]
+    embeddings: np.ndarray
+    index: Optional[IncrementalTopKIndex] = None
+
+    def estimate_nbytes(self) -> int:
+        """Approximate resident size: arrays exactly, Python objects by rule of thumb."""
+        total = self.embeddings.nbytes
+        for profile in self.profiles:
+            total += _PROFILE_OVERHEAD_BYTES + 2 * len(profile.to_profile_text())
+        if self.index is not None and self.index._embeddings is not None:
+            total += self.index._embeddings.nbytes
+            total += len(self.index) * self.index.k * _TOPK_ENTRY_BYTES
+        return total
+
+
+class GuildDataStore:
+    """Persistent per-guild profiles and embeddings on local disk.
+
+    Files are append-only so bulk ingestion can add chunks without rewriting
+    a guild; when a user appears more than once the last record wins on load,
+    and users whose last record is opted out are not loaded.
+    """
+
+    def __init__(self, storage_dir: str):
+        self.storage_dir = storage_dir
+        os.makedirs(storage_dir, exist_ok=True)
+
+    def _read_meta(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        meta_path = os.path.join(self.storage_dir, f"{guild_id}.meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _paths(self, guild_id: str, version: Optional[int] = None) -> Dict[str, str]:
+        """Data files of ``version`` (default: the version named by the meta file)."""
+        if version is None:
+            version = (self._read_meta(guild_id) or {}).get('version', 0)
+        base = os.path.join(self.storage_dir, f"{guild_id}.v{version}" if version else guild_id)
+        return {'profiles': f"{base}.profiles.jsonl",
+                'embeddings': f"{base}.embeddings.f32",
+                'meta': os.path.join(self.storage_dir, f"{guild_id}.meta.json")}
+
+    def exists(self, guild_id: str) -> bool:
+        return all(os.path.exists(p) for p in self._paths(guild_id).values())
+
+    def dimension(self, guild_id: str) -> Optional[int]:
+        """Stored embedding dimension, or None if the guild has no data yet."""
+        meta = self._read_meta(guild_id)
+        return None if meta is None else int(meta['dim'])
+
+    def save(self, guild_id: str, profiles: List[UserProfile], embeddings: np.ndarray) -> None:
+        """Replace a guild's stored profiles and embeddings atomically.
+
+        The data is written as a new version and becomes current with a
+        single replace of the meta file; the previous version is then deleted.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(profiles) != len(embeddings):
+            raise ValueError("Mismatch between profiles and embeddings lengths")
+        meta = self._read_meta(guild_id)
+        old_paths = self._paths(guild_id) if meta is not None else None
+        version = (meta or {}).get('version', 0) + 1
+        paths = self._paths(guild_id, version)
+        with open(paths['embeddings'], 'wb') as f:
+            f.write(np.ascontiguousarray(embeddings).tobytes())
+        with open(paths['profiles'], 'w', encoding='utf-8') as f:
+            for profile in profiles:
+                f.write(json.dumps(asdict(profile)) + '\n')
+        with open(paths['meta'] + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'dim': embeddings.shape[1] if embeddings.ndim == 2 else 0, 'version': version}, f)
+        os.replace(paths['meta'] + '.tmp', paths['meta'])
+
+        if old_paths is not None:
+            for name in ('profiles', 'embeddings'):
+                if os.path.exists(old_paths[name]):
+                    os.remove(old_paths[name])
+
+    def append(self, guild_id: str, profiles: List[UserProfile], embeddings: np.ndarray) -> None:
+        """Append profiles and their embeddings to a guild's files."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(profiles) != len(embeddings):
+            raise ValueError("Mismatch between profiles and embeddings lengths")
+        paths = self._paths(guild_id)
+        dim = self.dimension(guild_id)
+        if dim is None:
+            dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+            with open(paths['meta'], 'w', encoding='utf-8') as f:
+                json.dump({'dim': dim}, f)
+        elif len(embeddings) and embeddings.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match stored dimension {dim}")
+
+        # Embeddings first: on load, rows beyond the profile count are ignored
+        with open(paths['embeddings'], 'ab') as f:
+            f.write(np.ascontiguousarray(embeddings).tobytes())
+        with open(paths['profiles'], 'a', encoding='utf-8') as f:
+            for profile in profiles:
+                f.write(json.dumps(asdict(profile)) + '\n')
+
+    def file_sizes(self, guild_id: str) -> Dict[str, int]:
+        """Current byte size of each data file (0 if missing), for checkpoints."""
+        paths = self._paths(guild_id)
+        return {name: os.path.getsize(paths[name]) if os.path.exists(paths[name]) else 0
+                for name in ('profiles', 'embeddings')}
+
+    def truncate(self, guild_id: str, sizes: Dict[str, int]) -> None:
+        """Roll a guild's files back to sizes recorded by file_sizes()."""
+        paths = self._paths(guild_id)
+        for name, size in sizes.items():
+            if os.path.exists(paths[name]):
+                with open(paths[name], 'r+b') as f:
+                    f.truncate(size)
+
+    def load(self, guild_id: str) -> GuildData:
+        """Read a guild's profiles and embeddings.
+
+        Raises:
+            KeyError: If the guild has no stored data
+        """
+        if not self.exists(guild_id):
+            raise KeyError(f"No stored data for guild {guild_id}")
+        paths = self._paths(guild_id)
+        with open(paths['profiles'], 'r', encoding='utf-8') as f:
+            profiles = [UserProfile(**json.loads(line)) for line in f if line.strip()]
+        dim = self.dimension(guild_id)
+        if dim:
+            flat = np.fromfile(paths['embeddings'], dtype=np.float32)
+            embeddings = flat[:len(flat) // dim * dim].reshape(-1, dim)[:len(profiles)]
+        else:
+            embeddings = np.zeros((len(profiles), 0), dtype=np.float32)
+        profiles = profiles[:len(embeddings)]
+
+        # Last record per user wins; a latest record that is opted out (consent
+        # revoked, e.g. an ingestion tombstone) hides the user entirely
+        latest = {p.discord_user_id: i for i, p in enumerate(profiles)}
+        keep = sorted(i for i in latest.values() if profiles[i].consent_status == "opted_in")
+        if len(keep) < len(profiles):
+            profiles = [profiles[i] for i in keep]
+            embeddings = embeddings[keep]
+        return GuildData(guild_id, profiles, embeddings)
+
+
+class GuildCacheManager:
+    """LRU residency of guild data under a memory budget."""
+
+    def __init__(self,
+                 loader: Callable[[str], GuildData],
+                 memory_budget_bytes: int = 512 * 1024 * 1024,
+                 top_k: Optional[int] = 5,
+                 embedding_engine: Optional[Any] = None):
+        """Initialize the cache.
+
+        Args:
+            loader: Loads a guild from persistent storage (e.g. GuildDataStore.load)
+            memory_budget_bytes: Estimated resident size above which guilds are evicted
+            top_k: Build an IncrementalTopKIndex of this k on load (None = no index)
+            embedding_engine: Passed to built indexes for upsert_profile
+        """
+        if memory_budget_bytes <= 0:
+            raise ValueError("memory_budget_bytes must be positive")
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self.top_k = top_k
+        self.embedding_engine = embedding_engine
+        self._resident: 'OrderedDict[str, GuildData]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'load_seconds': 0.0}
+
+    @classmethod
+    def from_config(cls, config: GuildCacheConfig, store: Optional[GuildDataStore] = None,
+                    **kwargs) -> 'GuildCacheManager':
+        """Create a cache over ``config.storage_dir`` bounded by ``config.memory_budget_mb``.
+
+        Args:
+            config: Guild cache settings
+            store: Existing store to load from (default: a GuildDataStore on config.storage_dir)
+            **kwargs: Passed through (top_k, embedding_engine)
+        """
+        store = store or GuildDataStore(config.storage_dir)
+        return cls(store.load, memory_budget_bytes=config.memory_budget_mb * 1024 * 1024, **kwargs)
+
+    def _load(self, guild_id: str) -> GuildData:
+        start = time.perf_counter()
+        data = self.loader(guild_id)
+        if data.index is None and self.top_k and len(data.profiles):
+            opted_in = [i for i, p in enumerate(data.profiles) if p.consent_status == "opted_in"]
+            data.index = IncrementalTopKIndex(k=self.top_k, embedding_engine=self.embedding_engine,
+                                              initial_capacity=max(16, len(opted_in)))
+            data.index.build([data.profiles[i].discord_user_id for i in opted_in],
+                             data.embeddings[opted_in], [data.profiles[i] for i in opted_in])
+        self.stats['load_seconds'] += time.perf_counter() - start
+        return data
+
+    def _evict_over_budget(self, keep: str) -> None:
+        """Evict least recently used guilds until under budget (never ``keep``)."""
+        while self.resident_bytes > self.memory_budget_bytes and len(self._resident) > 1:
+            guild_id = next(g for g in self._resident if g != keep)
+            del self._resident[guild_id]
+            self._sizes.pop(guild_id)
+            self.stats['evictions'] += 1
+            logger.debug(f"Evicted guild {guild_id} from memory")
+        if self.resident_bytes > self.memory_budget_bytes:
+            logger.warning(f"Guild {keep} alone ({self._sizes[keep]} bytes) exceeds the "
+                           f"{self.memory_budget_bytes} byte memory budget")
+
+    def get(self, guild_id: str) -> GuildData:
+        """Return a guild's resident data, loading it on a miss."""
+        with self._lock:
+            data = self._resident.get(guild_id)
+            if data is not None:
+                self._resident.move_to_end(guild_id)
+                self.stats['hits'] += 1
+                return data
+            load_lock = self._load_locks.setdefault(guild_id, threading.Lock())
+
+        # Load outside the main lock so hot guilds stay fast during a cold load
+        with load_lock:
+            with self._lock:
+                data = self._resident.get(guild_id)
+                if data is not None:  # another thread loaded it meanwhile
+                    self._resident.move_to_end(guild_id)
+                    self.stats['hits'] += 1
+                    return data
+                self.stats['misses'] += 1
+            data = self._load(guild_id)
+            with self._lock:
+                self._resident[guild_id] = data
+                self._sizes[guild_id] = data.estimate_nbytes()
+                self._evict_over_budget(keep=guild_id)
+                self._load_locks.pop(guild_id, None)
+        return data
+
+    def get_index(self, guild_id: str) -> Optional[IncrementalTopKIndex]:
+        """The guild's top-k index, for RecommendationEngine.generate_recommendations_from_index."""
+        return self.get(guild_id).index
+
+    def invalidate(self, guild_id: str) -> None:
+        """Drop a guild so the next access reloads it from storage."""
+        with self._lock:
+            if self._resident.pop(guild_id, None) is not None:
+                self._sizes.pop(guild_id)
+
+    def __contains__(self, guild_id: str) -> bool:
+        return guild_id in self._resident
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters plus current residency."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(self.stats,
+                    hit_rate=self.stats['hits'] / lookups if lookups else 0.0,
+                    resident_guilds=len(self._resident),
+                    resident_bytes=self.resident_bytes,
+                    memory_budget_bytes=self.memory_budget_bytes)
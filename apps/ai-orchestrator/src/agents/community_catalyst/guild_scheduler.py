@@ -0,0 +1,239 @@
+"""
+Guild Refresh Scheduler for CommunityCatalyst
+===========================================
+
+Moves embedding and top-k work out of the request path. Each registered
+guild gets a warm snapshot (an IncrementalTopKIndex) that is refreshed on
+a cadence; online requests only ever read snapshots.
+
+Guilds are refreshed in priority order, where priority grows with
+staleness, recent activity and the share of members whose profiles
+changed. Each ``run_pending`` call respects a CPU-time budget, skipping
+guilds whose estimated cost no longer fits (the first due guild always
+runs). When only a small fraction of a guild changed, a copy of the
+snapshot is patched incrementally instead of rebuilt. Either way the new
+snapshot replaces the old one only once it is complete, so readers never
+see a half-refreshed guild.
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from community_catalyst_ai import ConnectionRecommendation, RecommendationEngine, UserProfile
+from config import SchedulerConfig
+from incremental_topk import IncrementalTopKIndex
+
+
+logger = logging.getLogger(__name__)
+
+ProfileLoader = Callable[[str], List[UserProfile]]
+
+
+@dataclass
+class GuildState:
+    """Scheduling state and warm snapshot for one guild."""
+    guild_id: str
+    index: Optional[IncrementalTopKIndex] = None
+    last_refresh: Optional[float] = None
+    activity: int = 0
+    changed_users: Set[str] = field(default_factory=set)
+    cpu_seconds_per_profile: Optional[float] = None
+    num_profiles: int = 0
+
+
+class GuildRefreshScheduler:
+    """Refreshes per-guild embeddings and top-k snapshots under a CPU budget."""
+
+    def __init__(self,
+                 engine: RecommendationEngine,
+                 profile_loader: ProfileLoader,
+                 config: Optional[SchedulerConfig] = None,
+                 top_k: int = 5,
+                 clock: Callable[[], float] = time.time):
+        """Initialize the scheduler.
+
+        Args:
+            engine: Recommendation engine (its embedding engine does the encoding)
+            profile_loader: Returns the current profiles of a guild from storage
+            config: Cadence, budget and priority weights
+            top_k: Neighbours kept per member in each snapshot
+            clock: Wall-clock source (injectable for tests)
+        """
+        self.engine = engine
+        self.profile_loader = profile_loader
+        self.config = config or SchedulerConfig()
+        self.top_k = top_k
+        self._clock = clock
+        self._guilds: Dict[str, GuildState] = {}
+        self._lock = threading.Lock()
+
+    # Event intake
+
+    def register_guild(self, guild_id: str) -> None:
+        with self._lock:
+            self._guilds.setdefault(guild_id, GuildState(guild_id))
+
+    def record_activity(self, guild_id: str, events: int = 1) -> None:
+        """Count user activity (messages, commands) that raises refresh priority."""
+        with self._lock:
+            self._guilds.setdefault(guild_id, GuildState(guild_id)).activity += events
+
+    def mark_changed(self, guild_id: str, user_ids: List[str]) -> None:
+        """Record profile changes to pick up at the guild's next refresh."""
+        with self._lock:
+            self._guilds.setdefault(guild_id, GuildState(guild_id)).changed_users.update(user_ids)
+
+    # Prioritisation
+
+    def priority(self, state: GuildState, now: float) -> float:
+        """Refresh priority; guilds without a snapshot always come first."""
+        if state.index is None:
+            return math.inf
+        cadence = self.config.refresh_cadence_minutes * 60.0
+        staleness = (now - state.last_refresh) / cadence if cadence > 0 else 0.0
+        change_ratio = len(state.changed_users) / max(1, state.num_profiles)
+        return (staleness
+                + self.config.activity_weight * math.log1p(state.activity)
+                + self.config.change_weight * change_ratio)
+
+    def is_due(self, state: GuildState, now: float) -> bool:
+        if state.index is None or state.changed_users:
+            return True
+        return now - state.last_refresh >= self.config.refresh_cadence_minutes * 60.0
+
+    def estimated_cost(self, state: GuildState) -> float:
+        """Estimated CPU seconds for the next refresh, from the previous run."""
+        if state.cpu_seconds_per_profile is None:
+            return 0.0
+        if self._is_incremental(state):
+            return state.cpu_seconds_per_profile * len(state.changed_users)
+        return state.cpu_seconds_per_profile * state.num_profiles
+
+    def _is_incremental(self, state: GuildState) -> bool:
+        return (state.index is not None and 0 < len(state.changed_users)
+                <= self.config.incremental_refresh_fraction * max(1, state.num_profiles))
+
+    # Refresh work
+
+    def _refresh(self, state: GuildState) -> Dict[str, Any]:
+        with self._lock:
+            incremental = self._is_incremental(state)
+            changed = set(state.changed_users)
+            state.changed_users.clear()
+            state.activity = 0
+            current = state.index
+
+        profiles = self.profile_loader(state.guild_id)
+        opted_in = [p for p in profiles if p.consent_status == "opted_in"]
+
+        if incremental:
+            by_id = {p.discord_user_id: p for p in profiles}
+            # Patch a copy; readers keep using the current snapshot meanwhile
+            index = current.copy()
+            for user_id in changed:
+                profile = by_id.get(user_id)
+                if profile is None:
+                    index.remove(user_id)
+                else:
+                    index.upsert_profile(profile)
+            work_items = len(changed)
+        else:
+            index = IncrementalTopKIndex(k=self.top_k, embedding_engine=self.engine.embedding_engine)
+            if opted_in:
+                embeddings = np.vstack(self.engine.embedding_engine.create_embeddings_batch(opted_in))
+                index.build([p.discord_user_id for p in opted_in], embeddings, opted_in)
+            work_items = len(opted_in)
+
+        with self._lock:
+            state.index = index
+            state.num_profiles = len(opted_in)
+        return {'guild_id': state.guild_id, 'mode': 'incremental' if incremental else 'full',
+                'profiles': len(opted_in), 'work_items': work_items}
+
+    def refresh_guild(self, guild_id: str) -> Dict[str, Any]:
+        """Refresh one guild now, regardless of priority and budget."""
+        with self._lock:
+            state = self._guilds.setdefault(guild_id, GuildState(guild_id))
+        start = time.process_time()
+        result = self._refresh(state)
+        cpu = time.process_time() - start
+        if result['work_items']:
+            state.cpu_seconds_per_profile = cpu / result['work_items']
+        state.last_refresh = self._clock()
+        result['cpu_seconds'] = cpu
+        return result
+
+    def run_pending(self, cpu_budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Refresh due guilds in priority order within a CPU-time budget.
+
+        A guild whose estimated cost exceeds the remaining budget is skipped
+        (a cheaper one may still fit); the first refresh of an unknown-cost
+        guild always runs if any budget is left. The first due guild always
+        runs, even if it alone exceeds the budget, so a guild that is too
+        large for one budget still refreshes once its growing staleness puts
+        it first.
+
+        Returns:
+            Summary of refreshed and skipped guilds and CPU time used
+        """
+        budget = self.config.cpu_budget_seconds if cpu_budget_seconds is None else cpu_budget_seconds
+        now = self._clock()
+        with self._lock:
+            due = [s for s in self._guilds.values() if self.is_due(s, now)]
+        due.sort(key=lambda s: self.priority(s, now), reverse=True)
+
+        used = 0.0
+        refreshed, skipped = [], []
+        for state in due:
+            remaining = budget - used
+            if refreshed and (remaining <= 0 or self.estimated_cost(state) > remaining):
+                skipped.append(state.guild_id)
+                continue
+            result = self.refresh_guild(state.guild_id)
+            used += result['cpu_seconds']
+            refreshed.append(result)
+
+        summary = {'refreshed': refreshed, 'skipped': skipped, 'cpu_seconds_used': used, 'cpu_budget_seconds': budget}
+        logger.info(f"Guild refresh: {len(refreshed)} refreshed, {len(skipped)} deferred, "
+                    f"{used:.2f}/{budget:.2f} CPU s")
+        return summary
+
+    def run_forever(self, stop_event: threading.Event, tick_seconds: float = 60.0) -> None:
+        """Call run_pending every tick until stop_event is set (run in a background thread)."""
+        while not stop_event.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Guild refresh tick failed: {e}")
+            stop_event.wait(tick_seconds)
+
+    # Online reads
+
+    def get_snapshot(self, guild_id: str) -> Optional[IncrementalTopKIndex]:
+        with self._lock:
+            state = self._guilds.get(guild_id)
+            return state.index if state else None
+
+    def get_recommendations(self, guild_id: str, user_id: str,
+                            top_n: Optional[int] = None,
+                            min_similarity: float = 0.1,
+                            campaign_id: Optional[str] = None) -> List[ConnectionRecommendation]:
+        """Serve recommendations from the warm snapshot only.
+
+        Never computes embeddings in the request path; a guild without a
+        snapshot returns no recommendations and is counted as activity so it
+        is refreshed first on the next tick.
+        """
+        index = self.get_snapshot(guild_id)
+        if index is None:
+            self.record_activity(guild_id)
+            return []
+        return self.engine.generate_recommendations_from_index(
+            index, user_id, top_n=top_n, min_similarity=min_similarity, campaign_id=campaign_id
+        )
@@ -0,0 +1,295 @@
+"""
+Incremental Top-K Maintenance for CommunityCatalyst
+=================================================
+
+Keeps every member's top-k most similar members up to date as profiles
+change, without batch reruns. Alongside each member's top-k list the index
+keeps a reverse index (who currently lists a given member), so a profile
+update costs one matrix-vector product against the pool plus targeted
+patches:
+
+- the updated member's own list is rebuilt from that product;
+- members who already list them get the new score patched in place, and
+  are only fully re-scored if the score dropped (they may fall out);
+- members who don't list them yet get them inserted if the new score beats
+  their current k-th best.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from community_catalyst_ai import ProfileEmbeddingEngine, UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalTopKIndex:
+    """Per-member top-k neighbour lists with a reverse neighbour index."""
+
+    def __init__(self, k: int = 5,
+                 embedding_engine: Optional['ProfileEmbeddingEngine'] = None,
+                 initial_capacity: int = 1024):
+        """Create an empty index.
+
+        Args:
+            k: Neighbours kept per member
+            embedding_engine: Used by upsert_profile to embed changed profiles
+            initial_capacity: Pre-allocated embedding rows (grows by doubling)
+        """
+        if k <= 0:
+            raise ValueError("k must be positive")
+        self.k = k
+        self.embedding_engine = embedding_engine
+        self._capacity = initial_capacity
+        self._embeddings: Optional[np.ndarray] = None
+        self._active = np.zeros(initial_capacity, dtype=bool)
+        self._kth = np.full(initial_capacity, -np.inf, dtype=np.float32)  # k-th best score, -inf if list not full
+        self._slot_of: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free_slots: List[int] = []
+        self._topk: Dict[int, Dict[int, float]] = {}
+        self._reverse: Dict[int, Set[int]] = {}
+        self.profiles: Dict[str, 'UserProfile'] = {}
+        self.stats = {'updates': 0, 'rows_rescored': 0, 'lists_patched': 0}
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._slot_of
+
+    def copy(self) -> 'IncrementalTopKIndex':
+        """Independent copy (sharing only the embedding engine) to patch while readers use this one."""
+        clone = IncrementalTopKIndex(self.k, self.embedding_engine, initial_capacity=0)
+        clone._capacity = self._capacity
+        clone._embeddings = None if self._embeddings is None else self._embeddings.copy()
+        clone._active = self._active.copy()
+        clone._kth = self._kth.copy()
+        clone._slot_of = dict(self._slot_of)
+        clone._ids = list(self._ids)
+        clone._free_slots = list(self._free_slots)
+        clone._topk = {slot: dict(entries) for slot, entries in self._topk.items()}
+        clone._reverse = {slot: set(listers) for slot, listers in self._reverse.items()}
+        clone.profiles = dict(self.profiles)
+        clone.stats = dict(self.stats)
+        return clone
+
+    # Storage helpers
+
+    def _ensure_storage(self, dim: int) -> None:
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self._capacity, dim), dtype=np.float32)
+        elif self._embeddings.shape[1] != dim:
+            raise ValueError(f"Embedding dimension {dim} does not match index dimension {self._embeddings.shape[1]}")
+
+    def _allocate_slot(self, user_id: str) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._ids[slot] = user_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(user_id)
+            if slot >= self._capacity:
+                self._grow()
+        self._slot_of[user_id] = slot
+        self._topk[slot] = {}
+        self._reverse[slot] = set()
+        return slot
+
+    def _grow(self) -> None:
+        new_capacity = self._capacity * 2
+        embeddings = np.zeros((new_capacity, self._embeddings.shape[1]), dtype=np.float32)
+        embeddings[:self._capacity] = self._embeddings
+        self._embeddings = embeddings
+        self._active = np.concatenate([self._active, np.zeros(self._capacity, dtype=bool)])
+        self._kth = np.concatenate([self._kth, np.full(self._capacity, -np.inf, dtype=np.float32)])
+        self._capacity = new_capacity
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def _scores_against(self, vectors: np.ndarray, exclude: np.ndarray) -> np.ndarray:
+        """Cosine scores of vectors against every slot, -inf for inactive slots and ``exclude``."""
+        sims = vectors @ self._embeddings.T
+        sims[:, ~self._active] = -np.inf
+        sims[np.arange(len(exclude)), exclude] = -np.inf
+        return sims
+
+    # List maintenance
+
+    def _set_list(self, slot: int, entries: Dict[int, float]) -> None:
+        old = self._topk[slot]
+        for target in old.keys() - entries.keys():
+            self._reverse[target].discard(slot)
+        for target in entries.keys() - old.keys():
+            self._reverse[target].add(slot)
+        self._topk[slot] = entries
+        self._refresh_kth(slot)
+
+    def _refresh_kth(self, slot: int) -> None:
+        entries = self._topk[slot]
+        self._kth[slot] = min(entries.values()) if len(entries) >= self.k else -np.inf
+
+    def _list_from_scores(self, scores: np.ndarray) -> Dict[int, float]:
+        valid = int(np.isfinite(scores).sum())
+        k = min(self.k, valid)
+        if k == 0:
+            return {}
+        top = np.argpartition(-scores, k - 1)[:k]
+        return {int(t): float(scores[t]) for t in top}
+
+    def _rescore(self, slot: int) -> None:
+        scores = self._scores_against(self._embeddings[slot:slot + 1], np.array([slot]))[0]
+        self._set_list(slot, self._list_from_scores(scores))
+        self.stats['rows_rescored'] += 1
+
+    # Public API
+
+    def build(self, user_ids: List[str], embeddings: np.ndarray,
+              profiles: Optional[List['UserProfile']] = None, chunk_size: int = 1024) -> None:
+        """Bulk-load members and compute all top-k lists in chunks.
+
+        Args:
+            user_ids: discord_user_ids to index
+            embeddings: (n, dim) embedding array aligned with user_ids
+            profiles: Optional profiles kept for explanation generation
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(user_ids) != len(embeddings):
+            raise ValueError("Mismatch between embeddings and user_ids lengths")
+        if not user_ids:
+            return
+        self._ensure_storage(embeddings.shape[1])
+
+        slots = []
+        for i, user_id in enumerate(user_ids):
+            slot = self._slot_of.get(user_id)
+            if slot is None:
+                slot = self._allocate_slot(user_id)
+            self._embeddings[slot] = self._normalize(embeddings[i])
+            self._active[slot] = True
+            slots.append(slot)
+            if profiles is not None:
+                self.profiles[user_id] = profiles[i]
+
+        slots = np.array(slots)
+        for start in range(0, len(slots), chunk_size):
+            chunk = slots[start:start + chunk_size]
+            scores = self._scores_against(self._embeddings[chunk], chunk)
+            for row, slot in enumerate(chunk):
+                self._set_list(int(slot), self._list_from_scores(scores[row]))
+
+    def update(self, user_id: str, embedding: np.ndarray,
+               profile: Optional['UserProfile'] = None) -> Set[str]:
+        """Insert or update a member and patch every affected top-k list.
+
+        Args:
+            user_id: discord_user_id of the changed member
+            embedding: The member's new embedding
+            profile: Optional profile kept for explanation generation
+
+        Returns:
+            discord_user_ids whose top-k list changed (including the member)
+        """
+        embedding = self._normalize(embedding)
+        self._ensure_storage(embedding.shape[0])
+
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            slot = self._allocate_slot(user_id)
+        self._embeddings[slot] = embedding
+        self._active[slot] = True
+        if profile is not None:
+            self.profiles[user_id] = profile
+        self.stats['updates'] += 1
+
+        # One product against the pool serves both directions (cosine is symmetric)
+        sims = self._scores_against(embedding[None, :], np.array([slot]))[0]
+        self._set_list(slot, self._list_from_scores(sims))
+        affected = {slot}
+
+        # Members already listing the updated member
+        for source in list(self._reverse[slot]):
+            new_score = float(sims[source])
+            if new_score >= self._topk[source][slot]:
+                self._topk[source][slot] = new_score
+                self._refresh_kth(source)
+                self.stats['lists_patched'] += 1
+            else:
+                self._rescore(source)  # it might drop out in favour of someone else
+            affected.add(source)
+
+        # Members the updated member now enters
+        candidates = np.nonzero(sims > self._kth[:len(sims)])[0]
+        for source in candidates:
+            source = int(source)
+            if source == slot or slot in self._topk[source]:
+                continue
+            entries = dict(self._topk[source])
+            entries[slot] = float(sims[source])
+            if len(entries) > self.k:
+                del entries[min(entries, key=entries.get)]
+            self._set_list(source, entries)
+            self.stats['lists_patched'] += 1
+            affected.add(source)
+
+        return {self._ids[s] for s in affected}
+
+    def remove(self, user_id: str) -> Set[str]:
+        """Remove a member (e.g. opt-out) and refill lists that contained them.
+
+        Returns:
+            discord_user_ids whose top-k list changed
+        """
+        slot = self._slot_of.pop(user_id, None)
+        if slot is None:
+            return set()
+
+        self._active[slot] = False
+        self._set_list(slot, {})
+        sources = list(self._reverse.pop(slot))
+        for source in sources:
+            del self._topk[source][slot]
+            self._rescore(source)
+
+        del self._topk[slot]
+        self._kth[slot] = -np.inf
+        self._ids[slot] = None
+        self._free_slots.append(slot)
+        self.profiles.pop(user_id, None)
+        return {self._ids[s] for s in sources}
+
+    def upsert_profile(self, profile: 'UserProfile') -> Set[str]:
+        """Apply a profile change event: embed and update, or remove on opt-out."""
+        if profile.consent_status != "opted_in":
+            return self.remove(profile.discord_user_id)
+        if self.embedding_engine is None:
+            raise ValueError("upsert_profile requires an embedding engine")
+        embedding = self.embedding_engine.create_user_embedding(profile)
+        return self.update(profile.discord_user_id, embedding, profile)
+
+    def top_k(self, user_id: str) -> List[Tuple[str, float]]:
+        """Current top-k neighbours of a member as (discord_user_id, score), score desc."""
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            return []
+        entries = sorted(self._topk[slot].items(), key=lambda x: x[1], reverse=True)
+        return [(self._ids[t], max(0.0, score)) for t, score in entries]
+
+    def listed_by(self, user_id: str) -> List[str]:
+        """Members whose top-k list currently contains ``user_id``."""
+        slot = self._slot_of.get(user_id)
+        if slot is None:
+            return []
+        return [self._ids[s] for s in self._reverse[slot]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Maintenance counters plus index size."""
+        return dict(self.stats, members=len(self))
@@ -0,0 +1,243 @@
+"""
+Streaming Interest Statistics for CommunityCatalyst
+=================================================
+
+Maintains interest popularity incrementally as profiles change, so meetup
+topic and interest cluster suggestions don't recount every profile.
+
+- A Count-Min sketch holds approximate interest counts in fixed memory.
+  Counts may go down (profile edits, opt-outs); estimates never undercount
+  as long as true counts stay non-negative.
+- A small heavy-hitter candidate pool (a few times ``capacity`` interests)
+  is kept ranked by sketch estimate, so top-k queries cost O(pool). The
+  reserve beyond ``capacity`` lets interests move up when a leader shrinks;
+  with member tracking, the pool is refilled from every known interest on
+  the next query after a candidate's count drops, so opt-outs that reorder
+  the top-k are exact.
+- Optionally, a ring of time-bucketed sketches counts interests *added*
+  within a sliding window, for "trending" topics.
+- Optionally, exact member sets per interest are kept so clusters can list
+  their users.
+"""
+
+import hashlib
+import heapq
+import logging
+import time
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import CommunityAnalysisConfig
+
+if TYPE_CHECKING:
+    from community_catalyst_ai import UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_interest(interest: str) -> str:
+    """Canonical interest key, matching CommunityAnalyzer's counting."""
+    return interest.lower().strip()
+
+
+class CountMinSketch:
+    """Count-Min sketch supporting increments and decrements."""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        if width <= 0 or depth <= 0:
+            raise ValueError("width and depth must be positive")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)
+
+    def _columns(self, key: str) -> np.ndarray:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint64) % np.uint64(self.width)
+
+    def add(self, key: str, count: int = 1) -> None:
+        self.table[self._rows, self._columns(key)] += count
+
+    def estimate(self, key: str) -> int:
+        return int(self.table[self._rows, self._columns(key)].min())
+
+    def clear(self) -> None:
+        self.table.fill(0)
+
+
+class WindowedCountMin:
+    """Ring of Count-Min sketches, one per time bucket, summed over a window."""
+
+    def __init__(self, window_seconds: float, num_buckets: int = 12,
+                 width: int = 2048, depth: int = 4):
+        if window_seconds <= 0 or num_buckets <= 0:
+            raise ValueError("window_seconds and num_buckets must be positive")
+        self.bucket_seconds = window_seconds / num_buckets
+        self.buckets = [CountMinSketch(width, depth) for _ in range(num_buckets)]
+        self._bucket_ids = [-1] * num_buckets
+
+    def _bucket(self, timestamp: float) -> CountMinSketch:
+        bucket_id = int(timestamp // self.bucket_seconds)
+        slot = bucket_id % len(self.buckets)
+        if self._bucket_ids[slot] != bucket_id:  # slot held an expired bucket
+            self.buckets[slot].clear()
+            self._bucket_ids[slot] = bucket_id
+        return self.buckets[slot]
+
+    def add(self, key: str, count: int, timestamp: float) -> None:
+        self._bucket(timestamp).add(key, count)
+
+    def estimate(self, key: str, now: float) -> int:
+        current = int(now // self.bucket_seconds)
+        oldest = current - len(self.buckets) + 1
+        return sum(sketch.estimate(key) for sketch, bucket_id in zip(self.buckets, self._bucket_ids)
+                   if oldest <= bucket_id <= current)
+
+
+class InterestStatistics:
+    """Incrementally maintained interest counts with heavy-hitter top-k."""
+
+    def __init__(self,
+                 capacity: int = 20,
+                 width: int = 2048,
+                 depth: int = 4,
+                 track_members: bool = True,
+                 window_seconds: Optional[float] = None,
+                 window_buckets: int = 12,
+                 candidate_pool: Optional[int] = None,
+                 clock=time.time):
+        """Initialize the statistics.
+
+        Args:
+            capacity: Heavy-hitter candidates kept (upper bound on top-k queries)
+            width: Count-Min sketch width (error ~ total / width)
+            depth: Count-Min sketch depth (failure probability ~ e^-depth)
+            track_members: Keep exact member sets so clusters can list users
+            window_seconds: Also count interests added within this sliding window
+            window_buckets: Time buckets per window
+            candidate_pool: Heavy-hitter candidates tracked (default 4 x capacity, at least capacity)
+            clock: Time source for windowed counts
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.candidate_pool = max(capacity, candidate_pool or 4 * capacity)
+        self.sketch = CountMinSketch(width, depth)
+        self.window = WindowedCountMin(window_seconds, window_buckets, width, depth) if window_seconds else None
+        self.track_members = track_members
+        self._clock = clock
+        self._user_interests: Dict[str, FrozenSet[str]] = {}
+        self._members: Dict[str, Set[str]] = {}
+        self._candidates: Dict[str, int] = {}
+        self._window_candidates: Dict[str, int] = {}
+        self._candidates_stale = False
+
+    @classmethod
+    def from_config(cls, config: CommunityAnalysisConfig, **kwargs) -> 'InterestStatistics':
+        """Create statistics sized from CommunityAnalysisConfig."""
+        window_hours = config.trending_window_hours
+        return cls(capacity=config.max_clusters_per_analysis,
+                   width=config.interest_sketch_width,
+                   depth=config.interest_sketch_depth,
+                   window_seconds=window_hours * 3600.0 if window_hours else None,
+                   **kwargs)
+
+    # Updates
+
+    def _offer(self, candidates: Dict[str, int], key: str, estimate: int) -> None:
+        """Keep ``key`` among the top-``candidate_pool`` candidates by estimate."""
+        if key in candidates or len(candidates) < self.candidate_pool:
+            candidates[key] = estimate
+            return
+        weakest = min(candidates, key=candidates.get)
+        if estimate > candidates[weakest]:
+            del candidates[weakest]
+            candidates[key] = estimate
+
+    def _apply(self, user_id: str, interests: FrozenSet[str]) -> None:
+        old = self._user_interests.get(user_id, frozenset())
+        now = self._clock()
+        for interest in old - interests:
+            self.sketch.add(interest, -1)
+            if interest in self._candidates:
+                self._candidates[interest] = self.sketch.estimate(interest)
+                self._candidates_stale = True
+            if self.track_members:
+                members = self._members.get(interest)
+                if members is not None:
+                    members.discard(user_id)
+                    if not members:
+                        del self._members[interest]
+        for interest in interests - old:
+            self.sketch.add(interest, 1)
+            self._offer(self._candidates, interest, self.sketch.estimate(interest))
+            if self.window is not None:
+                self.window.add(interest, 1, now)
+                self._offer(self._window_candidates, interest, self.window.estimate(interest, now))
+            if self.track_members:
+                self._members.setdefault(interest, set()).add(user_id)
+
+        if interests:
+            self._user_interests[user_id] = interests
+        else:
+            self._user_interests.pop(user_id, None)
+
+    def update_profile(self, profile: 'UserProfile') -> None:
+        """Apply a profile create/edit/opt-out; only changed interests are touched."""
+        interests = frozenset()
+        if profile.consent_status == "opted_in":
+            interests = frozenset(normalize_interest(i) for i in profile.interests if i.strip())
+        self._apply(profile.discord_user_id, interests)
+
+    def remove_user(self, user_id: str) -> None:
+        self._apply(user_id, frozenset())
+
+    def update_profiles(self, profiles: Iterable['UserProfile']) -> None:
+        for profile in profiles:
+            self.update_profile(profile)
+
+    def _refresh_candidates(self) -> None:
+        """Re-rank every known interest after candidate counts dropped (needs track_members).
+
+        Without member tracking only the reserve pool can move up.
+        """
+        if not self._candidates_stale or not self.track_members:
+            return
+        estimates = ((interest, self.sketch.estimate(interest)) for interest in self._members)
+        self._candidates = dict(heapq.nlargest(self.candidate_pool, estimates, key=lambda x: x[1]))
+        self._candidates_stale = False
+
+    # Queries
+
+    def estimate(self, interest: str) -> int:
+        """Approximate number of opted-in members with this interest (never under)."""
+        return self.sketch.estimate(normalize_interest(interest))
+
+    def top_interests(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Most popular interests as (interest, estimated count), count desc."""
+        self._refresh_candidates()
+        ranked = sorted(((i, c) for i, c in self._candidates.items() if c > 0), key=lambda x: x[1], reverse=True)
+        return ranked[:k or self.capacity]
+
+    def trending_interests(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Interests most often added within the sliding window."""
+        if self.window is None:
+            raise ValueError("trending_interests requires window_seconds")
+        now = self._clock()
+        for interest in self._window_candidates:
+            self._window_candidates[interest] = self.window.estimate(interest, now)
+        ranked = sorted(((i, c) for i, c in self._window_candidates.items() if c > 0),
+                        key=lambda x: x[1], reverse=True)
+        return ranked[:k or self.capacity]
+
+    def members(self, interest: str) -> List[str]:
+        """discord_user_ids with this interest (requires track_members)."""
+        if not self.track_members:
+            raise ValueError("members() requires track_members=True")
+        return sorted(self._members.get(normalize_interest(interest), ()))
+
+    def __len__(self) -> int:
+        """Number of opted-in users with at least one interest."""
+        return len(self._user_interests)
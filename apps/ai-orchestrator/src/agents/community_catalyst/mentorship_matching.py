@@ -0,0 +1,260 @@
+"""
+Mentorship Matching for CommunityCatalyst
+=======================================
+
+Two-sided, capacity-constrained mentor-mentee assignment. Preferences come
+from embedding cosine similarity, sparsified to each mentee's top-k mentors,
+and the assignment is solved with mentee-proposing deferred acceptance
+(the hospitals/residents variant of stable matching), where each mentor
+accepts at most ``mentor_capacity`` mentees.
+
+The candidate graph is built in mentee chunks, so memory stays at
+O(chunk x mentors + mentees x k) instead of a full dense similarity matrix.
+"""
+
+import heapq
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from community_catalyst_ai import ProfileEmbeddingEngine, UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MentorshipMatch:
+    """A single mentor-mentee assignment."""
+    mentor_discord_user_id: str
+    mentee_discord_user_id: str
+    similarity_score: float
+    mentee_rank: int  # 1 = mentee's first-choice mentor
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for storage/API responses."""
+        return {
+            'mentor_discord_user_id': self.mentor_discord_user_id,
+            'mentee_discord_user_id': self.mentee_discord_user_id,
+            'similarity_score': self.similarity_score,
+            'mentee_rank': self.mentee_rank
+        }
+
+
+@dataclass
+class MentorshipMatchingResult:
+    """Matches plus quality statistics for a matching run."""
+    matches: List[MentorshipMatch]
+    unmatched_mentee_ids: List[str]
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for storage/API responses."""
+        return {
+            'matches': [m.to_dict() for m in self.matches],
+            'unmatched_mentee_ids': self.unmatched_mentee_ids,
+            'stats': self.stats
+        }
+
+
+def top_k_candidates(mentee_embeddings: np.ndarray,
+                     mentor_embeddings: np.ndarray,
+                     k: int,
+                     chunk_size: int = 1024,
+                     mentee_ids: Optional[List[str]] = None,
+                     mentor_ids: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute each mentee's top-k mentors by cosine similarity.
+
+    Args:
+        mentee_embeddings: (n_mentees, dim) array
+        mentor_embeddings: (n_mentors, dim) array
+        k: Number of candidate mentors to keep per mentee
+        chunk_size: Mentee rows scored per matrix product
+        mentee_ids / mentor_ids: Optional ids; identical ids are never paired
+
+    Returns:
+        (indices, scores) arrays of shape (n_mentees, k), sorted by score desc
+    """
+    def normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    mentees = normalize(np.asarray(mentee_embeddings, dtype=np.float32))
+    mentors = normalize(np.asarray(mentor_embeddings, dtype=np.float32))
+    k = min(k, len(mentors))
+
+    mentor_positions = {uid: i for i, uid in enumerate(mentor_ids)} if mentor_ids and mentee_ids else {}
+
+    indices = np.empty((len(mentees), k), dtype=np.int64)
+    scores = np.empty((len(mentees), k), dtype=np.float32)
+    for start in range(0, len(mentees), chunk_size):
+        sims = mentees[start:start + chunk_size] @ mentors.T
+        if mentor_positions:
+            for row, mentee_id in enumerate(mentee_ids[start:start + chunk_size]):
+                col = mentor_positions.get(mentee_id)
+                if col is not None:
+                    sims[row, col] = -np.inf
+
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        indices[start:start + chunk_size] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + chunk_size] = np.take_along_axis(top_scores, order, axis=1)
+    return indices, scores
+
+
+def stable_match(candidate_indices: np.ndarray,
+                 candidate_scores: np.ndarray,
+                 n_mentors: int,
+                 mentor_capacity: int) -> np.ndarray:
+    """Mentee-proposing deferred acceptance over a sparse candidate graph.
+
+    Mentors rank mentees by the same similarity score, keeping at most
+    ``mentor_capacity`` tentative mentees in a min-heap and bumping the
+    weakest when a better proposal arrives.
+
+    Returns:
+        Array of length n_mentees with the assigned mentor index, or -1
+    """
+    n_mentees, k = candidate_indices.shape
+    next_choice = np.zeros(n_mentees, dtype=np.int64)
+    assignment = np.full(n_mentees, -1, dtype=np.int64)
+    held: List[List[Tuple[float, int]]] = [[] for _ in range(n_mentors)]
+
+    free = list(range(n_mentees - 1, -1, -1))
+    while free:
+        mentee = free.pop()
+        while next_choice[mentee] < k:
+            choice = next_choice[mentee]
+            next_choice[mentee] += 1
+            score = float(candidate_scores[mentee, choice])
+            if not np.isfinite(score):
+                continue
+            mentor = int(candidate_indices[mentee, choice])
+            heap = held[mentor]
+            if len(heap) < mentor_capacity:
+                heapq.heappush(heap, (score, mentee))
+                assignment[mentee] = mentor
+                break
+            if score > heap[0][0]:
+                _, bumped = heapq.heapreplace(heap, (score, mentee))
+                assignment[bumped] = -1
+                assignment[mentee] = mentor
+                free.append(bumped)
+                break
+    return assignment
+
+
+class MentorshipMatcher:
+    """Assigns mentees to capacity-limited mentors using embedding similarity."""
+
+    def __init__(self, embedding_engine: Optional[ProfileEmbeddingEngine] = None):
+        """Initialize with an optional embedding engine (needed for match_profiles)."""
+        self.embedding_engine = embedding_engine
+
+    def match_embeddings(self,
+                         mentor_ids: List[str],
+                         mentor_embeddings: np.ndarray,
+                         mentee_ids: List[str],
+                         mentee_embeddings: np.ndarray,
+                         mentor_capacity: int = 3,
+                         candidate_k: int = 20) -> MentorshipMatchingResult:
+        """Match mentees to mentors from precomputed embeddings.
+
+        Args:
+            mentor_ids: discord_user_ids of mentors
+            mentor_embeddings: (n_mentors, dim) embedding array
+            mentee_ids: discord_user_ids of mentees
+            mentee_embeddings: (n_mentees, dim) embedding array
+            mentor_capacity: Maximum mentees per mentor
+            candidate_k: Mentors considered per mentee (sparsification)
+
+        Returns:
+            MentorshipMatchingResult with matches and quality stats
+        """
+        if mentor_capacity <= 0:
+            raise ValueError("mentor_capacity must be positive")
+        if candidate_k <= 0:
+            raise ValueError("candidate_k must be positive")
+        if len(mentor_ids) != len(mentor_embeddings) or len(mentee_ids) != len(mentee_embeddings):
+            raise ValueError("Mismatch between embeddings and user_ids lengths")
+        if not mentor_ids or not mentee_ids:
+            stats = self._stats([], mentee_ids, mentor_ids, mentor_capacity, 0.0)
+            return MentorshipMatchingResult([], list(mentee_ids), stats)
+
+        start = time.perf_counter()
+        indices, scores = top_k_candidates(mentee_embeddings, mentor_embeddings, candidate_k,
+                                           mentee_ids=mentee_ids, mentor_ids=mentor_ids)
+        assignment = stable_match(indices, scores, len(mentor_ids), mentor_capacity)
+
+        matches = []
+        unmatched = []
+        for mentee, mentor in enumerate(assignment):
+            if mentor < 0:
+                unmatched.append(mentee_ids[mentee])
+                continue
+            rank = int(np.nonzero(indices[mentee] == mentor)[0][0])
+            matches.append(MentorshipMatch(
+                mentor_discord_user_id=mentor_ids[mentor],
+                mentee_discord_user_id=mentee_ids[mentee],
+                similarity_score=float(scores[mentee, rank]),
+                mentee_rank=rank + 1
+            ))
+        elapsed = time.perf_counter() - start
+
+        stats = self._stats(matches, mentee_ids, mentor_ids, mentor_capacity, elapsed)
+        logger.info(f"Matched {len(matches)}/{len(mentee_ids)} mentees to {len(mentor_ids)} mentors "
+                    f"in {elapsed:.2f}s")
+        return MentorshipMatchingResult(matches, unmatched, stats)
+
+    def match_profiles(self,
+                       mentor_profiles: List[UserProfile],
+                       mentee_profiles: List[UserProfile],
+                       mentor_capacity: int = 3,
+                       candidate_k: int = 20) -> MentorshipMatchingResult:
+        """Match opted-in mentees to opted-in mentors, embedding their profiles first."""
+        if self.embedding_engine is None:
+            raise ValueError("match_profiles requires an embedding engine")
+
+        mentors = [p for p in mentor_profiles if p.consent_status == "opted_in"]
+        mentees = [p for p in mentee_profiles if p.consent_status == "opted_in"]
+        mentor_embeddings = np.vstack(self.embedding_engine.create_embeddings_batch(mentors)) if mentors else np.empty((0, 0))
+        mentee_embeddings = np.vstack(self.embedding_engine.create_embeddings_batch(mentees)) if mentees else np.empty((0, 0))
+
+        return self.match_embeddings(
+            [p.discord_user_id for p in mentors], mentor_embeddings,
+            [p.discord_user_id for p in mentees], mentee_embeddings,
+            mentor_capacity=mentor_capacity, candidate_k=candidate_k
+        )
+
+    @staticmethod
+    def _stats(matches: List[MentorshipMatch],
+               mentee_ids: List[str],
+               mentor_ids: List[str],
+               mentor_capacity: int,
+               elapsed: float) -> Dict[str, Any]:
+        """Summarize match quality."""
+        similarities = np.array([m.similarity_score for m in matches]) if matches else np.zeros(0)
+        ranks = np.array([m.mentee_rank for m in matches]) if matches else np.zeros(0)
+        mentor_loads = {}
+        for m in matches:
+            mentor_loads[m.mentor_discord_user_id] = mentor_loads.get(m.mentor_discord_user_id, 0) + 1
+        total_capacity = len(mentor_ids) * mentor_capacity
+
+        return {
+            'num_mentors': len(mentor_ids),
+            'num_mentees': len(mentee_ids),
+            'num_matched': len(matches),
+            'match_rate': len(matches) / len(mentee_ids) if mentee_ids else 0.0,
+            'mentor_utilization': len(matches) / total_capacity if total_capacity else 0.0,
+            'mentors_used': len(mentor_loads),
+            'mean_similarity': float(similarities.mean()) if matches else 0.0,
+            'median_similarity': float(np.median(similarities)) if matches else 0.0,
+            'min_similarity': float(similarities.min()) if matches else 0.0,
+            'mean_mentee_rank': float(ranks.mean()) if matches else 0.0,
+            'first_choice_rate': float((ranks == 1).mean()) if matches else 0.0,
+            'elapsed_seconds': elapsed
+        }
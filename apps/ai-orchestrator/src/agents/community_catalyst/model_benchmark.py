@@ -0,0 +1,234 @@
+"""
+Embedding Model Benchmark for CommunityCatalyst
+=============================================
+
+Benchmarks the locally available models from SUPPORTED_EMBEDDING_MODELS on a
+profile corpus and reports load time, encode throughput per batch size, peak
+RSS, vector size and top-k neighbour agreement with a reference model.
+
+Each model runs in its own process so peak RSS is measured in isolation, and
+models are loaded offline so nothing is downloaded during a benchmark.
+
+Usage:
+    python model_benchmark.py --profiles profiles.jsonl --output benchmark.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config import SUPPORTED_EMBEDDING_MODELS
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 8, 32, 128)
+DEFAULT_REFERENCE_MODEL = 'all-mpnet-base-v2'
+DEFAULT_TOP_K = 5
+
+
+def load_profile_texts(path: str, max_profiles: Optional[int] = None) -> List[str]:
+    """Load profile texts from a JSONL file of UserProfile records.
+
+    Args:
+        path: JSONL file, one UserProfile-shaped object per line
+        max_profiles: Optional cap on the number of profiles read
+
+    Returns:
+        List of profile texts as produced by UserProfile.to_profile_text()
+    """
+    from community_catalyst_ai import UserProfile
+
+    texts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            profile = UserProfile(
+                discord_user_id=str(record.get('discord_user_id', len(texts))),
+                guild_id=str(record.get('guild_id', '')),
+                skills=record.get('skills') or [],
+                interests=record.get('interests') or [],
+                about_me=record.get('about_me') or '',
+                project_history=record.get('project_history') or [],
+                consent_status=record.get('consent_status', 'opted_in'),
+            )
+            texts.append(profile.to_profile_text())
+            if max_profiles and len(texts) >= max_profiles:
+                break
+    return texts
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process in MB, if measurable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _benchmark_model(model_name: str, texts: List[str], batch_sizes: Sequence[int]) -> Dict[str, Any]:
+    """Benchmark a single model. Runs inside a dedicated worker process."""
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        start = time.perf_counter()
+        model = SentenceTransformer(model_name)
+        load_time = time.perf_counter() - start
+    except Exception as e:
+        return {'available': False, 'error': str(e)}
+
+    model.encode(texts[:min(len(texts), 8)], convert_to_numpy=True)  # warm-up
+
+    throughput = {}
+    embeddings = None
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        elapsed = time.perf_counter() - start
+        throughput[str(batch_size)] = len(texts) / elapsed if elapsed > 0 else float('inf')
+
+    return {
+        'available': True,
+        'load_time_s': load_time,
+        'dimensions': int(model.get_sentence_embedding_dimension()),
+        'throughput': throughput,
+        'ms_per_profile': {bs: 1000.0 / tput for bs, tput in throughput.items()},
+        'peak_rss_mb': _peak_rss_mb(),
+        'embeddings': embeddings,
+    }
+
+
+def top_k_neighbors(embeddings: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k most cosine-similar other rows for each row."""
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.where(norms > 0, norms, 1.0)
+    similarities = normalized @ normalized.T
+    np.fill_diagonal(similarities, -np.inf)
+    k = min(k, len(embeddings) - 1)
+    return np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+
+
+def top_k_agreement(embeddings: np.ndarray, reference: np.ndarray, k: int) -> float:
+    """Mean overlap@k between neighbour sets of two embeddings of the same corpus."""
+    if len(embeddings) < 2:
+        return 1.0
+    ours = top_k_neighbors(embeddings, k)
+    theirs = top_k_neighbors(reference, k)
+    overlaps = [len(set(a) & set(b)) / len(a) for a, b in zip(ours, theirs)]
+    return float(np.mean(overlaps))
+
+
+def run_benchmark(texts: List[str],
+                  model_names: Optional[Sequence[str]] = None,
+                  batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+                  reference_model: str = DEFAULT_REFERENCE_MODEL,
+                  top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+    """Benchmark models on a corpus of profile texts.
+
+    Args:
+        texts: Profile texts to encode
+        model_names: Models to benchmark (defaults to all supported models)
+        batch_sizes: Batch sizes to measure throughput at
+        reference_model: Model whose neighbours define top-k agreement
+        top_k: Neighbourhood size for agreement
+
+    Returns:
+        JSON-serializable benchmark report
+    """
+    if not texts:
+        raise ValueError("Benchmark corpus is empty")
+
+    model_names = list(model_names or SUPPORTED_EMBEDDING_MODELS.keys())
+    if reference_model not in model_names:
+        model_names.append(reference_model)
+
+    ctx = multiprocessing.get_context('spawn')
+    raw: Dict[str, Dict[str, Any]] = {}
+    for model_name in model_names:
+        logger.info(f"Benchmarking {model_name} on {len(texts)} profiles")
+        with ctx.Pool(1) as pool:
+            raw[model_name] = pool.apply(_benchmark_model, (model_name, texts, list(batch_sizes)))
+
+    reference = raw.get(reference_model, {}).get('embeddings')
+    models = {}
+    for model_name, result in raw.items():
+        embeddings = result.pop('embeddings', None)
+        if embeddings is not None and reference is not None:
+            result['topk_agreement'] = top_k_agreement(embeddings, reference, top_k)
+        else:
+            result['topk_agreement'] = None
+        models[model_name] = result
+
+    return {
+        'corpus_size': len(texts),
+        'batch_sizes': list(batch_sizes),
+        'reference_model': reference_model,
+        'top_k': top_k,
+        'models': models,
+    }
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """Render a benchmark report as a plain-text table."""
+    batch_sizes = [str(bs) for bs in report['batch_sizes']]
+    header = ['model', 'dim', 'load_s', 'rss_mb'] + [f'p/s@{bs}' for bs in batch_sizes] + [f"agree@{report['top_k']}"]
+    rows = [header]
+    for model_name, result in report['models'].items():
+        if not result.get('available'):
+            rows.append([model_name, 'unavailable'] + [''] * (len(header) - 2))
+            continue
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else '-'
+
+        rows.append(
+            [model_name, str(result['dimensions']), fmt(result['load_time_s'], '.2f'), fmt(result['peak_rss_mb'], '.0f')]
+            + [fmt(result['throughput'].get(bs), '.1f') for bs in batch_sizes]
+            + [fmt(result['topk_agreement'], '.3f')]
+        )
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = ['  '.join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark local embedding models on a profile corpus")
+    parser.add_argument('--profiles', required=True, help="JSONL file of profiles")
+    parser.add_argument('--models', nargs='*', help="Models to benchmark (default: all supported)")
+    parser.add_argument('--batch-sizes', nargs='*', type=int, default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE_MODEL, help="Reference model for top-k agreement")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    parser.add_argument('--max-profiles', type=int, default=None)
+    parser.add_argument('--output', default='embedding_benchmark.json', help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    texts = load_profile_texts(args.profiles, args.max_profiles)
+    report = run_benchmark(texts, args.models, args.batch_sizes, args.reference, args.top_k)
+
+    print(format_table(report))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Near-Duplicate Profile Detection for CommunityCatalyst
+====================================================
+
+Finds bot and copy-pasted profiles before they are embedded. Each profile's
+``to_profile_text()`` is shingled into word n-grams, summarised with a
+MinHash signature, and bucketed with banded locality-sensitive hashing so
+candidate pairs are found in roughly linear time. Candidates are verified
+against the estimated Jaccard similarity and merged with union-find.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from community_catalyst_ai import UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+# Smallest prime above 2**32; keeps (a * x + b) inside uint64 for 32-bit x, a, b < 2**31
+_MINHASH_PRIME = np.uint64(4294967311)
+_FIELD_LABELS = re.compile(r'\b(skills|interests|projects|about):', re.IGNORECASE)
+_NON_WORD = re.compile(r'[^\w\s]+')
+
+
+def shingle(text: str, n: int = 3) -> Set[str]:
+    """Split normalised text into word n-gram shingles.
+
+    Field labels from to_profile_text() are dropped so that sparse profiles
+    don't look alike just because they share the template.
+    """
+    text = _FIELD_LABELS.sub(' ', text.lower())
+    words = _NON_WORD.sub(' ', text).split()
+    if len(words) < n:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick (bands, rows) with bands * rows == num_perm whose LSH S-curve
+    threshold (1 / bands) ** (1 / rows) is closest to ``threshold``."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1.0 / br[0]) ** (1.0 / br[1]) - threshold))
+
+
+@dataclass
+class DeduplicationResult:
+    """Output of a deduplication pass."""
+    profiles: List['UserProfile']  # representatives (collapse) or all profiles (flag)
+    duplicate_of: Dict[str, str]  # duplicate discord_user_id -> representative id
+    clusters: List[List[str]]
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+class ProfileDeduplicator:
+    """MinHash LSH near-duplicate detector for UserProfile objects."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3, seed: int = 1,
+                 min_shingles: int = 8):
+        """Configure the detector.
+
+        Args:
+            threshold: Estimated Jaccard similarity at which profiles count as duplicates
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Words per shingle
+            seed: Seed for the hash permutations
+            min_shingles: Profiles with fewer shingles (roughly, words) are never
+                clustered; short sparse profiles legitimately share text
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be between 0.0 and 1.0")
+        self.threshold = threshold
+        self.min_shingles = max(1, min_shingles)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: Set[str]) -> np.ndarray:
+        """MinHash signature of a shingle set (all-max for empty sets)."""
+        if not shingles:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little') for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % _MINHASH_PRIME
+        return permuted.min(axis=0)
+
+    def find_duplicates(self, profiles: List['UserProfile'], collapse: bool = True) -> DeduplicationResult:
+        """Detect near-duplicate clusters and collapse or flag them.
+
+        The representative of each cluster is its longest (most complete)
+        profile. Profiles with fewer than ``min_shingles`` shingles (empty or
+        sparse text, e.g. just "python docker") are never treated as
+        duplicates, since legitimate members often share such short text.
+
+        Args:
+            profiles: Profiles to scan
+            collapse: If True return only representatives, otherwise return all
+                profiles and just report duplicate_of
+
+        Returns:
+            DeduplicationResult with clusters and work-saved stats
+        """
+        start = time.perf_counter()
+        texts = [p.to_profile_text() for p in profiles]
+        shingle_sets = [shingle(t, self.shingle_size) for t in texts]
+        signatures = np.vstack([self.signature(s) for s in shingle_sets]) if profiles else np.empty((0, self.num_perm))
+
+        parent = list(range(len(profiles)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        candidate_pairs = 0
+        for band in range(self.bands):
+            buckets: Dict[bytes, int] = {}
+            band_slice = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for i in range(len(profiles)):
+                if len(shingle_sets[i]) < self.min_shingles:
+                    continue
+                key = band_slice[i].tobytes()
+                first = buckets.setdefault(key, i)
+                if first == i:
+                    continue
+                root_i, root_first = find(i), find(first)
+                if root_i == root_first:
+                    continue
+                candidate_pairs += 1
+                if np.mean(signatures[i] == signatures[first]) >= self.threshold:
+                    parent[root_i] = root_first
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(profiles)):
+            groups.setdefault(find(i), []).append(i)
+
+        duplicate_of: Dict[str, str] = {}
+        clusters: List[List[str]] = []
+        representatives: List[int] = []
+        for members in groups.values():
+            rep = max(members, key=lambda i: (len(texts[i]), -i))
+            representatives.append(rep)
+            if len(members) > 1:
+                clusters.append([profiles[i].discord_user_id for i in members])
+                for i in members:
+                    if i != rep:
+                        duplicate_of[profiles[i].discord_user_id] = profiles[rep].discord_user_id
+        representatives.sort()
+
+        n, unique = len(profiles), len(representatives)
+        stats = {
+            'profiles_in': n,
+            'unique_profiles': unique,
+            'duplicates': n - unique,
+            'clusters': len(clusters),
+            'candidate_pairs_checked': candidate_pairs,
+            'embeddings_saved': n - unique,
+            'similarity_pairs_saved': n * n - unique * unique,
+            'work_saved_fraction': (n - unique) / n if n else 0.0,
+            'elapsed_seconds': time.perf_counter() - start
+        }
+        logger.info(f"Deduplicated {n} profiles into {unique} ({len(clusters)} clusters)")
+
+        kept = [profiles[i] for i in representatives] if collapse else list(profiles)
+        return DeduplicationResult(kept, duplicate_of, clusters, stats)
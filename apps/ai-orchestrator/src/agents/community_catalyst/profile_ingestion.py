@@ -0,0 +1,340 @@
+"""
+Streaming Profile Ingestion for CommunityCatalyst
+===============================================
+
+Bulk-loads Discord profile exports (JSONL or CSV) without building the
+whole member list in memory. Rows are read in chunks, validated and
+normalised, embedded, and appended to a GuildDataStore one chunk at a time.
+Opted-out rows are never embedded; they are stored as tombstones (ID only,
+zero embedding) so a member who revokes consent disappears on load.
+
+Progress is checkpointed after every chunk: the number of rows consumed
+plus the committed file sizes of every guild touched. Resuming skips the
+consumed rows and rolls back any half-written chunk first, so an
+interrupted run neither loses nor duplicates rows.
+
+Usage:
+    python profile_ingestion.py --input export.jsonl --storage-dir guild_data \
+        --checkpoint export.ckpt.json
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from community_catalyst_ai import UserProfile
+from guild_cache import GuildDataStore
+
+
+logger = logging.getLogger(__name__)
+
+CONSENT_STATUSES = ("opted_in", "opted_out")
+_TERM_SEPARATORS = re.compile(r"[;,|]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_terms(value: Any,
+                    aliases: Optional[Dict[str, str]] = None,
+                    max_terms: int = 50,
+                    max_length: int = 64) -> List[str]:
+    """Normalise a skills or interests field.
+
+    Accepts a list or a ';', ',' or '|' separated string. Terms are trimmed,
+    whitespace-collapsed, mapped through ``aliases`` (lowercase keys),
+    de-duplicated case-insensitively (first spelling wins) and capped.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        items = _TERM_SEPARATORS.split(value)
+    elif isinstance(value, (list, tuple)):
+        items = [str(v) for v in value]
+    else:
+        raise ValueError(f"Expected a list or string of terms, got {type(value).__name__}")
+
+    terms, seen = [], set()
+    for item in items:
+        term = _WHITESPACE.sub(' ', item).strip()
+        if not term or len(term) > max_length:
+            continue
+        if aliases:
+            term = aliases.get(term.lower(), term)
+        key = term.lower()
+        if key not in seen:
+            seen.add(key)
+            terms.append(term)
+        if len(terms) >= max_terms:
+            break
+    return terms
+
+
+def record_to_profile(record: Dict[str, Any],
+                      default_guild_id: Optional[str] = None,
+                      aliases: Optional[Dict[str, str]] = None,
+                      max_about_chars: int = 2000) -> UserProfile:
+    """Validate and normalise one export record.
+
+    Raises:
+        ValueError: If the record is missing an ID or has invalid fields
+    """
+    user_id = str(record.get('discord_user_id') or '').strip()
+    if not user_id:
+        raise ValueError("missing discord_user_id")
+    guild_id = str(record.get('guild_id') or default_guild_id or '').strip()
+    if not guild_id:
+        raise ValueError("missing guild_id")
+
+    consent = str(record.get('consent_status') or 'opted_out').strip().lower()
+    if consent not in CONSENT_STATUSES:
+        raise ValueError(f"invalid consent_status {consent!r}")
+
+    project_history = record.get('project_history') or []
+    if isinstance(project_history, str):
+        project_history = json.loads(project_history) if project_history.strip() else []
+    if not isinstance(project_history, list):
+        raise ValueError("project_history must be a list")
+
+    return UserProfile(
+        discord_user_id=user_id,
+        guild_id=guild_id,
+        skills=normalize_terms(record.get('skills'), aliases),
+        interests=normalize_terms(record.get('interests'), aliases),
+        about_me=_WHITESPACE.sub(' ', str(record.get('about_me') or '')).strip()[:max_about_chars],
+        project_history=project_history,
+        consent_status=consent
+    )
+
+
+def iter_records(path: str, file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream raw records from a JSONL or CSV export.
+
+    Malformed JSON lines are yielded as ``{'_error': message}`` so they are
+    counted as rejected rows instead of aborting the run.
+    """
+    file_format = file_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {'_error': f"invalid JSON: {e}"}
+
+
+@dataclass
+class IngestionReport:
+    """Outcome of an ingestion run."""
+    rows_read: int = 0
+    rows_ingested: int = 0
+    rows_rejected: int = 0
+    rows_opted_out: int = 0
+    chunks: int = 0
+    resumed_from_row: int = 0
+    seconds: float = 0.0
+    rejections: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(asdict(self), rows_per_second=self.rows_per_second)
+
+
+class ProfileIngestionPipeline:
+    """Chunked validate -> embed -> store pipeline with resumable checkpoints."""
+
+    def __init__(self,
+                 embedding_engine: Any,
+                 store: GuildDataStore,
+                 chunk_size: int = 1000,
+                 checkpoint_path: Optional[str] = None,
+                 default_guild_id: Optional[str] = None,
+                 aliases: Optional[Dict[str, str]] = None,
+                 max_logged_rejections: int = 100):
+        """Initialize the pipeline.
+
+        Args:
+            embedding_engine: Engine whose create_embeddings_batch embeds each chunk
+            store: Destination for profiles and embeddings
+            chunk_size: Rows per chunk (bounds memory)
+            checkpoint_path: JSON checkpoint file; enables resume when set
+            default_guild_id: Guild for records without a guild_id column
+            aliases: Lowercase term -> canonical term mapping for skills/interests
+            max_logged_rejections: Rejected rows kept in the report for inspection
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.embedding_engine = embedding_engine
+        self.store = store
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.default_guild_id = default_guild_id
+        self.aliases = {k.lower(): v for k, v in (aliases or {}).items()}
+        self.max_logged_rejections = max_logged_rejections
+
+    # Checkpoints
+
+    def _load_checkpoint(self, source: str) -> Dict[str, Any]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {'source': source, 'rows_consumed': 0, 'guild_sizes': {}}
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('source') != source:
+            raise ValueError(f"Checkpoint {self.checkpoint_path} belongs to {checkpoint.get('source')}, not {source}")
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    # Pipeline
+
+    def _validate_chunk(self, rows: List[Dict[str, Any]], first_row: int,
+                        report: IngestionReport) -> List[UserProfile]:
+        profiles = []
+        for offset, record in enumerate(rows):
+            try:
+                if '_error' in record:
+                    raise ValueError(record['_error'])
+                profile = record_to_profile(record, self.default_guild_id, self.aliases)
+            except (ValueError, TypeError) as e:
+                report.rows_rejected += 1
+                if len(report.rejections) < self.max_logged_rejections:
+                    report.rejections.append({'row': first_row + offset, 'error': str(e)})
+                continue
+            if profile.consent_status != "opted_in":
+                # Never embedded; a tombstone hides any earlier record of the user
+                report.rows_opted_out += 1
+                profile = UserProfile(profile.discord_user_id, profile.guild_id, [], [], "", [], "opted_out")
+            profiles.append(profile)
+        return profiles
+
+    def _write_chunk(self, profiles: List[UserProfile], checkpoint: Dict[str, Any]) -> Dict[str, List[int]]:
+        """Append a chunk in row order; opted-out tombstones get zero embeddings."""
+        opted_in = [i for i, p in enumerate(profiles) if p.consent_status == "opted_in"]
+        embeddings = None
+        if opted_in:
+            embeddings = np.vstack(self.embedding_engine.create_embeddings_batch([profiles[i] for i in opted_in]))
+
+        rows_by_guild: Dict[str, List[int]] = {}
+        dims: Dict[str, Optional[int]] = {}
+        for i, profile in enumerate(profiles):
+            guild_id = profile.guild_id
+            if guild_id not in dims:
+                dims[guild_id] = self.store.dimension(guild_id)
+            if dims[guild_id] is None:
+                if profile.consent_status != "opted_in":
+                    continue  # nothing of this user stored yet, so nothing to hide
+                dims[guild_id] = embeddings.shape[1]
+            rows_by_guild.setdefault(guild_id, []).append(i)
+
+        # Record pre-write sizes of newly touched guilds so a crash mid-append rolls back
+        new_guilds = [g for g in rows_by_guild if g not in checkpoint['guild_sizes']]
+        if new_guilds:
+            for guild_id in new_guilds:
+                checkpoint['guild_sizes'][guild_id] = self.store.file_sizes(guild_id)
+            self._save_checkpoint(checkpoint)
+
+        chunk_embeddings = {}
+        if embeddings is not None:
+            chunk_embeddings = dict(zip(opted_in, embeddings))
+        for guild_id, rows in rows_by_guild.items():
+            zero = np.zeros(dims[guild_id], dtype=np.float32)
+            self.store.append(guild_id, [profiles[i] for i in rows],
+                              np.vstack([chunk_embeddings.get(i, zero) for i in rows]))
+        return rows_by_guild
+
+    def run(self, path: str, file_format: Optional[str] = None) -> IngestionReport:
+        """Ingest an export file, resuming from the checkpoint if one exists.
+
+        Returns:
+            IngestionReport with row counts and rows/sec throughput
+        """
+        source = os.path.abspath(path)
+        checkpoint = self._load_checkpoint(source)
+        report = IngestionReport(resumed_from_row=checkpoint['rows_consumed'])
+
+        # Roll back anything written after the last committed chunk
+        for guild_id, sizes in checkpoint['guild_sizes'].items():
+            self.store.truncate(guild_id, sizes)
+        if report.resumed_from_row:
+            logger.info(f"Resuming ingestion of {path} at row {report.resumed_from_row}")
+
+        start = time.perf_counter()
+        records = islice(iter_records(path, file_format), checkpoint['rows_consumed'], None)
+        while True:
+            rows = list(islice(records, self.chunk_size))
+            if not rows:
+                break
+            first_row = checkpoint['rows_consumed']
+            report.rows_read += len(rows)
+            profiles = self._validate_chunk(rows, first_row, report)
+            written = {}
+            if profiles:
+                written = self._write_chunk(profiles, checkpoint)
+                report.rows_ingested += sum(p.consent_status == "opted_in" for p in profiles)
+
+            checkpoint['rows_consumed'] = first_row + len(rows)
+            for guild_id in written:
+                checkpoint['guild_sizes'][guild_id] = self.store.file_sizes(guild_id)
+            self._save_checkpoint(checkpoint)
+            report.chunks += 1
+
+            elapsed = time.perf_counter() - start
+            logger.info(f"Ingested chunk {report.chunks}: {checkpoint['rows_consumed']} rows consumed, "
+                        f"{report.rows_read / elapsed if elapsed > 0 else 0.0:.0f} rows/s")
+
+        report.seconds = time.perf_counter() - start
+        logger.info(f"Ingestion finished: {report.rows_ingested} ingested, {report.rows_rejected} rejected, "
+                    f"{report.rows_opted_out} opted out, {report.rows_per_second:.0f} rows/s")
+        return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream a Discord profile export into guild storage")
+    parser.add_argument('--input', required=True, help="JSONL or CSV export")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default=None, help="Default: from file extension")
+    parser.add_argument('--storage-dir', default=os.getenv('COMCAT_GUILD_STORAGE_DIR', 'guild_data'))
+    parser.add_argument('--checkpoint', default=None, help="Checkpoint file (default: <input>.ckpt.json)")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--guild-id', default=None, help="Guild for rows without a guild_id")
+    parser.add_argument('--model', default=os.getenv('COMCAT_EMBEDDING_MODEL', 'all-MiniLM-L6-v2'))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from community_catalyst_ai import ProfileEmbeddingEngine
+
+    pipeline = ProfileIngestionPipeline(
+        ProfileEmbeddingEngine(model_name=args.model),
+        GuildDataStore(args.storage_dir),
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint or f"{args.input}.ckpt.json",
+        default_guild_id=args.guild_id
+    )
+    report = pipeline.run(args.input, args.format)
+    print(json.dumps(report.to_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Cross-Encoder Re-Ranking for CommunityCatalyst
+============================================
+
+Optional second retrieval stage. Bi-encoder cosine scores pick the
+candidates; a cross-encoder, which reads both profiles together, re-orders
+only the top-M of them. Pair scores are cached by (pair, profile versions),
+where a profile's version is the hash of its profile text, so a pair is
+re-scored only after one of the two profiles changes.
+
+Uncached pairs are scored in bi-encoder rank order, one small batch at a
+time, until the per-user latency budget is spent. The scored prefix is
+re-ordered by cross-encoder score; anything left keeps its bi-encoder order
+behind it, so the extra cost per user is bounded by the budget.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from community_catalyst_ai import UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+def profile_version(profile: 'UserProfile') -> str:
+    """Content hash of the profile text the cross-encoder reads."""
+    return hashlib.sha1(profile.to_profile_text().encode('utf-8')).hexdigest()[:16]
+
+
+class CrossEncoderReranker:
+    """Re-ranks the top-M bi-encoder candidates with a cached cross-encoder."""
+
+    def __init__(self,
+                 model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+                 top_m: int = 20,
+                 latency_budget_ms: float = 50.0,
+                 batch_size: int = 8,
+                 cache_size: int = 100000,
+                 apply_sigmoid: bool = False,
+                 model: Optional[Any] = None):
+        """Initialize the re-ranker.
+
+        Args:
+            model_name: sentence-transformers CrossEncoder model (loaded lazily)
+            top_m: Number of bi-encoder candidates re-ranked per user
+            latency_budget_ms: Cross-encoder time allowed per user
+            batch_size: Pairs scored per model call between budget checks
+            cache_size: Maximum cached pair scores (LRU)
+            apply_sigmoid: Squash raw logits, for models predicting without an activation
+            model: Preloaded model with ``predict(pairs)`` (skips loading)
+        """
+        if top_m <= 0 or batch_size <= 0:
+            raise ValueError("top_m and batch_size must be positive")
+        self.model_name = model_name
+        self.top_m = top_m
+        self.latency_budget_ms = latency_budget_ms
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.apply_sigmoid = apply_sigmoid
+        self.model = model
+        self._cache: 'OrderedDict[Tuple[str, str, str, str], float]' = OrderedDict()
+        self.stats = {'users': 0, 'pairs_scored': 0, 'cache_hits': 0,
+                      'budget_exhausted': 0, 'total_ms': 0.0}
+
+    def _load_model(self):
+        if self.model is None:
+            from sentence_transformers import CrossEncoder
+            logger.info(f"Loading cross-encoder: {self.model_name}")
+            self.model = CrossEncoder(self.model_name)
+        return self.model
+
+    def _cache_get(self, key: Tuple[str, str, str, str]) -> Optional[float]:
+        score = self._cache.get(key)
+        if score is not None:
+            self._cache.move_to_end(key)
+        return score
+
+    def _cache_put(self, key: Tuple[str, str, str, str], score: float) -> None:
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _to_unit_interval(self, outputs: np.ndarray) -> np.ndarray:
+        """Map cross-encoder outputs to [0, 1] so they read like similarities."""
+        outputs = np.asarray(outputs, dtype=float).reshape(-1)
+        if self.apply_sigmoid:
+            outputs = 1.0 / (1.0 + np.exp(-outputs))
+        return np.clip(outputs, 0.0, 1.0)
+
+    def rerank(self,
+               source_profile: 'UserProfile',
+               candidates: List[Tuple[str, float]],
+               target_profiles: Dict[str, 'UserProfile']) -> Tuple[List[Tuple[str, float]], Dict[str, float]]:
+        """Re-order the top-M candidates by cross-encoder score.
+
+        Args:
+            source_profile: Profile of the user receiving recommendations
+            candidates: (discord_user_id, bi-encoder score), sorted by score desc
+            target_profiles: Profiles of the candidates, by discord_user_id
+
+        Returns:
+            (candidates re-ordered, {discord_user_id: cross-encoder score}) where
+            the score map only covers candidates that were re-ranked
+        """
+        start = time.perf_counter()
+        head, tail = candidates[:self.top_m], candidates[self.top_m:]
+        source_version = profile_version(source_profile)
+        keys = [(source_profile.discord_user_id, user_id, source_version, profile_version(target_profiles[user_id]))
+                for user_id, _ in head]
+
+        scores: Dict[str, float] = {}
+        pending = []
+        for (user_id, _), key in zip(head, keys):
+            cached = self._cache_get(key)
+            if cached is None:
+                pending.append((user_id, key))
+            else:
+                scores[user_id] = cached
+                self.stats['cache_hits'] += 1
+
+        # Score uncached pairs in rank order until the budget runs out. Cached
+        # pairs past a budget cutoff are dropped too, so the scored set stays a
+        # prefix of the bi-encoder ranking.
+        cutoff = len(head)
+        if pending:
+            source_text = source_profile.to_profile_text()
+            model = self._load_model()
+            for offset in range(0, len(pending), self.batch_size):
+                if (time.perf_counter() - start) * 1000.0 >= self.latency_budget_ms:
+                    self.stats['budget_exhausted'] += 1
+                    first_unscored = pending[offset][0]
+                    cutoff = next(i for i, (user_id, _) in enumerate(head) if user_id == first_unscored)
+                    break
+                batch = pending[offset:offset + self.batch_size]
+                pairs = [(source_text, target_profiles[user_id].to_profile_text()) for user_id, _ in batch]
+                batch_scores = self._to_unit_interval(model.predict(pairs))
+                for (user_id, key), score in zip(batch, batch_scores):
+                    scores[user_id] = float(score)
+                    self._cache_put(key, float(score))
+                self.stats['pairs_scored'] += len(batch)
+
+        reranked = head[:cutoff]
+        reranked_ids = {user_id for user_id, _ in reranked}
+        scores = {user_id: score for user_id, score in scores.items() if user_id in reranked_ids}
+        reranked = sorted(reranked, key=lambda c: scores[c[0]], reverse=True)
+
+        self.stats['users'] += 1
+        self.stats['total_ms'] += (time.perf_counter() - start) * 1000.0
+        return reranked + head[cutoff:] + tail, scores
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus mean extra latency per user and cache size."""
+        users = self.stats['users']
+        return dict(self.stats,
+                    mean_ms_per_user=self.stats['total_ms'] / users if users else 0.0,
+                    cache_entries=len(self._cache))
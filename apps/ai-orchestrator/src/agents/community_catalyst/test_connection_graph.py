@@ -0,0 +1,107 @@
+"""
+Tests for the CommunityCatalyst connection graph
+==============================================
+
+Run with: python -m pytest test_connection_graph.py -v
+"""
+
+import numpy as np
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from config import RecommendationConfig
+from connection_graph import ConnectionGraph
+
+
+class TestConnectionGraph:
+    """Test ConnectionGraph functionality."""
+
+    @pytest.fixture
+    def graph(self):
+        """Star around 'hub' plus an extra a-b edge."""
+        return ConnectionGraph([("hub", "a"), ("hub", "b"), ("hub", "c"), ("a", "b")])
+
+    def test_add_connection(self, graph):
+        """Test duplicate and self connections are ignored."""
+        assert graph.num_connections == 4
+        assert not graph.add_connection("a", "hub")
+        assert not graph.add_connection("a", "a")
+        assert graph.has_connection("b", "a")
+        assert graph.degree("hub") == 3
+
+    def test_shared_connection_counts(self, graph):
+        """Test two-hop counts against hand-computed values."""
+        counts = graph.shared_connection_counts("a", ["b", "c", "hub", "unknown"])
+        assert counts.tolist() == [1, 1, 1, 0]
+
+    def test_incremental_update_matches_recompute(self, graph):
+        """Test cached rows are patched correctly when edges are added."""
+        candidates = ["hub", "a", "b", "c", "d"]
+        for user in candidates:
+            graph.shared_connection_counts(user, candidates)  # warm cache
+
+        graph.add_connection("c", "d")
+        graph.add_connection("a", "d")
+
+        fresh = ConnectionGraph([("hub", "a"), ("hub", "b"), ("hub", "c"), ("a", "b"),
+                                 ("c", "d"), ("a", "d")])
+        for user in candidates:
+            assert (graph.shared_connection_counts(user, candidates).tolist()
+                    == fresh.shared_connection_counts(user, candidates).tolist())
+
+    def test_shared_connection_matrix(self, graph):
+        """Test the batched sparse product agrees with per-user counts."""
+        sources = ["a", "c", "missing"]
+        candidates = ["b", "c", "hub"]
+        matrix = graph.shared_connection_matrix(sources, candidates).toarray()
+
+        assert matrix.shape == (3, 3)
+        for i, source in enumerate(sources[:2]):
+            expected = graph.shared_connection_counts(source, candidates)
+            for j, candidate in enumerate(candidates):
+                if candidate != source:
+                    assert matrix[i, j] == expected[j]
+        assert not matrix[2].any()
+
+    def test_network_scores_are_bounded(self, graph):
+        """Test normalised scores stay within [0, 1]."""
+        scores = graph.network_scores("a", ["b", "c", "hub"])
+        assert np.all(scores >= 0.0) and np.all(scores <= 1.0)
+        assert scores[1] > 0.0  # a and c share the hub
+
+
+class TestNetworkBlending:
+    """Test network_weight blending in RecommendationEngine."""
+
+    @pytest.fixture
+    def profiles(self):
+        return [
+            UserProfile(uid, "guild1", ["Python"], ["AI"], "", [], "opted_in")
+            for uid in ["me", "friend", "fof", "stranger"]
+        ]
+
+    def test_network_weight_reorders_ties(self, profiles, static_embedding_engine):
+        """Test friend-of-friend outranks a stranger when content scores tie."""
+        graph = ConnectionGraph([("me", "friend"), ("friend", "fof")])
+        config = RecommendationConfig(content_weight=1.0, network_weight=1.0)
+        engine = RecommendationEngine(static_embedding_engine, config=config,
+                                      connection_graph=graph)
+
+        recs = engine.generate_recommendations_for_user(
+            profiles[0], [profiles[2], profiles[3]], top_n=2, min_similarity=0.0
+        )
+
+        assert [r.target_discord_user_id for r in recs] == ["fof", "stranger"]
+        assert recs[0].explanations['shared_connections'] == 1
+        assert "1 shared connection" in recs[0].recommendation_reason
+        assert all(0.0 <= r.similarity_score <= 1.0 for r in recs)
+
+    def test_zero_network_weight_keeps_content_scores(self, profiles, static_embedding_engine):
+        """Test the default weights leave scores unchanged."""
+        graph = ConnectionGraph([("me", "friend"), ("friend", "fof")])
+        engine = RecommendationEngine(static_embedding_engine, connection_graph=graph)
+
+        recs = engine.generate_recommendations_for_user(profiles[0], profiles[1:], top_n=3)
+
+        assert all(abs(r.similarity_score - 1.0) < 1e-6 for r in recs)
+        assert all('shared_connections' not in r.explanations for r in recs)
@@ -0,0 +1,143 @@
+"""
+Tests for recommendation delivery
+===============================
+
+Run with: python -m pytest test_delivery_dispatcher.py -v
+"""
+
+import asyncio
+import time
+
+from community_catalyst_ai import ConnectionRecommendation
+from config import DeliveryConfig
+from delivery_dispatcher import (
+    DeliveryDispatcher, FakeDiscordEndpoint, OutboxQueue, SendResult, TokenBucket, estimate_drain_seconds,
+    STATUS_FAILED, STATUS_PENDING, STATUS_SENT
+)
+
+
+def make_recommendations(num_sources, per_source, campaign_id="c1"):
+    return [
+        ConnectionRecommendation(
+            source_discord_user_id=f"u{s}",
+            target_discord_user_id=f"t{t}",
+            similarity_score=0.5,
+            recommendation_reason="shared skills in python",
+            explanations={},
+            guild_id="guild1",
+            campaign_id=campaign_id
+        )
+        for s in range(num_sources) for t in range(per_source)
+    ]
+
+
+class TestOutboxQueue:
+    """Test OutboxQueue functionality."""
+
+    def test_aggregates_per_recipient(self, tmp_path):
+        """Test recommendations are merged into one message per recipient."""
+        outbox = OutboxQueue(str(tmp_path / "outbox.db"))
+        outbox.enqueue_recommendations(make_recommendations(3, 2))
+        outbox.enqueue_recommendations(make_recommendations(3, 1))
+
+        assert outbox.counts() == {STATUS_PENDING: 3}
+        message = outbox.claim(time.time())
+        assert len(message.recommendations) == 3
+        assert "<@t0>" in message.render()
+
+    def test_in_flight_recovered_on_reopen(self, tmp_path):
+        """Test messages claimed by a crashed dispatcher become pending again."""
+        path = str(tmp_path / "outbox.db")
+        outbox = OutboxQueue(path)
+        outbox.enqueue_recommendations(make_recommendations(1, 1))
+        assert outbox.claim(time.time()) is not None
+        outbox.close()
+
+        assert OutboxQueue(path).counts() == {STATUS_PENDING: 1}
+
+
+class TestTokenBucket:
+    """Test TokenBucket pacing."""
+
+    def test_rate_is_enforced(self):
+        """Test acquiring beyond the burst waits for refill."""
+        bucket = TokenBucket(rate=100.0, capacity=5)
+
+        async def take(n):
+            for _ in range(n):
+                await bucket.acquire()
+
+        start = time.perf_counter()
+        asyncio.run(take(25))
+        assert time.perf_counter() - start >= 0.19  # 20 tokens at 100/s
+
+
+class TestDeliveryDispatcher:
+    """Test DeliveryDispatcher against the fake endpoint."""
+
+    def test_campaign_drains_in_predictable_time(self, tmp_path):
+        """Test N recipients drain close to the estimated time without 429s."""
+        config = DeliveryConfig(rate_per_second=200.0, burst=10, max_concurrency=4)
+        outbox = OutboxQueue(str(tmp_path / "outbox.db"))
+        outbox.enqueue_recommendations(make_recommendations(100, 3))
+        endpoint = FakeDiscordEndpoint(max_requests=1000)
+
+        stats = asyncio.run(DeliveryDispatcher(outbox, endpoint, config).drain())
+
+        assert stats['sent'] == 100
+        assert len(endpoint.delivered) == 100
+        expected = estimate_drain_seconds(100, config)
+        assert expected * 0.8 <= stats['elapsed_seconds'] <= expected + 0.5
+
+    def test_retry_after_is_honoured(self, tmp_path):
+        """Test rate-limited sends are retried after the endpoint's retry_after."""
+        config = DeliveryConfig(rate_per_second=1000.0, burst=50, max_concurrency=4, max_attempts=10)
+        outbox = OutboxQueue(str(tmp_path / "outbox.db"))
+        outbox.enqueue_recommendations(make_recommendations(30, 1))
+        endpoint = FakeDiscordEndpoint(max_requests=10, window_seconds=0.1)
+
+        stats = asyncio.run(DeliveryDispatcher(outbox, endpoint, config).drain())
+
+        assert stats['sent'] == 30
+        assert stats['rate_limited'] > 0
+        assert outbox.counts() == {STATUS_SENT: 30}
+
+    def test_throttling_does_not_use_up_attempts(self, tmp_path):
+        """Test 429s beyond max_attempts still end in delivery."""
+        config = DeliveryConfig(rate_per_second=1000.0, burst=50, max_concurrency=4, max_attempts=1)
+        outbox = OutboxQueue(str(tmp_path / "outbox.db"))
+        outbox.enqueue_recommendations(make_recommendations(20, 1))
+        endpoint = FakeDiscordEndpoint(max_requests=5, window_seconds=0.05)
+
+        stats = asyncio.run(DeliveryDispatcher(outbox, endpoint, config).drain())
+
+        assert stats['rate_limited'] > 0
+        assert stats['sent'] == 20
+        assert outbox.counts() == {STATUS_SENT: 20}
+
+    def test_throttled_attempts_are_capped(self, tmp_path):
+        """Test a message that is always rate limited fails after max_throttled_attempts."""
+        config = DeliveryConfig(rate_per_second=1000.0, burst=50, max_throttled_attempts=3)
+        outbox = OutboxQueue(str(tmp_path / "outbox.db"))
+        outbox.enqueue_recommendations(make_recommendations(1, 1))
+
+        async def always_throttled(message):
+            return SendResult(ok=False, retry_after=0.01, error="429 Too Many Requests")
+
+        stats = asyncio.run(DeliveryDispatcher(outbox, always_throttled, config).drain())
+
+        assert (stats['rate_limited'], stats['failed']) == (2, 1)
+        assert outbox.counts() == {STATUS_FAILED: 1}
+
+    def test_permanent_failures_give_up(self, tmp_path):
+        """Test messages are marked failed after max_attempts."""
+        config = DeliveryConfig(rate_per_second=1000.0, burst=50, max_attempts=2, base_backoff_seconds=0.01)
+        outbox = OutboxQueue(str(tmp_path / "outbox.db"))
+        outbox.enqueue_recommendations(make_recommendations(3, 1))
+        endpoint = FakeDiscordEndpoint(max_requests=1000, failing_recipients={"u1"})
+
+        stats = asyncio.run(DeliveryDispatcher(outbox, endpoint, config).drain())
+
+        assert stats['sent'] == 2
+        assert stats['failed'] == 1
+        assert outbox.counts() == {STATUS_SENT: 2, STATUS_FAILED: 1}
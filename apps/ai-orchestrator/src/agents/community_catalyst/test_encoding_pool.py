@@ -0,0 +1,107 @@
+"""
+Tests for the multi-process encoding pool
+=======================================
+
+Run with: python -m pytest test_encoding_pool.py -v
+"""
+
+import functools
+import os
+from unittest import mock
+
+import numpy as np
+import pytest
+
+import community_catalyst_ai
+from community_catalyst_ai import ProfileEmbeddingEngine
+from encoding_pool import EncodingPool
+
+
+class FakeModel:
+    """Model stand-in whose vector encodes the text and the worker's thread setting."""
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        threads = float(os.environ.get('OMP_NUM_THREADS', 0))
+        return np.array([[float(len(t)), float(sum(map(ord, t)) % 997), threads] for t in texts],
+                        dtype=np.float32)
+
+
+def fake_model_factory(model_name):
+    return FakeModel()
+
+
+class TestEncodingPool:
+    """Test EncodingPool functionality."""
+
+    def test_results_in_input_order(self):
+        texts = [f"profile {i} " * (i % 7 + 1) for i in range(1000)]
+        with EncodingPool("fake", num_workers=3, threads_per_worker=2, chunk_size=64,
+                          model_factory=fake_model_factory) as pool:
+            embeddings = pool.encode(texts)
+
+        expected = FakeModel().encode(texts)
+        assert embeddings.shape == (1000, 3)
+        assert np.array_equal(embeddings[:, :2], expected[:, :2])
+        assert np.all(embeddings[:, 2] == 2.0)  # every worker pinned to 2 threads
+
+    def test_parent_thread_settings_restored(self, monkeypatch):
+        monkeypatch.setenv('OMP_NUM_THREADS', '7')
+        monkeypatch.delenv('MKL_NUM_THREADS', raising=False)
+        with EncodingPool("fake", num_workers=1, threads_per_worker=3,
+                          model_factory=fake_model_factory) as pool:
+            assert pool.encode(["abc"])[0, 2] == 3.0
+        assert os.environ['OMP_NUM_THREADS'] == '7'
+        assert 'MKL_NUM_THREADS' not in os.environ
+
+    def test_empty_input(self):
+        with EncodingPool("fake", num_workers=1, model_factory=fake_model_factory) as pool:
+            assert pool.encode([]).shape == (0, 3)
+
+    def test_candidate_splits_do_not_oversubscribe(self):
+        splits = EncodingPool.candidate_splits(cpus=8)
+        assert splits == [(1, 8), (2, 4), (4, 2), (8, 1)]
+        assert all(w * t <= 8 for w, t in splits)
+
+    def test_auto_calibration(self):
+        pool, report = EncodingPool.auto(["hello world"] * 50, model_name="fake",
+                                         splits=[(1, 1), (2, 1)], model_factory=fake_model_factory)
+        try:
+            assert len(report['candidates']) == 2
+            assert report['chosen']['workers'] in (1, 2)
+            assert pool.encode(["abc"]).shape == (1, 3)
+        finally:
+            pool.close()
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            EncodingPool("fake", num_workers=0, model_factory=fake_model_factory)
+
+
+class TestProfileEmbeddingEngineWithPool:
+    """Test ProfileEmbeddingEngine ownership of its encoding pool."""
+
+    @pytest.fixture(autouse=True)
+    def fake_models(self):
+        with mock.patch.object(community_catalyst_ai, 'SentenceTransformer', fake_model_factory), \
+                mock.patch.object(community_catalyst_ai, 'EncodingPool',
+                                  functools.partial(EncodingPool, model_factory=fake_model_factory)):
+            yield
+
+    def test_close_stops_owned_pool(self):
+        with ProfileEmbeddingEngine("fake", encoding_workers=1, parallel_min_batch=10) as engine:
+            assert engine.encode_texts(["hello world"] * 20).shape == (20, 3)
+            pool = engine.encoding_pool
+            assert pool is not None
+        assert engine.encoding_pool is None
+        with pytest.raises(ValueError):
+            pool.encode(["hello world"] * 20)
+
+    def test_close_leaves_injected_pool_running(self):
+        with EncodingPool("fake", num_workers=1, model_factory=fake_model_factory) as pool:
+            with ProfileEmbeddingEngine("fake", encoding_pool=pool, parallel_min_batch=10) as engine:
+                engine.encode_texts(["hello world"] * 20)
+            assert engine.encoding_pool is pool
+            assert pool.encode(["hello world"] * 20).shape == (20, 3)
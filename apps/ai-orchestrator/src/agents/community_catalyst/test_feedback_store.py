@@ -0,0 +1,126 @@
+"""
+Tests for the CommunityCatalyst feedback store
+============================================
+
+Run with: python -m pytest test_feedback_store.py -v
+"""
+
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from connection_graph import ConnectionGraph
+from feedback_store import (
+    BloomFilter, FeedbackEvent, RecommendationFeedbackStore, FEEDBACK_SHOWN
+)
+
+
+class TestBloomFilter:
+    """Test BloomFilter functionality."""
+
+    def test_no_false_negatives(self):
+        """Test every inserted item is reported as present."""
+        bloom = BloomFilter(capacity=500, error_rate=0.01)
+        items = [f"user_{i}" for i in range(500)]
+        for item in items:
+            bloom.add(item)
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        """Test the false-positive rate stays near the target at capacity."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"in_{i}")
+        false_positives = sum(f"out_{i}" in bloom for i in range(10000))
+        assert false_positives / 10000 < 0.03
+
+    def test_serialization_round_trip(self):
+        """Test filters survive to_dict/from_dict."""
+        bloom = BloomFilter(capacity=10)
+        bloom.add("a")
+        restored = BloomFilter.from_dict(bloom.to_dict())
+        assert "a" in restored
+        assert restored.count == 1
+
+
+class TestRecommendationFeedbackStore:
+    """Test RecommendationFeedbackStore functionality."""
+
+    def test_record_and_has_seen(self, tmp_path):
+        """Test recorded pairs are suppressed and others are not."""
+        store = RecommendationFeedbackStore(str(tmp_path))
+        store.record([FeedbackEvent("u1", "u2", FEEDBACK_SHOWN)])
+        store.record_dismissed("u1", "u3")
+
+        assert store.has_seen("u1", "u2")
+        assert store.has_seen("u1", "u3")
+        assert not store.has_seen("u2", "u1")
+        assert store.filter_unseen("u1", ["u2", "u3", "u4"]) == ["u4"]
+
+    def test_unknown_event_rejected(self, tmp_path):
+        """Test invalid event types raise."""
+        store = RecommendationFeedbackStore(str(tmp_path))
+        with pytest.raises(ValueError):
+            store.record([FeedbackEvent("u1", "u2", "liked")])
+
+    def test_persistence(self, tmp_path):
+        """Test filters are reloaded from disk, or rebuilt from the log if missing."""
+        store = RecommendationFeedbackStore(str(tmp_path))
+        store.record_dismissed("u1", "u2")
+        store.save()
+        assert RecommendationFeedbackStore(str(tmp_path)).has_seen("u1", "u2")
+
+        (tmp_path / "feedback_filters.json").unlink()
+        assert RecommendationFeedbackStore(str(tmp_path)).has_seen("u1", "u2")
+
+    def test_events_after_save_survive_restart(self, tmp_path):
+        """Test events logged after the last save are replayed on load."""
+        store = RecommendationFeedbackStore(str(tmp_path))
+        store.record_shown([])
+        store.record_dismissed("u1", "u2")
+        store.save()
+        store.record_dismissed("u1", "u3")
+        store.record_accepted("u4", "u1")
+
+        reloaded = RecommendationFeedbackStore(str(tmp_path))
+        assert reloaded.filter_unseen("u1", ["u2", "u3", "u5"]) == ["u5"]
+        assert reloaded.has_seen("u4", "u1")
+
+        # Filters saved without a log offset are rebuilt from the log
+        (tmp_path / "feedback_filters.json").write_text("{}", encoding='utf-8')
+        assert RecommendationFeedbackStore(str(tmp_path)).has_seen("u1", "u3")
+
+    def test_compaction_resizes_filters(self, tmp_path):
+        """Test compaction deduplicates history and resizes saturated filters."""
+        store = RecommendationFeedbackStore(str(tmp_path), filter_capacity=4)
+        for i in range(10):
+            store.record([FeedbackEvent("u1", f"t{i}", FEEDBACK_SHOWN)])
+        store.record_accepted("u1", "t0")
+        assert store.needs_compaction
+
+        stats = store.compact()
+
+        assert stats == {'events_before': 11, 'events_after': 10, 'filters': 1}
+        assert not store.needs_compaction
+        assert all(store.has_seen("u1", f"t{i}") for i in range(10))
+
+    def test_accepted_updates_connection_graph(self, tmp_path):
+        """Test accepted pairs become connections."""
+        graph = ConnectionGraph()
+        store = RecommendationFeedbackStore(str(tmp_path), connection_graph=graph)
+        store.record_accepted("u1", "u2")
+        assert graph.has_connection("u1", "u2")
+
+    def test_engine_skips_seen_pairs_across_campaigns(self, tmp_path, static_embedding_engine):
+        """Test a second campaign does not repeat pairs from the first."""
+        profiles = [UserProfile(f"u{i}", "guild1", ["Python"], ["AI"], "", [], "opted_in")
+                    for i in range(4)]
+        store = RecommendationFeedbackStore(str(tmp_path))
+        engine = RecommendationEngine(static_embedding_engine, feedback_store=store)
+
+        first = engine.generate_recommendations_batch(profiles, profiles, top_n_per_user=1)
+        second = engine.generate_recommendations_batch(profiles, profiles, top_n_per_user=1)
+
+        first_pairs = {(r.source_discord_user_id, r.target_discord_user_id) for r in first}
+        second_pairs = {(r.source_discord_user_id, r.target_discord_user_id) for r in second}
+        assert len(first_pairs) == 4
+        assert first_pairs.isdisjoint(second_pairs)
@@ -0,0 +1,97 @@
+"""
+Tests for field-level embeddings
+==============================
+
+Run with: python -m pytest test_field_embeddings.py -v
+"""
+
+import os
+from unittest import mock
+
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from config import CommunityCatalystConfig, validate_config
+from field_embeddings import FieldEmbeddingEngine
+
+
+def make_profile(uid, skills, interests, about=""):
+    return UserProfile(uid, "guild1", skills, interests, about, [], "opted_in")
+
+
+class TestFieldEmbeddingEngine:
+    """Test FieldEmbeddingEngine functionality."""
+
+    def test_editing_a_skill_reencodes_only_skills(self, hashing_embedding_engine):
+        engine = FieldEmbeddingEngine(hashing_embedding_engine)
+        profile = make_profile("u1", ["Python"], ["AI"], "I build chatbots")
+        engine.embed_fields([profile])
+        hashing_embedding_engine.encoded.clear()
+
+        profile.skills.append("Rust")
+        engine.embed_fields([profile])
+
+        assert hashing_embedding_engine.encoded == ["Python, Rust"]
+
+    def test_fused_similarity_is_weighted_mean_of_field_cosines(self, hashing_embedding_engine):
+        engine = FieldEmbeddingEngine(hashing_embedding_engine,
+                                      field_weights={'skills': 3.0, 'interests': 1.0})
+        a = make_profile("a", ["python"], ["ai"])
+        b = make_profile("b", ["python"], ["gardening"])
+
+        fields = engine.embed_fields([a, b])
+        skills_cos = float(fields['skills'][0] @ fields['skills'][1])
+        interests_cos = float(fields['interests'][0] @ fields['interests'][1])
+
+        similarity = engine.similarity([a], [b])[0, 0]
+        assert similarity == pytest.approx((3.0 * skills_cos + 1.0 * interests_cos) / 4.0)
+
+    def test_weights_change_without_reencoding(self, hashing_embedding_engine):
+        engine = FieldEmbeddingEngine(hashing_embedding_engine)
+        a = make_profile("a", ["python"], ["ai"])
+        b = make_profile("b", ["python"], ["gardening"])
+        before = engine.similarity([a], [b])[0, 0]
+        encoded = engine.encoded_texts
+
+        engine.set_weights({'skills': 1.0})
+        after = engine.similarity([a], [b])[0, 0]
+
+        assert engine.encoded_texts == encoded
+        assert after == pytest.approx(1.0)
+        assert after > before
+
+    def test_invalid_weights_rejected(self, hashing_embedding_engine):
+        with pytest.raises(ValueError):
+            FieldEmbeddingEngine(hashing_embedding_engine, field_weights={'hobbies': 1.0})
+        with pytest.raises(ValueError):
+            FieldEmbeddingEngine(hashing_embedding_engine, field_weights={'skills': 0.0})
+
+    def test_engine_uses_field_similarity(self, hashing_embedding_engine):
+        """Test interests-only weighting ranks by shared interests."""
+        field_engine = FieldEmbeddingEngine(hashing_embedding_engine, field_weights={'interests': 1.0})
+        engine = RecommendationEngine(hashing_embedding_engine, field_embedding_engine=field_engine)
+        me = make_profile("me", ["python"], ["ai"])
+        same_interest = make_profile("x", ["cobol"], ["ai"])
+        same_skill = make_profile("y", ["python"], ["knitting"])
+
+        recs = engine.generate_recommendations_for_user(me, [same_skill, same_interest], top_n=1)
+
+        assert recs[0].target_discord_user_id == "x"
+
+
+class TestFieldWeightConfig:
+    """Test field weight configuration."""
+
+    def test_field_weights_from_env(self):
+        with mock.patch.dict(os.environ, {'COMCAT_FIELD_WEIGHTS': 'skills=2,interests=1',
+                                          'COMCAT_FIELD_EMBEDDINGS': 'true'}):
+            config = CommunityCatalystConfig.from_env()
+        assert config.embedding.use_field_embeddings
+        assert config.embedding.field_weights == {'skills': 2.0, 'interests': 1.0}
+        validate_config(config)
+
+    def test_invalid_field_weights(self):
+        config = CommunityCatalystConfig.from_env()
+        config.embedding.field_weights = {'skills': -1.0}
+        with pytest.raises(ValueError):
+            validate_config(config)
@@ -0,0 +1,87 @@
+"""
+Tests for balanced group formation
+================================
+
+Run with: python -m pytest test_group_formation.py -v
+"""
+
+import numpy as np
+import pytest
+
+from community_catalyst_ai import CommunityAnalyzer, UserProfile
+from config import CommunityAnalysisConfig
+from group_formation import form_balanced_groups, group_sizes
+
+
+def clustered_embeddings(num_clusters, per_cluster, dim=16, noise=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(num_clusters, dim))
+    x = np.vstack([c + noise * rng.normal(size=(per_cluster, dim)) for c in centers])
+    order = rng.permutation(len(x))
+    return x[order], np.repeat(np.arange(num_clusters), per_cluster)[order]
+
+
+class TestFormBalancedGroups:
+    """Test form_balanced_groups functionality."""
+
+    def test_group_sizes(self):
+        assert group_sizes(10, 4) == [4, 3, 3]
+        assert group_sizes(12, 4) == [4, 4, 4]
+        assert group_sizes(0, 4) == []
+
+    def test_partition_is_balanced_and_complete(self):
+        x = np.random.default_rng(1).normal(size=(103, 8))
+        result = form_balanced_groups(x, 10)
+
+        sizes = [len(g) for g in result['groups']]
+        assert max(sizes) - min(sizes) <= 1 and len(sizes) == 11
+        assert sorted(i for g in result['groups'] for i in g) == list(range(103))
+
+    def test_recovers_planted_clusters(self):
+        x, labels = clustered_embeddings(6, 20)
+        result = form_balanced_groups(x, 20)
+        assert all(len(set(labels[g])) == 1 for g in result['groups'])
+
+    def test_refinement_improves_cohesion(self):
+        x = np.random.default_rng(2).normal(size=(400, 16))
+        initial = form_balanced_groups(x, 8, time_limit_seconds=0)
+        refined = form_balanced_groups(x, 8, time_limit_seconds=10)
+        assert refined['swaps'] > 0
+        assert np.mean(refined['cohesion']) > np.mean(initial['cohesion'])
+
+    def test_deterministic_for_seed(self):
+        x = np.random.default_rng(3).normal(size=(60, 8))
+        assert form_balanced_groups(x, 6, seed=5)['groups'] == form_balanced_groups(x, 6, seed=5)['groups']
+
+
+class TestCommunityAnalyzerGroups:
+    """Test CommunityAnalyzer.form_balanced_groups."""
+
+    def test_groups_from_cached_embeddings(self):
+        x, labels = clustered_embeddings(3, 8)
+        profiles = [UserProfile(f"u{i}", "guild1", [], [f"topic{labels[i]}"], "", [], "opted_in")
+                    for i in range(len(x))]
+        profiles.append(UserProfile("out", "guild1", [], ["topic0"], "", [], "opted_out"))
+        embeddings = np.vstack([x, np.zeros((1, x.shape[1]))])
+
+        groups = CommunityAnalyzer.form_balanced_groups(profiles, group_size=8, embeddings=embeddings)
+
+        assert len(groups) == 3
+        assert all(g['size'] == 8 and len(g['shared_interests']) == 1 for g in groups)
+        assert "out" not in {u for g in groups for u in g['users']}
+
+    def test_group_size_defaults_to_config(self):
+        x, labels = clustered_embeddings(2, 6)
+        profiles = [UserProfile(f"u{i}", "guild1", [], [f"topic{labels[i]}"], "", [], "opted_in")
+                    for i in range(len(x))]
+
+        groups = CommunityAnalyzer.form_balanced_groups(
+            profiles, embeddings=x,
+            config=CommunityAnalysisConfig(study_group_size=3, group_formation_time_limit_seconds=0.5))
+
+        assert [g['size'] for g in groups] == [3, 3, 3, 3]
+
+    def test_requires_embeddings_or_engine(self):
+        profiles = [UserProfile("u0", "guild1", [], [], "", [], "opted_in")]
+        with pytest.raises(ValueError):
+            CommunityAnalyzer.form_balanced_groups(profiles)
@@ -0,0 +1,120 @@
+"""
+Tests for per-guild residency caching
+===================================
+
+Run with: python -m pytest test_guild_cache.py -v
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from config import GuildCacheConfig
+from guild_cache import GuildCacheManager, GuildDataStore
+
+
+def make_guild(guild_id, n, rng):
+    profiles = [UserProfile(f"{guild_id}-u{i}", guild_id, ["Python"], ["AI"], "", [], "opted_in")
+                for i in range(n)]
+    return profiles, rng.normal(size=(n, 16)).astype(np.float32)
+
+
+class TestGuildDataStore:
+    """Test GuildDataStore persistence."""
+
+    def test_round_trip(self, tmp_path):
+        store = GuildDataStore(str(tmp_path))
+        profiles, embeddings = make_guild("g1", 3, np.random.default_rng(0))
+        store.save("g1", profiles, embeddings)
+
+        data = store.load("g1")
+        assert data.profiles == profiles
+        assert np.allclose(data.embeddings, embeddings)
+        with pytest.raises(KeyError):
+            store.load("missing")
+
+    def test_save_replaces_atomically(self, tmp_path):
+        store = GuildDataStore(str(tmp_path))
+        profiles, embeddings = make_guild("g1", 3, np.random.default_rng(0))
+        store.save("g1", profiles, embeddings)
+        store.save("g1", profiles[:1], embeddings[:1])
+
+        assert store.load("g1").profiles == profiles[:1]
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "g1.meta.json", "g1.v2.embeddings.f32", "g1.v2.profiles.jsonl"]
+
+    def test_interrupted_save_keeps_previous_version(self, tmp_path, monkeypatch):
+        store = GuildDataStore(str(tmp_path))
+        profiles, embeddings = make_guild("g1", 3, np.random.default_rng(0))
+        store.save("g1", profiles, embeddings)
+
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", fail)
+        with pytest.raises(OSError):
+            store.save("g1", profiles[:1], embeddings[:1])
+        monkeypatch.undo()
+
+        assert store.load("g1").profiles == profiles
+        store.save("g1", profiles[:2], embeddings[:2])
+        assert store.load("g1").profiles == profiles[:2]
+
+
+class TestGuildCacheManager:
+    """Test GuildCacheManager functionality."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = GuildDataStore(str(tmp_path))
+        rng = np.random.default_rng(1)
+        for guild_id in ("g1", "g2", "g3"):
+            store.save(guild_id, *make_guild(guild_id, 20, rng))
+        return store
+
+    def test_from_config(self, store):
+        cache = GuildCacheManager.from_config(GuildCacheConfig(memory_budget_mb=2, storage_dir=store.storage_dir),
+                                              top_k=3)
+
+        assert cache.memory_budget_bytes == 2 * 1024 * 1024
+        assert len(cache.get("g2").profiles) == 20
+        assert cache.get_index("g2").k == 3
+
+    def test_hits_and_misses(self, store):
+        cache = GuildCacheManager(store.load, top_k=3)
+        cache.get("g1")
+        cache.get("g1")
+        cache.get("g2")
+
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 0)
+        assert stats['resident_guilds'] == 2
+
+    def test_lru_eviction_under_budget(self, store):
+        one_guild = GuildCacheManager(store.load, top_k=3).get("g1").estimate_nbytes()
+        cache = GuildCacheManager(store.load, memory_budget_bytes=int(one_guild * 2.5), top_k=3)
+
+        cache.get("g1")
+        cache.get("g2")
+        cache.get("g1")  # g2 is now least recently used
+        cache.get("g3")
+
+        assert "g1" in cache and "g3" in cache and "g2" not in cache
+        assert cache.get_stats()['evictions'] == 1
+        assert cache.resident_bytes <= cache.memory_budget_bytes
+
+    def test_oversized_guild_stays_resident(self, store):
+        cache = GuildCacheManager(store.load, memory_budget_bytes=1, top_k=3)
+        cache.get("g1")
+        cache.get("g2")
+        assert "g2" in cache and "g1" not in cache
+
+    def test_recommendations_from_resident_index(self, store, static_embedding_engine):
+        cache = GuildCacheManager(store.load, top_k=3)
+        engine = RecommendationEngine(static_embedding_engine)
+
+        recs = engine.generate_recommendations_from_index(cache.get_index("g1"), "g1-u0", min_similarity=-1.0)
+        assert len(recs) == 3
+        assert all(r.guild_id == "g1" for r in recs)
@@ -0,0 +1,133 @@
+"""
+Tests for guild refresh scheduling
+================================
+
+Run with: python -m pytest test_guild_scheduler.py -v
+"""
+
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from config import SchedulerConfig
+from guild_scheduler import GuildRefreshScheduler
+
+
+def make_profile(user_id, guild_id, skills, consent="opted_in"):
+    return UserProfile(user_id, guild_id, skills, ["AI"], "", [], consent)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGuildRefreshScheduler:
+    """Test GuildRefreshScheduler functionality."""
+
+    @pytest.fixture
+    def guilds(self):
+        return {
+            "g1": [make_profile(f"a{i}", "g1", ["Python", f"skill{i}"]) for i in range(6)],
+            "g2": [make_profile(f"b{i}", "g2", ["Rust", f"skill{i}"]) for i in range(4)],
+        }
+
+    @pytest.fixture
+    def scheduler(self, guilds, hashing_embedding_engine):
+        engine = RecommendationEngine(hashing_embedding_engine)
+        scheduler = GuildRefreshScheduler(engine, lambda g: guilds[g],
+                                          SchedulerConfig(refresh_cadence_minutes=10, cpu_budget_seconds=60),
+                                          top_k=3, clock=FakeClock())
+        for guild_id in guilds:
+            scheduler.register_guild(guild_id)
+        return scheduler
+
+    def test_online_requests_read_snapshots_only(self, scheduler, hashing_embedding_engine):
+        assert scheduler.get_recommendations("g1", "a0") == []
+
+        summary = scheduler.run_pending()
+        assert {r['guild_id'] for r in summary['refreshed']} == {"g1", "g2"}
+
+        encoded = len(hashing_embedding_engine.encoded)
+        recs = scheduler.get_recommendations("g1", "a0")
+        assert len(recs) == 3
+        assert all(r.target_discord_user_id.startswith("a") for r in recs)
+        assert len(hashing_embedding_engine.encoded) == encoded
+
+    def test_nothing_due_until_cadence_or_change(self, scheduler):
+        scheduler.run_pending()
+        assert scheduler.run_pending()['refreshed'] == []
+
+        scheduler._clock.now += 11 * 60
+        assert len(scheduler.run_pending()['refreshed']) == 2
+
+    def test_priority_follows_activity_and_change(self, scheduler):
+        scheduler.run_pending()
+        scheduler._clock.now += 11 * 60
+        scheduler.record_activity("g2", 50)
+
+        summary = scheduler.run_pending()
+        assert [r['guild_id'] for r in summary['refreshed']] == ["g2", "g1"]
+
+    def test_small_change_patches_snapshot(self, scheduler, guilds, hashing_embedding_engine):
+        scheduler.run_pending()
+        guilds["g1"][0] = make_profile("a0", "g1", ["Rust", "skill0"])
+        scheduler.config.incremental_refresh_fraction = 0.5
+        scheduler.mark_changed("g1", ["a0"])
+
+        encoded = len(hashing_embedding_engine.encoded)
+        result = scheduler.run_pending()['refreshed']
+        assert [(r['guild_id'], r['mode']) for r in result] == [("g1", "incremental")]
+        assert len(hashing_embedding_engine.encoded) == encoded + 1
+        assert scheduler.get_snapshot("g1").profiles["a0"].skills == ["Rust", "skill0"]
+
+    def test_patch_is_swapped_in_whole(self, scheduler, guilds):
+        scheduler.run_pending()
+        before = scheduler.get_snapshot("g1")
+        old_top = before.top_k("a1")
+        scheduler.config.incremental_refresh_fraction = 0.5
+        scheduler.mark_changed("g1", ["a0"])
+
+        def loader(guild_id):
+            # A change recorded while the refresh is running is kept for the next one
+            scheduler.mark_changed("g1", ["a2"])
+            guilds["g1"][0] = make_profile("a0", "g1", ["Rust", "skill0"])
+            return guilds[guild_id]
+
+        scheduler.profile_loader = loader
+        scheduler.run_pending()
+
+        assert scheduler.get_snapshot("g1") is not before
+        assert before.profiles["a0"].skills == ["Python", "skill0"]
+        assert before.top_k("a1") == old_top
+        assert scheduler._guilds["g1"].changed_users == {"a2"}
+
+    def test_budget_defers_expensive_guilds(self, scheduler):
+        scheduler.run_pending()
+        scheduler._clock.now += 11 * 60
+        for state in scheduler._guilds.values():
+            state.cpu_seconds_per_profile = 1.0
+        scheduler.record_activity("g2", 50)
+
+        summary = scheduler.run_pending(cpu_budget_seconds=5.0)
+        assert [r['guild_id'] for r in summary['refreshed']] == ["g2"]
+        assert summary['skipped'] == ["g1"]
+
+    def test_guild_over_budget_still_refreshes(self, scheduler):
+        scheduler.run_pending()
+        scheduler._clock.now += 11 * 60
+        for state in scheduler._guilds.values():
+            state.cpu_seconds_per_profile = 1.0
+        scheduler.record_activity("g2", 50)
+
+        # Both guilds cost more than the budget: the top one runs, the other waits
+        summary = scheduler.run_pending(cpu_budget_seconds=2.0)
+        assert ([r['guild_id'] for r in summary['refreshed']], summary['skipped']) == (["g2"], ["g1"])
+
+        # g1 is now the stalest, so it goes first next time
+        scheduler._clock.now += 60
+        scheduler._guilds["g1"].cpu_seconds_per_profile = 1.0
+        summary = scheduler.run_pending(cpu_budget_seconds=2.0)
+        assert [r['guild_id'] for r in summary['refreshed']] == ["g1"]
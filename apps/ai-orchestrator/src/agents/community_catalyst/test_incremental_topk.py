@@ -0,0 +1,108 @@
+"""
+Tests for incremental top-k maintenance
+=====================================
+
+Run with: python -m pytest test_incremental_topk.py -v
+"""
+
+import numpy as np
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from incremental_topk import IncrementalTopKIndex
+
+
+def brute_force_scores(index, embeddings, user_id):
+    """Sorted top-k scores for a user computed from scratch."""
+    ids = list(embeddings)
+
+    def norm(v):
+        return v / np.linalg.norm(v)
+
+    source = norm(embeddings[user_id])
+    scores = sorted((float(norm(embeddings[o]) @ source) for o in ids if o != user_id), reverse=True)
+    return [max(0.0, s) for s in scores[:index.k]]
+
+
+class TestIncrementalTopKIndex:
+    """Test IncrementalTopKIndex functionality."""
+
+    @pytest.fixture
+    def rng(self):
+        return np.random.default_rng(7)
+
+    def assert_matches_brute_force(self, index, embeddings):
+        for user_id in embeddings:
+            got = [score for _, score in index.top_k(user_id)]
+            assert np.allclose(got, brute_force_scores(index, embeddings, user_id), atol=1e-5)
+
+    def test_build(self, rng):
+        embeddings = {f"u{i}": rng.normal(size=16) for i in range(60)}
+        index = IncrementalTopKIndex(k=5, initial_capacity=8)
+        index.build(list(embeddings), np.vstack(list(embeddings.values())), chunk_size=7)
+        self.assert_matches_brute_force(index, embeddings)
+
+    def test_updates_and_removals_match_recompute(self, rng):
+        """Test a stream of updates, inserts and removals keeps every list exact."""
+        embeddings = {f"u{i}": rng.normal(size=8) for i in range(40)}
+        index = IncrementalTopKIndex(k=4)
+        index.build(list(embeddings), np.vstack(list(embeddings.values())))
+
+        for step in range(60):
+            action = step % 3
+            if action == 0:  # profile edit
+                user_id = f"u{rng.integers(40)}"
+                if user_id in embeddings:
+                    embeddings[user_id] = rng.normal(size=8)
+                    index.update(user_id, embeddings[user_id])
+            elif action == 1:  # new member
+                user_id = f"new{step}"
+                embeddings[user_id] = rng.normal(size=8)
+                index.update(user_id, embeddings[user_id])
+            else:  # opt-out
+                user_id = next(iter(embeddings))
+                del embeddings[user_id]
+                index.remove(user_id)
+
+        self.assert_matches_brute_force(index, embeddings)
+
+    def test_reverse_index_and_affected_users(self, rng):
+        """Test updating a member reports everyone whose list changed."""
+        index = IncrementalTopKIndex(k=1)
+        index.build(["a", "b", "c"], np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]]))
+        assert sorted(index.listed_by("b")) == ["a", "c"]
+
+        affected = index.update("c", np.array([1.0, 0.01]))  # c moves next to a
+
+        assert index.top_k("a")[0][0] == "c"
+        assert {"a", "c"} <= affected
+        assert "a" in index.listed_by("c")
+
+    def test_update_rescoring_is_targeted(self, rng):
+        """Test an update re-scores far fewer rows than a full rebuild."""
+        embeddings = rng.normal(size=(500, 32))
+        index = IncrementalTopKIndex(k=5)
+        index.build([f"u{i}" for i in range(500)], embeddings)
+
+        index.update("u0", rng.normal(size=32))
+
+        assert index.get_stats()['rows_rescored'] < 50
+
+
+class TestRecommendationsFromIndex:
+    """Test RecommendationEngine reading from the incremental index."""
+
+    def test_recommendations_from_index(self, static_embedding_engine):
+        profiles = [UserProfile(f"u{i}", "guild1", ["Python"], ["AI"], "", [], "opted_in") for i in range(4)]
+        index = IncrementalTopKIndex(k=2, embedding_engine=static_embedding_engine)
+        for profile in profiles:
+            index.upsert_profile(profile)
+
+        engine = RecommendationEngine(static_embedding_engine)
+        recs = engine.generate_recommendations_from_index(index, "u0")
+        assert len(recs) == 2
+        assert all(r.target_discord_user_id != "u0" for r in recs)
+
+        index.upsert_profile(UserProfile("u1", "guild1", [], [], "", [], "opted_out"))
+        assert "u1" not in index
+        assert all(t != "u1" for t, _ in index.top_k("u0"))
@@ -0,0 +1,125 @@
+"""
+Tests for streaming interest statistics
+=====================================
+
+Run with: python -m pytest test_interest_stats.py -v
+"""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from community_catalyst_ai import CommunityAnalyzer, UserProfile
+from interest_stats import CountMinSketch, InterestStatistics
+
+
+def make_profile(user_id, interests, consent="opted_in"):
+    return UserProfile(user_id, "guild1", [], interests, "", [], consent)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCountMinSketch:
+    """Test CountMinSketch functionality."""
+
+    def test_never_undercounts(self):
+        rng = np.random.default_rng(0)
+        sketch = CountMinSketch(width=64, depth=4)
+        counts = Counter(f"k{int(i)}" for i in rng.zipf(1.5, size=2000) if i < 500)
+        for key, count in counts.items():
+            sketch.add(key, count)
+        assert all(sketch.estimate(key) >= count for key, count in counts.items())
+
+    def test_decrements(self):
+        sketch = CountMinSketch()
+        sketch.add("ai", 3)
+        sketch.add("ai", -2)
+        assert sketch.estimate("ai") == 1
+
+
+class TestInterestStatistics:
+    """Test InterestStatistics functionality."""
+
+    @pytest.fixture
+    def profiles(self):
+        rng = np.random.default_rng(1)
+        popular = ["AI", "Web", "Design", "Rust", "Games"]
+        return [make_profile(f"u{i}", [popular[min(int(rng.zipf(1.7)) - 1, 4)], f"niche{i}"])
+                for i in range(300)]
+
+    def test_top_interests_match_exact_counts(self, profiles):
+        stats = InterestStatistics(capacity=10)
+        stats.update_profiles(profiles)
+
+        exact = Counter(i.lower() for p in profiles for i in p.interests)
+        top = stats.top_interests(3)
+        assert [i for i, _ in top] == [i for i, _ in exact.most_common(3)]
+        assert all(count == exact[i] for i, count in top)
+
+    def test_profile_edits_and_opt_outs(self):
+        stats = InterestStatistics()
+        stats.update_profiles([make_profile("a", ["AI"]), make_profile("b", ["AI", "Web"])])
+
+        stats.update_profile(make_profile("b", ["Web"]))
+        stats.update_profile(make_profile("a", ["AI"], consent="opted_out"))
+
+        assert stats.estimate("ai") == 0
+        assert stats.top_interests() == [("web", 1)]
+        assert stats.members("web") == ["b"]
+
+    @pytest.mark.parametrize("options", [{'candidate_pool': 2}, {'track_members': False}])
+    def test_opt_outs_reorder_top_interests(self, options):
+        stats = InterestStatistics(capacity=2, **options)
+        stats.update_profiles([make_profile(f"a{i}", ["A"]) for i in range(5)] +
+                              [make_profile(f"b{i}", ["B"]) for i in range(4)] +
+                              [make_profile(f"c{i}", ["C"]) for i in range(3)])
+
+        for i in range(4):
+            stats.update_profile(make_profile(f"a{i}", ["A"], consent="opted_out"))
+
+        assert stats.top_interests() == [("b", 4), ("c", 3)]
+        if stats.track_members:
+            clusters = CommunityAnalyzer.identify_interest_clusters([], min_cluster_size=2, interest_stats=stats)
+            assert [(c['interest'], c['size']) for c in clusters] == [("b", 4), ("c", 3)]
+
+    def test_trending_window(self):
+        clock = FakeClock()
+        stats = InterestStatistics(window_seconds=3600, window_buckets=6, clock=clock)
+        stats.update_profiles([make_profile(f"old{i}", ["AI"]) for i in range(5)])
+
+        clock.now += 2 * 3600
+        stats.update_profiles([make_profile(f"new{i}", ["Rust"]) for i in range(2)])
+
+        assert stats.trending_interests() == [("rust", 2)]
+        assert stats.top_interests()[0] == ("ai", 5)
+
+
+class TestCommunityAnalyzerWithStatistics:
+    """Test CommunityAnalyzer answering from InterestStatistics."""
+
+    def test_matches_recount(self):
+        profiles = [
+            make_profile("user1", ["AI", "Machine Learning"]),
+            make_profile("user2", ["AI", "Web Development"]),
+            make_profile("user3", ["AI", "Data Science"]),
+            make_profile("user4", ["Design", "UX"]),
+            make_profile("user5", ["Design", "Art"]),
+            make_profile("user6", ["Design"], consent="opted_out"),
+        ]
+        stats = InterestStatistics()
+        stats.update_profiles(profiles)
+
+        recount = CommunityAnalyzer.identify_interest_clusters(profiles, min_cluster_size=2)
+        streamed = CommunityAnalyzer.identify_interest_clusters([], min_cluster_size=2, interest_stats=stats)
+        assert [(c['interest'], sorted(c['users'])) for c in streamed] == \
+            [(c['interest'], sorted(c['users'])) for c in recount]
+
+        assert CommunityAnalyzer.suggest_meetup_topics([], interest_stats=stats) == \
+            CommunityAnalyzer.suggest_meetup_topics(profiles)
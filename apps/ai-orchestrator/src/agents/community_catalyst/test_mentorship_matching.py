@@ -0,0 +1,97 @@
+"""
+Tests for mentor-mentee matching
+==============================
+
+Run with: python -m pytest test_mentorship_matching.py -v
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from community_catalyst_ai import UserProfile
+from mentorship_matching import MentorshipMatcher, stable_match, top_k_candidates
+
+
+def blocking_pairs(indices, scores, assignment, capacity):
+    """Count (mentee, mentor) pairs in the candidate graph that would both prefer each other."""
+    n_mentors = int(indices.max()) + 1
+    held = [[] for _ in range(n_mentors)]
+    for mentee, mentor in enumerate(assignment):
+        if mentor >= 0:
+            held[mentor].append(scores[mentee][list(indices[mentee]).index(mentor)])
+
+    count = 0
+    for mentee in range(len(indices)):
+        current = assignment[mentee]
+        for mentor, score in zip(indices[mentee], scores[mentee]):
+            if mentor == current:
+                break  # remaining choices are worse for the mentee
+            if len(held[mentor]) < capacity or score > min(held[mentor]):
+                count += 1
+    return count
+
+
+class TestMentorshipMatching:
+    """Test MentorshipMatcher functionality."""
+
+    def test_top_k_candidates_sorted(self):
+        """Test candidates are the true top-k, sorted descending."""
+        rng = np.random.default_rng(1)
+        mentees, mentors = rng.normal(size=(50, 16)), rng.normal(size=(30, 16))
+        indices, scores = top_k_candidates(mentees, mentors, k=5, chunk_size=7)
+
+        def norm(m):
+            return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+        full = norm(mentees) @ norm(mentors).T
+        expected = np.sort(full, axis=1)[:, ::-1][:, :5]
+        assert np.allclose(scores, expected, atol=1e-5)
+        assert np.all(np.diff(scores, axis=1) <= 1e-6)
+
+    def test_capacity_and_stability(self):
+        """Test capacities hold and no blocking pairs exist within the candidate graph."""
+        rng = np.random.default_rng(2)
+        indices, scores = top_k_candidates(rng.normal(size=(200, 8)), rng.normal(size=(20, 8)), k=6)
+        assignment = stable_match(indices, scores, n_mentors=20, mentor_capacity=4)
+
+        loads = np.bincount(assignment[assignment >= 0], minlength=20)
+        assert loads.max() <= 4
+        assert blocking_pairs(indices, scores, assignment, 4) == 0
+
+    def test_match_embeddings_stats(self):
+        """Test result structure and stats for an undersubscribed pool."""
+        rng = np.random.default_rng(3)
+        matcher = MentorshipMatcher()
+        result = matcher.match_embeddings(
+            [f"m{i}" for i in range(5)], rng.normal(size=(5, 8)),
+            [f"e{i}" for i in range(8)], rng.normal(size=(8, 8)),
+            mentor_capacity=2, candidate_k=5
+        )
+
+        assert result.stats['num_matched'] == 8
+        assert result.unmatched_mentee_ids == []
+        assert 1.0 <= result.stats['mean_mentee_rank'] <= 5.0
+        assert result.stats['mentor_utilization'] == pytest.approx(0.8)
+
+    def test_same_user_never_self_matched(self, static_embedding_engine):
+        """Test a member listed as both mentor and mentee isn't paired with themselves."""
+        profiles = [UserProfile(f"u{i}", "guild1", ["Python"], [], "", [], "opted_in") for i in range(2)]
+        matcher = MentorshipMatcher(static_embedding_engine)
+        result = matcher.match_profiles(profiles, profiles, mentor_capacity=1, candidate_k=2)
+
+        assert all(m.mentor_discord_user_id != m.mentee_discord_user_id for m in result.matches)
+        assert result.stats['num_matched'] == 2
+
+    def test_scales_to_thousands(self):
+        """Test thousands of participants are matched in seconds."""
+        rng = np.random.default_rng(4)
+        start = time.perf_counter()
+        result = MentorshipMatcher().match_embeddings(
+            [f"m{i}" for i in range(1000)], rng.normal(size=(1000, 384)),
+            [f"e{i}" for i in range(5000)], rng.normal(size=(5000, 384)),
+            mentor_capacity=5, candidate_k=20
+        )
+        assert time.perf_counter() - start < 10.0
+        assert result.stats['match_rate'] > 0.95
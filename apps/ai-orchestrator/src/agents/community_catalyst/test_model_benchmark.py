@@ -0,0 +1,94 @@
+"""
+Tests for the embedding model benchmark
+=====================================
+
+Run with: python -m pytest test_model_benchmark.py -v
+"""
+
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+from config import CommunityCatalystConfig, check_latency_budget, validate_config
+from model_benchmark import format_table, load_profile_texts, top_k_agreement
+
+
+@pytest.fixture
+def report():
+    """Minimal benchmark report as written by model_benchmark.py."""
+    return {
+        'corpus_size': 100,
+        'batch_sizes': [1, 32],
+        'reference_model': 'all-mpnet-base-v2',
+        'top_k': 5,
+        'models': {
+            'all-MiniLM-L6-v2': {
+                'available': True, 'load_time_s': 1.2, 'dimensions': 384, 'peak_rss_mb': 410.0,
+                'throughput': {'1': 100.0, '32': 1000.0},
+                'ms_per_profile': {'1': 10.0, '32': 1.0},
+                'topk_agreement': 0.8,
+            },
+            'all-mpnet-base-v2': {'available': False, 'error': 'not cached', 'topk_agreement': None},
+        },
+    }
+
+
+class TestModelBenchmark:
+    """Test benchmark helpers that don't need a model."""
+
+    def test_top_k_agreement(self):
+        """Test identical embeddings agree fully and rotations don't change neighbours."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(20, 8))
+        rotation, _ = np.linalg.qr(rng.normal(size=(8, 8)))
+
+        assert top_k_agreement(embeddings, embeddings, 3) == 1.0
+        assert top_k_agreement(embeddings @ rotation, embeddings, 3) == pytest.approx(1.0)
+        assert top_k_agreement(rng.normal(size=(20, 8)), embeddings, 3) < 1.0
+
+    def test_format_table(self, report):
+        """Test table rendering includes available and unavailable models."""
+        table = format_table(report)
+        assert 'all-MiniLM-L6-v2' in table
+        assert 'unavailable' in table
+        assert 'p/s@32' in table
+
+    def test_load_profile_texts(self, tmp_path):
+        """Test JSONL corpus loading uses the UserProfile text format."""
+        path = tmp_path / "profiles.jsonl"
+        path.write_text(json.dumps({'discord_user_id': 'u1', 'skills': ['Python']}) + "\n\n"
+                        + json.dumps({'discord_user_id': 'u2', 'interests': ['AI']}) + "\n")
+        texts = load_profile_texts(str(path))
+        assert len(texts) == 2
+        assert "Skills: Python" in texts[0]
+
+
+class TestLatencyBudget:
+    """Test latency budget checks in configuration validation."""
+
+    def test_budget_met(self, report):
+        config = CommunityCatalystConfig.from_env()
+        config.embedding.latency_budget_ms = 5.0
+        config.embedding.batch_size = 32
+        assert check_latency_budget(config, report) is None
+
+    def test_budget_exceeded_warns(self, report, tmp_path):
+        """Test validate_config warns using results loaded from disk."""
+        results_path = tmp_path / "benchmark.json"
+        results_path.write_text(json.dumps(report))
+
+        config = CommunityCatalystConfig.from_env()
+        config.embedding.latency_budget_ms = 5.0
+        config.embedding.batch_size = 1
+        config.embedding.benchmark_results_path = str(results_path)
+
+        with pytest.warns(UserWarning, match="latency budget"):
+            validate_config(config)
+
+    def test_no_budget_no_warning(self, report):
+        config = CommunityCatalystConfig.from_env()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            validate_config(config, benchmark_results=report)
@@ -0,0 +1,103 @@
+"""
+Tests for near-duplicate profile detection
+========================================
+
+Run with: python -m pytest test_profile_dedup.py -v
+"""
+
+import time
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from config import RecommendationConfig
+from profile_dedup import ProfileDeduplicator, choose_bands, shingle
+
+
+def make_profile(uid, about, skills=("Python", "Docker")):
+    return UserProfile(uid, "guild1", list(skills), ["AI"], about, [], "opted_in")
+
+
+SPAM = "Earn crypto fast join my server for free airdrops and guaranteed daily profit now"
+
+
+class TestProfileDeduplicator:
+    """Test ProfileDeduplicator functionality."""
+
+    def test_shingle_ignores_template_labels(self):
+        """Test empty profiles don't share shingles through the field labels."""
+        empty = UserProfile("u", "g", [], [], "", [])
+        assert shingle(empty.to_profile_text()) == set()
+
+    def test_choose_bands(self):
+        bands, rows = choose_bands(128, 0.8)
+        assert bands * rows == 128
+        assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.1
+
+    def test_detects_copy_pasted_profiles(self):
+        """Test copy-pasted profiles cluster while distinct profiles stay apart."""
+        profiles = [
+            make_profile("bot1", SPAM),
+            make_profile("bot2", SPAM + "!"),
+            make_profile("bot3", SPAM.upper()),
+            make_profile("alice", "Backend engineer who loves distributed systems and databases"),
+            make_profile("bob", "Designer focused on accessible interfaces and typography", ["Figma"]),
+        ]
+        result = ProfileDeduplicator(threshold=0.8).find_duplicates(profiles)
+
+        assert sorted(result.clusters[0]) == ["bot1", "bot2", "bot3"]
+        assert len(result.profiles) == 3
+        representative = set(result.duplicate_of.values())
+        assert len(representative) == 1 and representative <= {"bot1", "bot2", "bot3"}
+        assert result.stats['duplicates'] == 2
+        assert result.stats['embeddings_saved'] == 2
+
+    def test_flag_mode_keeps_all_profiles(self):
+        profiles = [make_profile("a", SPAM), make_profile("b", SPAM)]
+        result = ProfileDeduplicator().find_duplicates(profiles, collapse=False)
+        assert len(result.profiles) == 2
+        assert len(result.duplicate_of) == 1
+
+    def test_sparse_profiles_are_not_clustered(self):
+        """Test short identical profiles of real members are left alone."""
+        profiles = [UserProfile(f"u{i}", "guild1", ["python", "docker"], [], "", [], "opted_in")
+                    for i in range(4)]
+        profiles += [make_profile("bot1", SPAM), make_profile("bot2", SPAM)]
+
+        result = ProfileDeduplicator().find_duplicates(profiles)
+
+        assert result.clusters == [["bot1", "bot2"]]
+        assert [p.discord_user_id for p in result.profiles][:4] == ["u0", "u1", "u2", "u3"]
+
+    def test_roughly_linear_time(self):
+        """Test a few thousand profiles are processed quickly."""
+        profiles = [make_profile(f"u{i}", f"member {i} builds project number {i * 7} with tooling {i % 13}")
+                    for i in range(3000)]
+        profiles += [make_profile(f"bot{i}", SPAM) for i in range(500)]
+
+        start = time.perf_counter()
+        result = ProfileDeduplicator().find_duplicates(profiles)
+        assert time.perf_counter() - start < 20.0
+        assert result.stats['duplicates'] >= 499
+
+
+class TestEngineDeduplication:
+    """Test near-duplicate collapsing in RecommendationEngine."""
+
+    def test_duplicates_collapsed_before_scoring(self, static_embedding_engine):
+        profiles = [make_profile("me", "Data engineer working on streaming pipelines")]
+        profiles += [make_profile(f"bot{i}", SPAM) for i in range(5)]
+        engine = RecommendationEngine(static_embedding_engine,
+                                      config=RecommendationConfig(deduplicate_targets=True))
+
+        recs = engine.generate_recommendations_batch(profiles[:1], profiles, top_n_per_user=5)
+
+        assert len(recs) == 1
+
+    def test_sparse_targets_stay_recommendable(self, static_embedding_engine):
+        profiles = [UserProfile(f"u{i}", "guild1", ["python", "docker"], [], "", [], "opted_in")
+                    for i in range(4)]
+        engine = RecommendationEngine(static_embedding_engine,
+                                      config=RecommendationConfig(deduplicate_targets=True))
+
+        recs = engine.generate_recommendations_batch(profiles[:1], profiles, top_n_per_user=5)
+
+        assert sorted(r.target_discord_user_id for r in recs) == ["u1", "u2", "u3"]
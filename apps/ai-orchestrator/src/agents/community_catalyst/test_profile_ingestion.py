@@ -0,0 +1,135 @@
+"""
+Tests for streaming profile ingestion
+===================================
+
+Run with: python -m pytest test_profile_ingestion.py -v
+"""
+
+import json
+
+import pytest
+
+from guild_cache import GuildDataStore
+from profile_ingestion import ProfileIngestionPipeline, normalize_terms, record_to_profile
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + '\n')
+
+
+def export_records(n, guilds=("g1", "g2")):
+    return [{'discord_user_id': f"u{i}", 'guild_id': guilds[i % len(guilds)],
+             'skills': "Python; python ;  Machine   Learning", 'interests': ["AI"],
+             'consent_status': 'opted_in'} for i in range(n)]
+
+
+class FailingEngine:
+    """Embedding engine that fails after a number of batches."""
+
+    def __init__(self, inner, fail_after):
+        self.inner = inner
+        self.fail_after = fail_after
+        self.batches = 0
+
+    def create_embeddings_batch(self, profiles):
+        self.batches += 1
+        if self.batches > self.fail_after:
+            raise RuntimeError("worker crashed")
+        return self.inner.create_embeddings_batch(profiles)
+
+
+class TestNormalization:
+    """Test record validation and normalisation."""
+
+    def test_normalize_terms(self):
+        assert normalize_terms("Python; python ,  Machine   Learning|") == ["Python", "Machine Learning"]
+        assert normalize_terms(["ML", "ml"], aliases={"ml": "Machine Learning"}) == ["Machine Learning"]
+        assert normalize_terms(None) == []
+
+    def test_record_validation(self):
+        profile = record_to_profile({'discord_user_id': 42, 'skills': "Go", 'consent_status': "Opted_In"},
+                                    default_guild_id="g1")
+        assert (profile.discord_user_id, profile.guild_id, profile.consent_status) == ("42", "g1", "opted_in")
+
+        with pytest.raises(ValueError):
+            record_to_profile({'guild_id': "g1"})
+        with pytest.raises(ValueError):
+            record_to_profile({'discord_user_id': "1", 'guild_id': "g1", 'consent_status': "maybe"})
+
+
+class TestProfileIngestionPipeline:
+    """Test ProfileIngestionPipeline functionality."""
+
+    def test_ingests_jsonl_in_chunks(self, tmp_path, hashing_embedding_engine):
+        records = export_records(10) + ['{not json', {'guild_id': 'g1'},
+                                        {'discord_user_id': 'x', 'guild_id': 'g1', 'consent_status': 'opted_out'}]
+        write_jsonl(tmp_path / "export.jsonl", records)
+        store = GuildDataStore(str(tmp_path / "store"))
+
+        report = ProfileIngestionPipeline(hashing_embedding_engine, store, chunk_size=4).run(
+            str(tmp_path / "export.jsonl"))
+
+        assert (report.rows_read, report.rows_ingested, report.rows_rejected, report.rows_opted_out) == (13, 10, 2, 1)
+        assert report.chunks == 4
+        assert report.rows_per_second > 0
+        g1 = store.load("g1")
+        assert len(g1.profiles) == 5 and g1.embeddings.shape == (5, 64)
+        assert g1.profiles[0].skills == ["Python", "Machine Learning"]
+
+    def test_ingests_csv(self, tmp_path, hashing_embedding_engine):
+        (tmp_path / "export.csv").write_text(
+            "discord_user_id,guild_id,skills,interests,about_me,consent_status\n"
+            "1,g1,\"Rust, Go\",AI,hello,opted_in\n"
+            "2,g1,Python,Web,,opted_in\n", encoding='utf-8')
+        store = GuildDataStore(str(tmp_path / "store"))
+
+        report = ProfileIngestionPipeline(hashing_embedding_engine, store).run(str(tmp_path / "export.csv"))
+
+        assert report.rows_ingested == 2
+        assert store.load("g1").profiles[0].skills == ["Rust", "Go"]
+
+    def test_resume_after_crash(self, tmp_path, hashing_embedding_engine):
+        write_jsonl(tmp_path / "export.jsonl", export_records(20))
+        store = GuildDataStore(str(tmp_path / "store"))
+        checkpoint = str(tmp_path / "ckpt.json")
+
+        with pytest.raises(RuntimeError):
+            ProfileIngestionPipeline(FailingEngine(hashing_embedding_engine, fail_after=2), store,
+                                     chunk_size=5, checkpoint_path=checkpoint).run(str(tmp_path / "export.jsonl"))
+        # Simulate a half-written chunk left behind by the crash
+        with open(store._paths("g1")['embeddings'], 'ab') as f:
+            f.write(b'\0' * 256)
+
+        report = ProfileIngestionPipeline(hashing_embedding_engine, store, chunk_size=5,
+                                          checkpoint_path=checkpoint).run(str(tmp_path / "export.jsonl"))
+
+        assert report.resumed_from_row == 10
+        assert report.rows_read == 10
+        ids = [p.discord_user_id for g in ("g1", "g2") for p in store.load(g).profiles]
+        assert sorted(ids, key=lambda u: int(u[1:])) == [f"u{i}" for i in range(20)]
+        g1 = store.load("g1")
+        assert len(g1.profiles) == len(g1.embeddings) == 10
+
+    def test_opt_out_hides_previously_ingested_user(self, tmp_path, hashing_embedding_engine):
+        store = GuildDataStore(str(tmp_path / "store"))
+        write_jsonl(tmp_path / "first.jsonl", export_records(4, guilds=("g1",)))
+        ProfileIngestionPipeline(hashing_embedding_engine, store).run(str(tmp_path / "first.jsonl"))
+
+        write_jsonl(tmp_path / "second.jsonl", [
+            {'discord_user_id': 'u1', 'guild_id': 'g1', 'skills': "Go", 'consent_status': 'opted_out'},
+            {'discord_user_id': 'u2', 'guild_id': 'g1', 'consent_status': 'opted_out'},
+            {'discord_user_id': 'u2', 'guild_id': 'g1', 'skills': "Go", 'consent_status': 'opted_in'},
+            {'discord_user_id': 'new', 'guild_id': 'g9', 'consent_status': 'opted_out'},
+        ])
+        report = ProfileIngestionPipeline(hashing_embedding_engine, store).run(str(tmp_path / "second.jsonl"))
+
+        assert (report.rows_ingested, report.rows_opted_out) == (1, 3)
+        g1 = store.load("g1")
+        assert [p.discord_user_id for p in g1.profiles] == ["u0", "u3", "u2"]
+        assert len(g1.embeddings) == 3
+        assert not store.exists("g9")
+        with open(store._paths("g1")['profiles'], encoding='utf-8') as f:
+            tombstone = [json.loads(line) for line in f][4]
+        assert tombstone['discord_user_id'] == "u1" and tombstone['skills'] == []
@@ -0,0 +1,94 @@
+"""
+Tests for cross-encoder re-ranking
+================================
+
+Run with: python -m pytest test_reranker.py -v
+"""
+
+import time
+
+import pytest
+
+from community_catalyst_ai import RecommendationEngine, UserProfile
+from reranker import CrossEncoderReranker
+
+
+class KeywordCrossEncoder:
+    """Cross-encoder stand-in: scores a pair by whether the target mentions Rust."""
+
+    def __init__(self, delay_seconds=0.0):
+        self.delay_seconds = delay_seconds
+        self.pairs_seen = 0
+
+    def predict(self, pairs):
+        time.sleep(self.delay_seconds)
+        self.pairs_seen += len(pairs)
+        return [0.9 if "rust" in target.lower() else 0.2 for _, target in pairs]
+
+
+def make_profile(user_id, skills):
+    return UserProfile(user_id, "guild1", skills, ["AI"], "", [], "opted_in")
+
+
+class TestCrossEncoderReranker:
+    """Test CrossEncoderReranker functionality."""
+
+    @pytest.fixture
+    def profiles(self):
+        return {f"u{i}": make_profile(f"u{i}", ["Rust"] if i == 3 else ["Python"]) for i in range(6)}
+
+    @pytest.fixture
+    def candidates(self):
+        return [(f"u{i}", 0.9 - 0.1 * i) for i in range(6)]
+
+    def test_reorders_top_m_only(self, profiles, candidates):
+        reranker = CrossEncoderReranker(top_m=4, model=KeywordCrossEncoder())
+        source = make_profile("src", ["Python"])
+
+        ordered, scores = reranker.rerank(source, candidates, profiles)
+
+        assert [c[0] for c in ordered] == ["u3", "u0", "u1", "u2", "u4", "u5"]
+        assert set(scores) == {"u0", "u1", "u2", "u3"}
+        assert scores["u3"] == pytest.approx(0.9)
+
+    def test_cache_keyed_by_profile_version(self, profiles, candidates):
+        model = KeywordCrossEncoder()
+        reranker = CrossEncoderReranker(top_m=4, model=model)
+        source = make_profile("src", ["Python"])
+
+        reranker.rerank(source, candidates, profiles)
+        reranker.rerank(source, candidates, profiles)
+        assert model.pairs_seen == 4
+        assert reranker.get_stats()['cache_hits'] == 4
+
+        profiles["u0"] = make_profile("u0", ["Rust"])
+        ordered, _ = reranker.rerank(source, candidates, profiles)
+        assert model.pairs_seen == 5
+        assert [c[0] for c in ordered[:2]] == ["u0", "u3"]
+
+    def test_latency_budget_bounds_work(self, profiles, candidates):
+        model = KeywordCrossEncoder(delay_seconds=0.02)
+        reranker = CrossEncoderReranker(top_m=6, batch_size=2, latency_budget_ms=10, model=model)
+
+        ordered, scores = reranker.rerank(make_profile("src", ["Python"]), candidates, profiles)
+
+        # One batch fits before the budget check trips; the rest keeps bi-encoder order
+        assert model.pairs_seen == 2
+        assert set(scores) == {"u0", "u1"}
+        assert [c[0] for c in ordered] == [c[0] for c in candidates]
+        assert reranker.get_stats()['budget_exhausted'] == 1
+
+
+class TestRecommendationEngineReranking:
+    """Test the two-stage pipeline in RecommendationEngine."""
+
+    def test_reranked_recommendations(self, hashing_embedding_engine):
+        profiles = [make_profile(f"u{i}", ["Python", "Rust" if i == 4 else f"tool{i}"]) for i in range(6)]
+        reranker = CrossEncoderReranker(top_m=10, model=KeywordCrossEncoder())
+        engine = RecommendationEngine(hashing_embedding_engine, reranker=reranker)
+
+        recs = engine.generate_recommendations_for_user(profiles[0], profiles, top_n=2, min_similarity=0.0)
+
+        assert recs[0].target_discord_user_id == "u4"
+        assert recs[0].explanations['rerank_score'] == pytest.approx(0.9)
+        assert reranker.get_stats()['pairs_scored'] == 5
@@ -0,0 +1,30 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from decide_personal_trait import TIPI_COLUMNS, assign_personality_label, score_tipi
+
+
+def generate_tipi_responses(num_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.integers(1, 8, size=(num_rows, len(TIPI_COLUMNS))), columns=TIPI_COLUMNS)
+
+
+def main(num_rows: int = 1_000_000):
+    df = generate_tipi_responses(num_rows)
+
+    start = time.perf_counter()
+    big5 = score_tipi(df)
+    scored = time.perf_counter()
+    labels = assign_personality_label(big5)
+    done = time.perf_counter()
+
+    print(f"{num_rows:,} rows: scoring {scored - start:.2f}s, labelling {done - scored:.2f}s, "
+          f"total {done - start:.2f}s")
+    print(labels.value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,127 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine for the parse cache)
+except ImportError:
+    pyarrow = None
+
+EXPERIENCE_LEVELS = ['Beginner', 'Intermediate', 'Expert']
+
+# Categoricals dictionary-encode repeated values; list fields repeat a lot
+# (same skill combinations), so each distinct value is parsed only once
+CONTESTANT_DTYPES = {
+    'Name': 'string',
+    'Skills': 'category',
+    'Interests': 'category',
+    'ExperienceLevel': pd.CategoricalDtype(EXPERIENCE_LEVELS),
+    'ProjectPreference': 'category',
+    'PersonalityTrait': 'category',
+}
+
+
+def read_contestants(file_path):
+    """Read the contestant CSV with explicit dtypes (columns that are present only)."""
+    header = pd.read_csv(file_path, nrows=0).columns
+    return pd.read_csv(file_path, dtype={col: dtype for col, dtype in CONTESTANT_DTYPES.items() if col in header})
+
+
+def explode_terms(values):
+    """One entry per term: a Series of stripped terms indexed by row position.
+
+    Accepts comma-separated strings and/or list-likes (as produced by a
+    previous parse or read back from the cache). Blank terms are dropped;
+    order within a row is kept.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    if isinstance(values.dtype, pd.StringDtype):
+        pieces = [values.str.split(',').explode()]
+    else:
+        is_list = values.map(pd.api.types.is_list_like).to_numpy(dtype=bool)
+        is_str = values.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+        pieces = [values[is_str].astype('string').str.split(',').explode(), values[is_list].explode()]
+    terms = pd.concat(pieces).dropna().astype(str).str.strip()
+    return terms[terms != ''].sort_index(kind='stable')
+
+
+def term_lists(terms, num_rows):
+    """Per-row lists from explode_terms output (empty lists for rows without terms)."""
+    values = terms.to_numpy(dtype=object)
+    bounds = np.searchsorted(terms.index.to_numpy(), np.arange(num_rows + 1))
+    return [values[bounds[row]:bounds[row + 1]].tolist() for row in range(num_rows)]
+
+
+def one_hot_terms(terms, num_rows):
+    """(num_rows, vocabulary) sparse 0/1 matrix and the sorted vocabulary."""
+    codes, vocabulary = pd.factorize(terms, sort=True)
+    matrix = csr_matrix((np.ones(len(codes), dtype=np.int64), (terms.index.to_numpy(), codes)),
+                        shape=(num_rows, len(vocabulary)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix, list(vocabulary)
+
+
+def parse_terms(values):
+    """Term lists, sparse one-hot matrix and sorted vocabulary for a list field.
+
+    Values are dictionary-encoded first (categorical codes, or factorized),
+    so each distinct value is split and encoded once; rows then just index
+    the per-value results.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    elif isinstance(values.dtype, pd.StringDtype):
+        codes, uniques = pd.factorize(values)
+    else:
+        # Lists are not hashable; factorize them as tuples
+        keys = values.map(lambda v: tuple(v) if pd.api.types.is_list_like(v) else v)
+        codes, uniques = pd.factorize(keys)
+
+    terms = explode_terms(pd.Series(uniques, dtype=object))
+    unique_lists = term_lists(terms, len(uniques)) + [[]]  # code -1 (missing) -> last, empty
+    unique_matrix, vocabulary = one_hot_terms(terms, len(uniques) + 1)
+    codes = np.where(codes >= 0, codes, len(uniques))
+    return [list(unique_lists[code]) for code in codes], unique_matrix[codes], vocabulary
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_contestants(file_path, cache_dir=None):
+    """Read contestants and parse Skills/Interests into lists, cached by CSV hash.
+
+    With `cache_dir`, the parsed table is stored as Parquet named after the
+    CSV's content hash, so an unchanged file is never parsed twice. Caching
+    needs pyarrow and is skipped (with a message) without it.
+    """
+    cache_path = None
+    if cache_dir and pyarrow is None:
+        print("pyarrow is not installed; contestant parse cache disabled")
+    elif cache_dir:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        cache_path = os.path.join(cache_dir, f"{stem}.{file_digest(file_path)[:16]}.parquet")
+        if os.path.exists(cache_path):
+            return pd.read_parquet(cache_path)
+
+    data = read_contestants(file_path)
+    for column in ('Skills', 'Interests'):
+        if column in data.columns:
+            data[column] = parse_terms(data[column])[0]
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    return data
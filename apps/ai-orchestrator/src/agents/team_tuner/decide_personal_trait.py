@@ -2,58 +2,55 @@ import numpy as np
 import pandas as pd
 
 # TIPI scoring: reverse-score items 2,4,6,8,10
+TIPI_COLUMNS = [f"TIPI{i}" for i in range(1, 11)]
 TIPI_REVERSED = {2, 4, 6, 8, 10}
+BIG5_TRAITS = ["Extraversion", "Agreeableness", "Conscientiousness", "EmotionalStability", "Openness"]
+# Item pairs (1-based) averaged into each trait, in BIG5_TRAITS order
+BIG5_ITEMS = [(1, 6), (2, 7), (3, 8), (4, 9), (5, 10)]
+# Fallback anchors, in tie-break order (first wins, as with max() over a dict)
+PERSONALITY_LABELS = ["Leader", "Creative", "Analytical", "Collaborative"]
 
 def reverse_score(x, min_val=1, max_val=7):
     return (max_val + min_val) - x
 
 def score_tipi(df):
     # Expect columns TIPI1..TIPI10 (1–7)
-    for i in range(1, 11):
-        col = f"TIPI{i}"
+    for col in TIPI_COLUMNS:
         if col not in df.columns:
             raise ValueError(f"Missing TIPI column: {col}")
-    scored = df[[f"TIPI{i}" for i in range(1, 11)]].astype(float).copy()
-    for i in TIPI_REVERSED:
-        col = f"TIPI{i}"
-        scored[col] = scored[col].apply(reverse_score)
+    scored = df[TIPI_COLUMNS].to_numpy(dtype=float, copy=True)
+    reversed_cols = [i - 1 for i in sorted(TIPI_REVERSED)]
+    scored[:, reversed_cols] = reverse_score(scored[:, reversed_cols])
 
-    # Big Five (average the two relevant items)
-    big5 = pd.DataFrame(index=df.index)
-    big5["Extraversion"] = (scored["TIPI1"] + scored["TIPI6"]) / 2
-    big5["Agreeableness"] = (scored["TIPI2"] + scored["TIPI7"]) / 2
-    big5["Conscientiousness"] = (scored["TIPI3"] + scored["TIPI8"]) / 2
-    big5["EmotionalStability"] = (scored["TIPI4"] + scored["TIPI9"]) / 2  # higher = more stable
-    big5["Openness"] = (scored["TIPI5"] + scored["TIPI10"]) / 2
-    return big5
+    # Big Five (average the two relevant items); EmotionalStability: higher = more stable
+    first, second = (np.array(items) - 1 for items in zip(*BIG5_ITEMS))
+    big5 = (scored[:, first] + scored[:, second]) / 2
+    return pd.DataFrame(big5, index=df.index, columns=BIG5_TRAITS)
 
 def assign_personality_label(big5: pd.DataFrame) -> pd.Series:
     # Compute z-scores within the intake cohort for relative comparisons
-    z = (big5 - big5.mean()) / (big5.std(ddof=0) + 1e-6)
+    values = big5[BIG5_TRAITS].to_numpy(dtype=float)
+    z = (values - np.nanmean(values, axis=0)) / (np.nanstd(values, axis=0) + 1e-6)
+    ez, az, cz, sz, oz = z.T
 
-    labels = []
-    for i in big5.index:
-        ez, az, cz, sz, oz = z.loc[i, ["Extraversion","Agreeableness","Conscientiousness","EmotionalStability","Openness"]]
+    # Fallback: pick the max of selected anchors (columns in PERSONALITY_LABELS order)
+    anchors = np.column_stack([ez + 0.3*cz, oz, cz - 0.2*ez, az])
+    # Missing answers give NaN anchors; like max() over a dict, a NaN is never
+    # chosen over the running max, but a NaN first anchor (Leader) is kept
+    missing = np.isnan(anchors)
+    choice = np.argmax(np.where(missing, -np.inf, anchors), axis=1)
+    choice[missing[:, 0]] = 0
+    labels = np.array(PERSONALITY_LABELS, dtype=object)[choice]
 
-        # Priority rules (tune thresholds as needed, e.g., 0.4–0.6)
-        if ez > 0.6 and cz > 0.3:
-            labels.append("Leader")
-        elif oz > 0.6:
-            labels.append("Creative")
-        elif cz > 0.6 and ez < 0.2:
-            labels.append("Analytical")
-        elif az > 0.5:
-            labels.append("Collaborative")
-        else:
-            # Fallback: pick the max of selected anchors
-            anchors = {
-                "Leader": float(ez + 0.3*cz),
-                "Creative": float(oz),
-                "Analytical": float(cz - 0.2*ez),
-                "Collaborative": float(az),
-            }
-            labels.append(max(anchors, key=anchors.get))
-    return pd.Series(labels, index=big5.index, name="PersonalityTrait")
+    # Priority rules (tune thresholds as needed, e.g., 0.4–0.6); the first matching rule wins
+    rules = [
+        ("Leader", (ez > 0.6) & (cz > 0.3)),
+        ("Creative", oz > 0.6),
+        ("Analytical", (cz > 0.6) & (ez < 0.2)),
+        ("Collaborative", az > 0.5),
+    ]
+    labels = np.select([mask for _, mask in rules], [label for label, _ in rules], default=labels)
+    return pd.Series(labels, index=big5.index, name="PersonalityTrait", dtype=object)
 
 def ensure_personality_trait(df: pd.DataFrame) -> pd.DataFrame:
     # If the CSV already has PersonalityTrait, keep it; else compute from TIPI
@@ -64,11 +61,15 @@ def ensure_personality_trait(df: pd.DataFrame) -> pd.DataFrame:
     df["PersonalityTrait"] = assign_personality_label(big5)
     return df
 
-# Load contestants CSV → df
-df = pd.read_csv("contestants.csv")
+def main(contestant_file="contestants.csv"):
+    # Load contestants CSV → df
+    df = pd.read_csv(contestant_file)
 
-# If not already present, compute PersonalityTrait from TIPI responses in the CSV
-df = ensure_personality_trait(df)
+    # If not already present, compute PersonalityTrait from TIPI responses in the CSV
+    df = ensure_personality_trait(df)
 
-# Save back so `team_formations.py` can proceed as-is
-df.to_csv("contestants.csv", index=False)
\ No newline at end of file
+    # Save back so `team_formations.py` can proceed as-is
+    df.to_csv(contestant_file, index=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment
+
+from contestant_loader import parse_terms
+from team_scoring import INTEREST_WEIGHT, SKILL_WEIGHT, TeamScorer, clean_terms
+
+
+def load_projects(project_requirements):
+    """Projects from the config's `projects` list, or None for a single-project config.
+
+    Each project needs a unique `name`; `required_skills`,
+    `preferred_interests` and `max_teams` (default 1) are optional.
+    """
+    projects = project_requirements.get('projects')
+    if not projects:
+        return None
+    names = [str(p.get('name', '')).strip() for p in projects]
+    if not all(names):
+        raise ValueError("Every project needs a name")
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate project names: {sorted({n for n in names if names.count(n) > 1})}")
+    return [{'name': name,
+             'required_skills': clean_terms(p.get('required_skills', [])),
+             'preferred_interests': clean_terms(p.get('preferred_interests', [])),
+             'max_teams': max(1, int(p.get('max_teams', 1)))}
+            for name, p in zip(names, projects)]
+
+
+def formation_requirements(project_requirements, projects):
+    """Config for forming teams: top-level skills/interests, or the union over projects if not given."""
+    config = dict(project_requirements)
+    for key in ('required_skills', 'preferred_interests'):
+        if not config.get(key):
+            config[key] = sorted({term for p in projects for term in p[key]})
+    return config
+
+
+def _coverage(team_terms, vocabulary, wanted_lists):
+    """(teams, projects) fraction of each project's list covered by each team's terms."""
+    column = {term: pos for pos, term in enumerate(vocabulary)}
+    rows, cols = [], []
+    for p, wanted in enumerate(wanted_lists):
+        present = [column[t] for t in set(wanted) if t in column]
+        rows.extend([p] * len(present))
+        cols.extend(present)
+    wanted_matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(wanted_lists), len(vocabulary)))
+    lengths = np.array([len(wanted) for wanted in wanted_lists], dtype=float)
+    covered = (team_terms @ wanted_matrix.T).toarray()
+    return np.divide(covered, lengths, out=np.zeros_like(covered), where=lengths > 0)
+
+
+def project_score_matrix(data, teams, projects):
+    """(teams, projects) matrix of `compute_weighted_score` of each team against each project.
+
+    Team term coverage is a sparse team x contestant membership product with
+    the contestant one-hot matrix; covered requirement counts for all
+    projects then come from one more sparse product. Experience balance and
+    personality diversity do not depend on the project and are scored once
+    per team.
+    """
+    position = data.index.get_indexer([idx for team in teams for idx in team])
+    team_of = np.repeat(np.arange(len(teams)), [len(team) for team in teams])
+    membership = sparse.csr_matrix((np.ones(len(position)), (team_of, position)), shape=(len(teams), len(data)))
+
+    scores = np.repeat(TeamScorer(data, {}).score_teams(teams)[:, None], len(projects), axis=1)
+    for column, key, weight in (('Skills', 'required_skills', SKILL_WEIGHT),
+                                ('Interests', 'preferred_interests', INTEREST_WEIGHT)):
+        _, matrix, vocabulary = parse_terms(data[column])
+        team_terms = (membership @ matrix) > 0
+        scores += weight * _coverage(team_terms.astype(float), vocabulary, [p[key] for p in projects])
+    return scores
+
+
+def match_projects(scores, capacities=None):
+    """Optimal team -> project assignment maximizing the summed score.
+
+    Project p can take up to capacities[p] teams (default 1 each). Returns
+    an array with each team's project column, -1 for teams left without a
+    project when there are fewer slots than teams.
+    """
+    capacities = np.ones(scores.shape[1], dtype=np.int64) if capacities is None else np.asarray(capacities)
+    # One column per slot; no project can use more slots than there are teams
+    slot_project = np.repeat(np.arange(scores.shape[1]), np.minimum(capacities, scores.shape[0]))
+    teams, slots = linear_sum_assignment(scores[:, slot_project], maximize=True)
+    project_of = np.full(scores.shape[0], -1, dtype=np.int64)
+    project_of[teams] = slot_project[slots]
+    return project_of
+
+
+def assign_projects(data, projects):
+    """Add a Project column: each formed team (Group) matched to one project."""
+    groups = data.groupby('Group', sort=True).groups
+    teams = [list(members) for members in groups.values()]
+    scores = project_score_matrix(data, teams, projects)
+    project_of = match_projects(scores, [p['max_teams'] for p in projects])
+
+    names = np.array([p['name'] for p in projects] + [None], dtype=object)
+    project_of_group = dict(zip(groups.keys(), names[project_of]))
+    data = data.copy()
+    data['Project'] = data['Group'].map(project_of_group)
+    matched = project_of >= 0
+    print(f"Matched {matched.sum()} of {len(teams)} teams to {len(projects)} projects, "
+          f"total score {scores[np.nonzero(matched)[0], project_of[matched]].sum():.3f}")
+    if not matched.all():
+        print(f"{(~matched).sum()} teams have no project; raise max_teams or add projects")
+    return data
@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+
+from team_optimizer import TeamState, anneal, balanced_teams, score_aggregates
+
+
+def resolve_num_teams(num_contestants, num_teams, team_size):
+    """num_teams when it gives teams of team_size +/- 1, otherwise the count closest to team_size."""
+    if num_contestants == 0:
+        return 0
+    if team_size and team_size > 0:
+        if not (num_teams and team_size - 1 <= num_contestants / num_teams <= team_size + 1):
+            num_teams = max(1, round(num_contestants / team_size))
+    return max(1, min(int(num_teams or 1), num_contestants))
+
+
+def _swap_differences(values, rows_a, rows_b):
+    """values[b_j] - values[a_i] for every member pair, shape (pairs, size_a, size_b, ...)."""
+    return values[rows_b][:, None] - values[rows_a][:, :, None]
+
+
+def team_slots(state):
+    """(num_teams, max_size) member rows per team, padded with -1."""
+    slots = np.full((len(state.members), max(1, max(len(rows) for rows in state.members))), -1, dtype=np.int64)
+    for k, rows in enumerate(state.members):
+        slots[k, :len(rows)] = rows
+    return slots
+
+
+def _features(state):
+    """(per-row values, per-team aggregate) pairs in score_aggregates argument order."""
+    return [(state.skills, state.skill_counts), (state.interests, state.interest_counts),
+            (state.personality_onehot, state.personality_counts),
+            (state.experience, state.exp_sum), (state.experience ** 2, state.exp_sq)]
+
+
+def swap_scores(state, slots, a, b):
+    """Scores of teams a and b after every member swap between each pair (a[p], b[p]).
+
+    Returns (new_a, new_b, delta), each (pairs, slots, slots); delta is the
+    change in summed score, -inf where a slot is padding.
+    """
+    rows_a, rows_b = np.maximum(slots[a], 0), np.maximum(slots[b], 0)
+    valid = (slots[a][:, :, None] >= 0) & (slots[b][:, None, :] >= 0)
+    features = _features(state)
+    diffs = [_swap_differences(values, rows_a, rows_b) for values, _ in features]
+    new_a = score_aggregates(state, *[agg[a][:, None, None] + d for (_, agg), d in zip(features, diffs)],
+                             state.sizes[a][:, None, None])
+    new_b = score_aggregates(state, *[agg[b][:, None, None] - d for (_, agg), d in zip(features, diffs)],
+                             state.sizes[b][:, None, None])
+    delta = np.where(valid, new_a + new_b - (state.scores[a] + state.scores[b])[:, None, None], -np.inf)
+    return new_a, new_b, delta
+
+
+def apply_swaps(state, slots, ta, i, tb, j, new_a, new_b):
+    """Swap slot i of teams ta with slot j of teams tb (arrays; teams must be distinct)."""
+    ri, rj = slots[ta, i], slots[tb, j]
+    for values, agg in _features(state):
+        agg[ta] += values[rj] - values[ri]
+        agg[tb] += values[ri] - values[rj]
+    state.scores[ta] = new_a
+    state.scores[tb] = new_b
+    slots[ta, i], slots[tb, j] = rj, ri
+    state.team_of[ri], state.team_of[rj] = tb, ta
+
+
+def pairwise_exchange(state, rng, deadline, patience=20):
+    """Size-preserving refinement: many team pairs improved in parallel.
+
+    Each round pairs all teams at random (disjoint pairs, so their swaps do
+    not interact), scores every member swap of every pair in one batch and
+    applies each pair's best improving swap. Stops at the deadline or after
+    `patience` rounds without any improvement. Returns the number of rounds.
+    """
+    num_teams = len(state.members)
+    if num_teams < 2:
+        return 0
+    slots = team_slots(state)
+
+    rounds = stale = 0
+    while stale < patience and time.perf_counter() < deadline:
+        rounds += 1
+        order = rng.permutation(num_teams)
+        a, b = order[0:num_teams - num_teams % 2:2], order[1::2]
+        new_a, new_b, delta = swap_scores(state, slots, a, b)
+
+        best = delta.reshape(len(a), -1).argmax(axis=1)
+        improving = np.nonzero(delta.reshape(len(a), -1)[np.arange(len(a)), best] > 1e-12)[0]
+        if not len(improving):
+            stale += 1
+            continue
+        stale = 0
+
+        i, j = np.divmod(best[improving], slots.shape[1])
+        apply_swaps(state, slots, a[improving], i, b[improving], j,
+                    new_a[improving, i, j], new_b[improving, i, j])
+
+    state.assign(state.team_of)
+    return rounds
+
+
+def constrained_assignment(data, project_requirements, num_teams, initial_order=None, time_budget=2.0,
+                           seed=42, patience=20):
+    """Assign every contestant to num_teams teams whose sizes differ by at most one.
+
+    Contestants in `initial_order` (default: data order) are dealt
+    round-robin, which fixes the team sizes; pairwise exchange then only
+    swaps members, so sizes never change. Time left after exchange
+    converges goes to low-temperature annealing. Ctrl-C returns the best
+    assignment so far. Returns (teams, score).
+    """
+    deadline = time.perf_counter() + time_budget
+    order = list(initial_order) if initial_order is not None else list(data.index)
+    state = TeamState(data, project_requirements, balanced_teams(order, num_teams))
+    rng = np.random.default_rng(seed)
+
+    best = {'score': float(state.scores.sum()), 'team_of': state.team_of.copy(), 'state': state}
+    try:
+        rounds = pairwise_exchange(state, rng, deadline, patience)
+        best.update(score=float(state.scores.sum()), team_of=state.team_of.copy())
+        print(f"Pairwise exchange: {rounds} rounds, total score {best['score']:.3f}")
+        anneal(state, rng, deadline, max(200000, 20 * len(data)), 0.01, 0.0005, best)
+    except KeyboardInterrupt:
+        print("Team search interrupted; returning best assignment found so far")
+    return state.teams(best['team_of']), best['score']
@@ -1,14 +1,26 @@
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from scipy import sparse
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import MultiLabelBinarizer, LabelEncoder
-from itertools import combinations
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-def load_contestant_data(file_path):
-    """Load contestant data from a CSV file."""
+from contestant_loader import EXPERIENCE_LEVELS, load_contestants, parse_terms
+from project_matching import assign_projects, formation_requirements, load_projects
+from team_assignment import constrained_assignment, resolve_num_teams
+from team_optimizer import optimize_teams
+from team_partitioning import allocate_teams, partition_by_preference
+from team_scoring import TeamScorer
+
+# Below this many contestants, worker start-up costs more than solving partitions in turn
+PARALLEL_MIN_CONTESTANTS = 1000
+
+def load_contestant_data(file_path, cache_dir=None):
+    """Load contestant data from a CSV file (parsed result cached in cache_dir if given)."""
     try:
-        data = pd.read_csv(file_path)
+        data = load_contestants(file_path, cache_dir)
         required_columns = ['Name', 'Skills', 'Interests', 'ExperienceLevel', 'ProjectPreference', 'PersonalityTrait']
         if not all(col in data.columns for col in required_columns):
             raise ValueError("Missing required columns in contestant data")
@@ -29,39 +41,36 @@ def load_project_requirements(config_path):
 
 def preprocess_data(data):
     """Preprocess contestant data for clustering and scoring."""
-    # Normalize comma-separated string fields into clean lists (strip whitespace, drop empties)
-    def normalize_list_field(value):
-        if isinstance(value, str):
-            return [token.strip() for token in value.split(',') if token.strip()]
-        if isinstance(value, list):
-            return [str(token).strip() for token in value if str(token).strip()]
-        return []
-
     data = data.copy()
-    data['Skills'] = data['Skills'].apply(normalize_list_field)
-    data['Interests'] = data['Interests'].apply(normalize_list_field)
 
-    # Encode categorical variables
-    mlb_skills = MultiLabelBinarizer()
-    mlb_interests = MultiLabelBinarizer()
-    skills_matrix = mlb_skills.fit_transform(data['Skills'])
-    interests_matrix = mlb_interests.fit_transform(data['Interests'])
-    skills_encoded = pd.DataFrame(skills_matrix, columns=mlb_skills.classes_, index=data.index)
-    interests_encoded = pd.DataFrame(interests_matrix, columns=mlb_interests.classes_, index=data.index)
+    # Split comma-separated fields (or already-parsed lists) into clean term lists
+    # and one-hot encode them directly as sparse matrices
+    data['Skills'], skills_matrix, skill_terms = parse_terms(data['Skills'])
+    data['Interests'], interests_matrix, interest_terms = parse_terms(data['Interests'])
+    mlb_skills = MultiLabelBinarizer(classes=skill_terms).fit([skill_terms])
+    mlb_interests = MultiLabelBinarizer(classes=interest_terms).fit([interest_terms])
 
-    # Map experience levels to numerical values and handle unknowns/missing
-    experience_map = {'Beginner': 1, 'Intermediate': 2, 'Expert': 3}
-    data['ExperienceLevel'] = data['ExperienceLevel'].map(experience_map).fillna(2).astype(int)
+    # Map experience levels to numerical values (1-3); unknowns/missing count as Intermediate
+    levels = pd.Categorical(data['ExperienceLevel'], categories=EXPERIENCE_LEVELS).codes
+    data['ExperienceLevel'] = np.where(levels >= 0, levels + 1, 2).astype(int)
 
     # Encode personality traits
     le_personality = LabelEncoder()
-    data['PersonalityTrait'] = le_personality.fit_transform(data['PersonalityTrait'])
+    data['PersonalityTrait'] = le_personality.fit_transform(data['PersonalityTrait'].astype(object))
 
-    # Combine features for clustering
-    features = pd.concat(
-        [skills_encoded, interests_encoded, data[['ExperienceLevel', 'PersonalityTrait']]],
-        axis=1,
+    # Combine features for clustering as one sparse matrix (rows in data order).
+    # Every column lies in [0, 1]: experience is min-max scaled (Beginner stays
+    # an implicit zero) and personality is one-hot, as its labels are unordered
+    experience = (data['ExperienceLevel'].to_numpy(dtype=float) - 1) / (len(EXPERIENCE_LEVELS) - 1)
+    personality = sparse.csr_matrix(
+        (np.ones(len(data)), (np.arange(len(data)), data['PersonalityTrait'].to_numpy())),
+        shape=(len(data), len(le_personality.classes_)),
+    )
+    features = sparse.hstack(
+        [skills_matrix, interests_matrix, sparse.csr_matrix(experience[:, None]), personality],
+        format='csr', dtype=np.float64,
     )
+    features.eliminate_zeros()
     return data, features, mlb_skills, mlb_interests
 
 def compute_weighted_score(team, project_requirements, data, mlb_skills, mlb_interests):
@@ -104,43 +113,85 @@ def compute_weighted_score(team, project_requirements, data, mlb_skills, mlb_int
     
     return score
 
+def cluster_contestants(features, n_clusters, project_requirements):
+    """Initial cluster label per contestant (feature rows in data order).
+
+    `clustering` selects full "kmeans" (default) or "minibatch" KMeans, which
+    fits on small random batches and suits large events; `clustering_n_init`
+    sets the number of initializations (default 10 for kmeans, 3 for
+    minibatch). Both work on the sparse matrix directly, so cost grows with
+    its nonzeros rather than contestants x vocabulary.
+    """
+    algorithm = project_requirements.get('clustering', 'kmeans')
+    if algorithm == 'kmeans':
+        model = KMeans(n_clusters=n_clusters, random_state=42,
+                       n_init=int(project_requirements.get('clustering_n_init', 10)))
+    elif algorithm == 'minibatch':
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42,
+                                n_init=int(project_requirements.get('clustering_n_init', 3)),
+                                batch_size=int(project_requirements.get('clustering_batch_size', 1024)))
+    else:
+        raise ValueError(f"Unknown clustering: {algorithm}")
+    return model.fit_predict(sparse.csr_matrix(features))
+
 def assign_groups(data, features, project_requirements, mlb_skills, mlb_interests):
-    """Assign contestants to groups using clustering and graph-based optimization."""
+    """Assign contestants to groups using clustering and local-search optimization."""
+    assignment_mode = project_requirements.get('assignment_mode', 'anneal')
+    if assignment_mode not in ('anneal', 'constrained'):
+        raise ValueError(f"Unknown assignment_mode: {assignment_mode}")
+
     # Ensure the number of groups does not exceed the number of contestants
     num_groups = int(project_requirements.get('num_teams', 3))
     num_groups = max(1, min(num_groups, len(data)))
-    team_size = project_requirements.get('team_size', 3)
-    
-    # Initial clustering with K-means
-    kmeans = KMeans(n_clusters=num_groups, random_state=42, n_init=10)
-    data['InitialCluster'] = kmeans.fit_predict(features)
-    
-    # Refine groups using graph-based optimization
-    teams = []
-    for cluster in range(num_groups):
-        cluster_indices = data[data['InitialCluster'] == cluster].index
-        best_team = []
-        best_score = -1
-        
-        # Try combinations to find the best team
-        for team in combinations(cluster_indices, min(team_size, len(cluster_indices))):
-            score = compute_weighted_score(team, project_requirements, data, mlb_skills, mlb_interests)
-            if score > best_score:
-                best_score = score
-                best_team = list(team)
-        
-        teams.append(best_team)
-    
-    # Assign remaining contestants
-    assigned = set(sum(teams, []))
-    unassigned = list(set(data.index) - assigned)
-    for i, idx in enumerate(unassigned):
-        teams[i % len(teams)].append(idx)
+    if assignment_mode == 'constrained':
+        # Teams of team_size +/- 1: adjust the team count when num_teams cannot give that
+        team_size = int(project_requirements.get('team_size', 0))
+        resolved = resolve_num_teams(len(data), num_groups, team_size)
+        if resolved != num_groups:
+            print(f"Using {resolved} teams instead of {num_groups} to keep teams at {team_size} +/- 1 members")
+        num_groups = resolved
+    
+    # Initial clustering with K-means; dealing contestants out cluster by cluster
+    # spreads similar profiles across teams for the first search start. In
+    # constrained mode about one cluster per team seat keeps this cheap for
+    # thousands of teams and gives each team roughly one member per cluster
+    n_clusters = num_groups
+    if assignment_mode == 'constrained':
+        n_clusters = min(num_groups, -(-len(data) // num_groups))
+    data['InitialCluster'] = cluster_contestants(features, n_clusters, project_requirements)
+    initial_order = data.sort_values('InitialCluster', kind='stable').index
+    
+    time_budget = float(project_requirements.get('search_time_budget', 2.0))
+    seed = int(project_requirements.get('search_seed', 42))
+    if assignment_mode == 'constrained':
+        # Fixed team sizes, refined by parallel pairwise member exchange
+        teams, best_score = constrained_assignment(
+            data, project_requirements, num_groups,
+            initial_order=initial_order,
+            time_budget=time_budget,
+            seed=seed,
+        )
+    else:
+        # Refine with swap-based simulated annealing over the whole assignment
+        teams, best_score = optimize_teams(
+            data, project_requirements, num_groups,
+            initial_order=initial_order,
+            time_budget=time_budget,
+            restarts=int(project_requirements.get('search_restarts', 4)),
+            seed=seed,
+            max_iterations=int(project_requirements.get('search_iterations', 3000)),
+        )
+    print(f"Team search finished with total score {best_score:.3f} across {len(teams)} teams")
+    team_scores = TeamScorer(data, project_requirements).score_teams(teams)
+    if len(teams) <= 20:
+        for group_id, team_score in enumerate(team_scores, 1):
+            print(f"  Group {group_id}: {len(teams[group_id - 1])} members, score {team_score:.3f}")
+    else:
+        print(f"  Team scores: min {team_scores.min():.3f}, mean {team_scores.mean():.3f}, max {team_scores.max():.3f}")
     
     # Assign group numbers
-    data['Group'] = np.nan
-    for group_id, team in enumerate(teams, 1):
-        data.loc[team, 'Group'] = group_id
+    group_of = {idx: group_id for group_id, team in enumerate(teams, 1) for idx in team}
+    data['Group'] = data.index.map(group_of).astype(float)
     
     # Drop temporary cluster column
     data = data.drop(columns=['InitialCluster'])
@@ -149,6 +200,60 @@ def assign_groups(data, features, project_requirements, mlb_skills, mlb_interest
         data['Group'] = data['Group'].astype(int)
     return data
 
+def _assign_partition(task):
+    """Process-pool worker: assign groups within one preference partition."""
+    data, features, project_requirements, mlb_skills, mlb_interests = task
+    return assign_groups(data, features, project_requirements, mlb_skills, mlb_interests)['Group']
+
+def assign_groups_by_preference(data, features, project_requirements, mlb_skills, mlb_interests):
+    """Assign groups separately within each ProjectPreference partition, in parallel.
+
+    Teams are allocated to partitions in proportion to their size; optional
+    `preference_groups` in the config pools compatible preferences.
+    """
+    num_teams = int(project_requirements.get('num_teams', 3))
+    team_size = int(project_requirements.get('team_size', 0))
+    constrained = project_requirements.get('assignment_mode') == 'constrained'
+    partitions = partition_by_preference(
+        data['ProjectPreference'],
+        project_requirements.get('preference_groups'),
+        min_size=max(2, team_size - 1),
+        # Outside constrained mode the total team count must stay num_teams
+        max_partitions=None if constrained else num_teams,
+    )
+    if len(partitions) <= 1:
+        return assign_groups(data, features, project_requirements, mlb_skills, mlb_interests)
+
+    allocation = allocate_teams({name: len(members) for name, members in partitions.items()}, num_teams)
+    workers = int(project_requirements.get('partition_workers', os.cpu_count() or 1))
+    workers = max(1, min(workers, len(partitions)))
+    if len(data) < PARALLEL_MIN_CONTESTANTS:
+        workers = 1
+    
+    # Partitions run concurrently, so each gets the share of the wall-clock budget its size warrants
+    time_budget = float(project_requirements.get('search_time_budget', 2.0))
+    tasks = []
+    for name, members in partitions.items():
+        share = min(1.0, workers * len(members) / len(data))
+        config = dict(project_requirements, num_teams=allocation[name], search_time_budget=time_budget * share)
+        tasks.append((data.loc[members], features[data.index.get_indexer(members)], config, mlb_skills, mlb_interests))
+        print(f"Partition '{name}': {len(members)} contestants, {allocation[name]} teams")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_assign_partition, tasks))
+    else:
+        results = [_assign_partition(task) for task in tasks]
+    
+    # Number groups consecutively across partitions
+    data = data.copy()
+    data['Group'] = 0
+    offset = 0
+    for groups in results:
+        data.loc[groups.index, 'Group'] = groups + offset
+        offset += int(groups.max())
+    return data
+
 def log_feedback(data, feedback_file):
     """Log team assignments for feedback and future algorithm improvement."""
     try:
@@ -173,19 +278,31 @@ def main():
     feedback_file = "team_feedback.csv"
     
     # Load data
-    data = load_contestant_data(contestant_file)
-    if data is None:
-        return
-    
     config = load_project_requirements(config_file)
     if config is None:
         return
     
+    data = load_contestant_data(contestant_file, config.get('contestant_cache_dir'))
+    if data is None:
+        return
+    
+    # With a `projects` list, teams are formed against the union of project requirements
+    projects = load_projects(config)
+    if projects:
+        config = formation_requirements(config, projects)
+    
     # Preprocess data
     data, features, mlb_skills, mlb_interests = preprocess_data(data)
     
-    # Assign groups
-    data = assign_groups(data, features, config, mlb_skills, mlb_interests)
+    # Assign groups, separately per project preference unless disabled
+    if config.get('partition_by_preference', True) and 'ProjectPreference' in data.columns:
+        data = assign_groups_by_preference(data, features, config, mlb_skills, mlb_interests)
+    else:
+        data = assign_groups(data, features, config, mlb_skills, mlb_interests)
+    
+    # Match formed teams to projects
+    if projects:
+        data = assign_projects(data, projects)
     
     # Log feedback for validation
     log_feedback(data, feedback_file)
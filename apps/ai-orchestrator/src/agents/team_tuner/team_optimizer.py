@@ -0,0 +1,243 @@
+import math
+import time
+
+import numpy as np
+
+from team_scoring import EXP_WEIGHT, INTEREST_WEIGHT, PERSONALITY_WEIGHT, SKILL_WEIGHT, clean_terms
+
+
+def _indicator_matrix(lists, terms):
+    """(rows, terms) 0/1 matrix: whether each row's list contains each term."""
+    matrix = np.zeros((len(lists), len(terms)), dtype=np.int64)
+    for row, values in enumerate(lists):
+        values = set(values)
+        for col, term in enumerate(terms):
+            matrix[row, col] = term in values
+    return matrix
+
+
+def score_aggregates(state, skill_counts, interest_counts, personality_counts, exp_sum, exp_sq, size):
+    """Team scores (`compute_weighted_score`) from aggregates, over any leading shape.
+
+    Counts carry a trailing term axis; `state` supplies num_required and
+    num_preferred. TeamState, the batched swap search and roster updates
+    all score through this function.
+    """
+    score = 0.0
+    if state.num_required:
+        score = score + SKILL_WEIGHT * (skill_counts != 0).sum(axis=-1) / state.num_required
+    if state.num_preferred:
+        score = score + INTEREST_WEIGHT * (interest_counts != 0).sum(axis=-1) / state.num_preferred
+    counted = np.maximum(size, 1)
+    mean = exp_sum / counted
+    std = np.sqrt(np.maximum(exp_sq / counted - mean * mean, 0.0))
+    balanced = (size > 1) & (mean > 0)
+    balance = np.maximum(np.minimum(1 - std / np.where(balanced, mean, 1.0), 1.0), 0.0) * balanced
+    diversity = (personality_counts != 0).sum(axis=-1) / counted
+    return score + EXP_WEIGHT * balance + PERSONALITY_WEIGHT * diversity
+
+
+class TeamState:
+    """Per-team aggregates that let a swap be scored without touching other members.
+
+    A team's score (same formula as `compute_weighted_score`) only depends on
+    how many members cover each required skill / preferred interest, the sum
+    and sum of squares of experience levels, and personality counts.
+    """
+
+    def __init__(self, data, project_requirements, teams):
+        required = clean_terms(project_requirements.get('required_skills', []))
+        preferred = clean_terms(project_requirements.get('preferred_interests', []))
+        self.num_required = len(required)
+        self.num_preferred = len(preferred)
+        required_unique = sorted(set(required))
+        preferred_unique = sorted(set(preferred))
+
+        self.index = list(data.index)
+        position = {idx: pos for pos, idx in enumerate(self.index)}
+        self.skills = _indicator_matrix(data['Skills'], required_unique)
+        self.interests = _indicator_matrix(data['Interests'], preferred_unique)
+        self.experience = data['ExperienceLevel'].to_numpy(dtype=float)
+        codes, self.personality = np.unique(data['PersonalityTrait'].to_numpy(), return_inverse=True)
+        self.personality_onehot = np.eye(len(codes), dtype=np.int64)[self.personality]
+
+        team_of = np.empty(len(data), dtype=np.int64)
+        for k, team in enumerate(teams):
+            team_of[[position[idx] for idx in team]] = k
+        self.assign(team_of, len(teams))
+
+    def assign(self, team_of, num_teams=None):
+        """Reset to a new assignment (row -> team) and rebuild all aggregates."""
+        num_teams = len(self.members) if num_teams is None else num_teams
+        self.team_of = np.asarray(team_of, dtype=np.int64).copy()
+        self.members = [[] for _ in range(num_teams)]
+        for row, k in enumerate(self.team_of):
+            self.members[k].append(row)
+
+        self.skill_counts = np.zeros((num_teams, self.skills.shape[1]), dtype=np.int64)
+        self.interest_counts = np.zeros((num_teams, self.interests.shape[1]), dtype=np.int64)
+        self.personality_counts = np.zeros((num_teams, self.personality_onehot.shape[1]), dtype=np.int64)
+        self.exp_sum = np.zeros(num_teams)
+        self.exp_sq = np.zeros(num_teams)
+        self.sizes = np.zeros(num_teams, dtype=np.int64)
+        for k, rows in enumerate(self.members):
+            self._add(k, rows, 1)
+        self.scores = np.asarray(score_aggregates(self, self.skill_counts, self.interest_counts,
+                                                  self.personality_counts, self.exp_sum, self.exp_sq, self.sizes),
+                                 dtype=float).reshape(num_teams)
+
+    def _add(self, k, rows, sign):
+        self.skill_counts[k] += sign * self.skills[rows].sum(axis=0)
+        self.interest_counts[k] += sign * self.interests[rows].sum(axis=0)
+        self.personality_counts[k] += sign * self.personality_onehot[rows].sum(axis=0)
+        self.exp_sum[k] += sign * self.experience[rows].sum()
+        self.exp_sq[k] += sign * (self.experience[rows] ** 2).sum()
+        self.sizes[k] += sign * len(rows)
+
+    def team_score(self, k):
+        return float(score_aggregates(self, self.skill_counts[k], self.interest_counts[k],
+                                      self.personality_counts[k], self.exp_sum[k], self.exp_sq[k], self.sizes[k]))
+
+    def swap_delta(self, i, j):
+        """Change in total score if rows i and j (in different teams) swap teams."""
+        a, b = self.team_of[i], self.team_of[j]
+        d_skill = self.skills[j] - self.skills[i]
+        d_interest = self.interests[j] - self.interests[i]
+        d_pers = self.personality_onehot[j] - self.personality_onehot[i]
+        d_exp = self.experience[j] - self.experience[i]
+        d_sq = self.experience[j] ** 2 - self.experience[i] ** 2
+        new_a = score_aggregates(self, self.skill_counts[a] + d_skill, self.interest_counts[a] + d_interest,
+                                 self.personality_counts[a] + d_pers, self.exp_sum[a] + d_exp,
+                                 self.exp_sq[a] + d_sq, self.sizes[a])
+        new_b = score_aggregates(self, self.skill_counts[b] - d_skill, self.interest_counts[b] - d_interest,
+                                 self.personality_counts[b] - d_pers, self.exp_sum[b] - d_exp,
+                                 self.exp_sq[b] - d_sq, self.sizes[b])
+        return new_a + new_b - self.scores[a] - self.scores[b], new_a, new_b
+
+    def apply_swap(self, i, j, new_a=None, new_b=None):
+        a, b = self.team_of[i], self.team_of[j]
+        # Single-row differences; cheaper than four _add calls on the hot path
+        for values, counts in ((self.skills, self.skill_counts), (self.interests, self.interest_counts),
+                               (self.personality_onehot, self.personality_counts)):
+            diff = values[j] - values[i]
+            counts[a] += diff
+            counts[b] -= diff
+        d_exp = self.experience[j] - self.experience[i]
+        d_sq = self.experience[j] ** 2 - self.experience[i] ** 2
+        self.exp_sum[a] += d_exp
+        self.exp_sum[b] -= d_exp
+        self.exp_sq[a] += d_sq
+        self.exp_sq[b] -= d_sq
+        self.members[a][self.members[a].index(i)] = j
+        self.members[b][self.members[b].index(j)] = i
+        self.team_of[i], self.team_of[j] = b, a
+        self.scores[a] = self.team_score(a) if new_a is None else new_a
+        self.scores[b] = self.team_score(b) if new_b is None else new_b
+
+    def apply_move(self, i, k):
+        """Move row i into team k (team sizes change)."""
+        a = self.team_of[i]
+        self._add(a, [i], -1)
+        self._add(k, [i], 1)
+        self.members[a].remove(i)
+        self.members[k].append(i)
+        self.team_of[i] = k
+        self.scores[a] = self.team_score(a)
+        self.scores[k] = self.team_score(k)
+
+    def teams(self, team_of=None):
+        """Teams as lists of original data index labels (from a saved team_of if given)."""
+        if team_of is None:
+            return [[self.index[row] for row in rows] for rows in self.members]
+        teams = [[] for _ in self.members]
+        for row, k in enumerate(team_of):
+            teams[k].append(self.index[row])
+        return teams
+
+
+def balanced_teams(order, num_teams):
+    """Deal rows in `order` round-robin into num_teams teams (sizes differ by at most one)."""
+    teams = [[] for _ in range(num_teams)]
+    for pos, idx in enumerate(order):
+        teams[pos % num_teams].append(idx)
+    return teams
+
+
+def anneal(state, rng, deadline, max_iterations, initial_temperature, final_temperature, best):
+    """Simulated annealing over swaps.
+
+    `best` is updated in place ({'score', 'team_of', 'state'}) whenever the
+    assignment improves, so the best-so-far survives an interruption.
+    Returns the number of proposals made (max_iterations unless the deadline
+    stopped the schedule early).
+    """
+    n = len(state.team_of)
+    if float(state.scores.sum()) > best['score']:
+        best.update(score=float(state.scores.sum()), team_of=state.team_of.copy(), state=state)
+    if len(state.members) < 2 or n < 2:
+        return max_iterations
+
+    # The schedule depends on the iteration count only, so a run that finishes
+    # within its time budget is fully reproducible from the seed
+    iteration = 0
+    while iteration < max_iterations:
+        if time.perf_counter() >= deadline:
+            break
+        temperature = initial_temperature * (final_temperature / initial_temperature) ** (iteration / max_iterations)
+        for _ in range(min(256, max_iterations - iteration)):  # check the clock every 256 proposals
+            iteration += 1
+            i, j = rng.integers(n, size=2)
+            if state.team_of[i] == state.team_of[j]:
+                continue
+            delta, new_a, new_b = state.swap_delta(i, j)
+            if delta >= 0 or rng.random() < math.exp(delta / temperature):
+                state.apply_swap(i, j, new_a, new_b)
+                total = float(state.scores.sum())
+                if total > best['score'] + 1e-12:
+                    best.update(score=total, team_of=state.team_of.copy(), state=state)
+    return iteration
+
+
+def optimize_teams(data, project_requirements, num_teams, initial_order=None, time_budget=2.0,
+                   restarts=4, seed=42, max_iterations=3000,
+                   initial_temperature=0.05, final_temperature=0.0005):
+    """Find a balanced assignment of every contestant maximizing the summed team score.
+
+    Runs `restarts` simulated-annealing starts (restart r uses seed + r;
+    restart 0 starts from `initial_order` dealt round-robin when given) of
+    `max_iterations` swap proposals each. The cooling schedule depends only
+    on the iteration count, so the result is reproducible from the seed as
+    long as every start finishes within its share of `time_budget`; the
+    defaults (4 starts x 3000 proposals) use about half of the 2s budget.
+    If the budget runs out first the schedule is cut short, a message says
+    so, and results then depend on machine speed. Ctrl-C stops the search
+    early. Returns (best_teams, best_score).
+    """
+    deadline_total = time.perf_counter() + time_budget
+    restarts = max(1, int(restarts))
+    best = {'score': -1.0, 'team_of': None, 'state': None}
+    cut_short = 0
+
+    try:
+        for r in range(restarts):
+            rng = np.random.default_rng(seed + r)
+            if r == 0 and initial_order is not None:
+                order = list(initial_order)
+            else:
+                order = [data.index[pos] for pos in rng.permutation(len(data))]
+            state = TeamState(data, project_requirements, balanced_teams(order, num_teams))
+
+            # Split the remaining budget evenly over the remaining restarts
+            remaining = max(deadline_total - time.perf_counter(), 0.0)
+            deadline = time.perf_counter() + remaining / (restarts - r)
+            done = anneal(state, rng, deadline, max_iterations, initial_temperature, final_temperature, best)
+            cut_short += done < max_iterations
+    except KeyboardInterrupt:
+        print("Team search interrupted; returning best assignment found so far")
+        if best['state'] is None:
+            raise
+
+    if cut_short:
+        print(f"Time budget ran out in {cut_short} of {restarts} search starts; results may vary between "
+              f"runs and machines (raise search_time_budget or lower search_iterations)")
+    return best['state'].teams(best['team_of']), best['score']
@@ -0,0 +1,76 @@
+MIXED_PARTITION = "Mixed"
+
+
+def normalize_preference(value):
+    """Case- and whitespace-insensitive key for a ProjectPreference value."""
+    if not isinstance(value, str) or not value.strip():
+        return ""
+    return " ".join(value.split()).lower()
+
+
+def partition_by_preference(preferences, preference_groups=None, min_size=2, max_partitions=None):
+    """Split contestants into partitions by (compatible) project preference.
+
+    `preferences` is a Series of ProjectPreference values indexed like the
+    contestant table. `preference_groups` maps a partition name to the
+    preferences it accepts, e.g. {"Web & Mobile": ["Web", "Mobile"]}; other
+    preferences form their own partition. Partitions smaller than `min_size`,
+    blank preferences, and (smallest first) partitions beyond
+    `max_partitions` are pooled into a "Mixed" partition, which is folded into
+    the largest partition if it is still too small.
+
+    Returns a dict of partition name -> list of index labels, largest first.
+    """
+    group_of = {}
+    for name, members in (preference_groups or {}).items():
+        for preference in members:
+            group_of[normalize_preference(preference)] = name
+
+    partitions, names = {}, {}
+    for idx, value in preferences.items():
+        key = normalize_preference(value)
+        if not key:
+            partitions.setdefault(MIXED_PARTITION, []).append(idx)
+            continue
+        name = group_of.get(key) or names.setdefault(key, value.strip())
+        partitions.setdefault(name, []).append(idx)
+
+    mixed = partitions.pop(MIXED_PARTITION, [])
+    for name in [n for n, members in partitions.items() if len(members) < min_size]:
+        mixed.extend(partitions.pop(name))
+    while max_partitions and partitions and len(partitions) + (1 if mixed else 0) > max_partitions:
+        mixed.extend(partitions.pop(min(partitions, key=lambda n: len(partitions[n]))))
+
+    if mixed:
+        if len(mixed) >= min_size or not partitions:
+            partitions[MIXED_PARTITION] = mixed
+        else:
+            partitions[max(partitions, key=lambda n: len(partitions[n]))].extend(mixed)
+    position = {idx: pos for pos, idx in enumerate(preferences.index)}
+    return {name: sorted(members, key=position.get)
+            for name, members in sorted(partitions.items(), key=lambda item: -len(item[1]))}
+
+
+def allocate_teams(partition_sizes, num_teams):
+    """Split num_teams over partitions proportionally to size (largest remainder).
+
+    Every partition gets at least one team and never more teams than members.
+    """
+    names = list(partition_sizes)
+    total = sum(partition_sizes.values())
+    num_teams = max(int(num_teams), len(names))
+    quotas = {name: num_teams * partition_sizes[name] / total for name in names}
+    allocation = {name: max(1, min(int(quotas[name]), partition_sizes[name])) for name in names}
+    by_remainder = sorted(names, key=lambda name: quotas[name] - int(quotas[name]), reverse=True)
+    while sum(allocation.values()) < num_teams:
+        open_names = [name for name in by_remainder if allocation[name] < partition_sizes[name]]
+        if not open_names:
+            break
+        for name in open_names:
+            if sum(allocation.values()) >= num_teams:
+                break
+            allocation[name] += 1
+    while sum(allocation.values()) > num_teams:
+        name = max((n for n in names if allocation[n] > 1), key=lambda n: allocation[n] - quotas[n])
+        allocation[name] -= 1
+    return allocation
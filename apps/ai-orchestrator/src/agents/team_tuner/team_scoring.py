@@ -0,0 +1,96 @@
+import numpy as np
+
+SKILL_WEIGHT, INTEREST_WEIGHT, EXP_WEIGHT, PERSONALITY_WEIGHT = 0.4, 0.3, 0.2, 0.1
+
+_BYTE_POPCOUNT = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+
+def popcount(words):
+    """Number of set bits per uint64 element."""
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+        return np.bitwise_count(words)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(words.shape + (8,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1)
+
+
+def clean_terms(values):
+    """Config term list with blanks dropped and surrounding whitespace stripped."""
+    return [str(v).strip() for v in values if str(v).strip()]
+
+
+def pack_bitmasks(lists, terms):
+    """(rows, words) uint64 masks: bit t set when a row's list contains terms[t]."""
+    num_words = max(1, (len(terms) + 63) // 64)
+    masks = np.zeros((len(lists), num_words), dtype=np.uint64)
+    bit_of = {term: pos for pos, term in enumerate(terms)}
+    for row, values in enumerate(lists):
+        for value in set(values):
+            pos = bit_of.get(value)
+            if pos is not None:
+                masks[row, pos // 64] |= np.uint64(1) << np.uint64(pos % 64)
+    return masks
+
+
+class TeamScorer:
+    """Batch version of `compute_weighted_score`.
+
+    Required skills and preferred interests are packed into uint64 bitmasks
+    per contestant, so a team's coverage is an OR-reduce plus popcount.
+    Experience and personality live in NumPy arrays and are reduced per team
+    along an axis. Teams of the same size are scored in one call.
+    """
+
+    def __init__(self, data, project_requirements):
+        required = clean_terms(project_requirements.get('required_skills', []))
+        preferred = clean_terms(project_requirements.get('preferred_interests', []))
+        self.num_required = len(required)
+        self.num_preferred = len(preferred)
+
+        self.index = data.index
+        self.skill_masks = pack_bitmasks(data['Skills'], sorted(set(required)))
+        self.interest_masks = pack_bitmasks(data['Interests'], sorted(set(preferred)))
+        self.experience = data['ExperienceLevel'].to_numpy()
+        self.personality = np.unique(data['PersonalityTrait'].to_numpy(), return_inverse=True)[1].reshape(-1)
+
+    def positions(self, team):
+        """Row positions for a team given as data index labels."""
+        return self.index.get_indexer(list(team))
+
+    def score_positions(self, teams):
+        """Scores for an (n_teams, team_size) array of row positions."""
+        teams = np.asarray(teams, dtype=np.int64)
+        n_teams, size = teams.shape
+        scores = np.zeros(n_teams)
+        if size == 0:
+            return scores
+
+        if self.num_required:
+            covered = np.bitwise_or.reduce(self.skill_masks[teams], axis=1)
+            scores += SKILL_WEIGHT * (popcount(covered).sum(axis=1) / self.num_required)
+        if self.num_preferred:
+            covered = np.bitwise_or.reduce(self.interest_masks[teams], axis=1)
+            scores += INTEREST_WEIGHT * (popcount(covered).sum(axis=1) / self.num_preferred)
+
+        if size > 1:
+            exp = self.experience[teams]
+            mean = np.mean(exp, axis=1)
+            positive = mean > 0
+            balance = np.zeros(n_teams)
+            balance[positive] = 1 - np.std(exp[positive], axis=1) / mean[positive]
+            scores += EXP_WEIGHT * np.clip(balance, 0.0, 1.0)
+
+        traits = np.sort(self.personality[teams], axis=1)
+        unique = 1 + np.count_nonzero(np.diff(traits, axis=1), axis=1)
+        scores += PERSONALITY_WEIGHT * (unique / size)
+        return scores
+
+    def score_teams(self, teams):
+        """Scores for teams given as lists of data index labels (sizes may differ)."""
+        teams = [self.positions(team) for team in teams]
+        scores = np.zeros(len(teams))
+        by_size = {}
+        for k, team in enumerate(teams):
+            by_size.setdefault(len(team), []).append(k)
+        for size, ks in by_size.items():
+            scores[ks] = self.score_positions(np.array([teams[k] for k in ks]).reshape(len(ks), size))
+        return scores
@@ -0,0 +1,178 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from team_assignment import swap_scores, team_slots
+from team_formations import preprocess_data
+from team_optimizer import TeamState, score_aggregates
+
+
+def load_assignment(contestant_file, feedback_file):
+    """Contestant table with the Group column of a previous run (matched by Name)."""
+    contestants = pd.read_csv(contestant_file)
+    groups = pd.read_csv(feedback_file)[['Name', 'Group']].drop_duplicates('Name')
+    return contestants.drop(columns=['Group'], errors='ignore').merge(groups, on='Name', how='left')
+
+
+def _join_gains(state, rows, teams):
+    """Score change of team teams[n] if rows[n] joined it (rows and teams broadcast)."""
+    rows, teams = np.broadcast_arrays(np.asarray(rows), np.asarray(teams))
+    new = score_aggregates(state,
+                           state.skill_counts[teams] + state.skills[rows],
+                           state.interest_counts[teams] + state.interests[rows],
+                           state.personality_counts[teams] + state.personality_onehot[rows],
+                           state.exp_sum[teams] + state.experience[rows],
+                           state.exp_sq[teams] + state.experience[rows] ** 2,
+                           state.sizes[teams] + 1)
+    return new - state.scores[teams]
+
+
+def _removal_gains(state, rows):
+    """Score change of each row's team if that row left it."""
+    teams = state.team_of[rows]
+    new = score_aggregates(state,
+                           state.skill_counts[teams] - state.skills[rows],
+                           state.interest_counts[teams] - state.interests[rows],
+                           state.personality_counts[teams] - state.personality_onehot[rows],
+                           state.exp_sum[teams] - state.experience[rows],
+                           state.exp_sq[teams] - state.experience[rows] ** 2,
+                           state.sizes[teams] - 1)
+    return new - state.scores[teams]
+
+
+def _place(state, row, teams, min_size, target_size, max_size):
+    """Move `row` into the best team with room, filling under-sized teams first. False if none has room."""
+    sizes = state.sizes[teams]
+    for limit in (min_size, target_size, max_size):
+        eligible = teams[sizes < limit]
+        if len(eligible):
+            state.apply_move(row, eligible[int(np.argmax(_join_gains(state, row, eligible)))])
+            return True
+    return False
+
+
+def update_assignment(roster, project_requirements, joins=None, leaves=(), time_budget=0.2, max_swaps=None,
+                      partner_teams=100, seed=0):
+    """Apply late joins and dropouts to an existing assignment without reshuffling everyone.
+
+    Newcomers are placed one at a time into the team they improve most
+    (under-sized teams first, opening new teams only when all are full).
+    Teams left below team_size - 1 take the best-fitting member from a team
+    that can spare one, or are dissolved into other teams. A bounded swap
+    search then refines only the affected teams.
+
+    Args:
+        roster: Contestant table (load_contestant_data columns) with a Group column
+        project_requirements: Config dict as used by assign_groups
+        joins: Table of new contestants with the same columns
+        leaves: Names of contestants who dropped out
+        time_budget: Seconds for the swap search
+        max_swaps: Swap limit (default: two per event, at least four)
+        partner_teams: Teams sampled per search step as swap partners
+        seed: Random seed for partner sampling
+
+    Returns:
+        (updated roster with Group, changes dict with 'joined', 'left', 'moved', 'score')
+    """
+    start = time.perf_counter()
+    leaves = set(leaves)
+    left_groups = roster.loc[roster['Name'].isin(leaves), 'Group'].dropna()
+    joins = joins if joins is not None else roster.iloc[0:0]
+    unknown = leaves - set(roster['Name'])
+    if unknown:
+        print(f"Ignoring dropouts not in the roster: {sorted(unknown)}")
+    duplicates = set(joins['Name']) & (set(roster['Name']) - leaves)
+    if duplicates:
+        print(f"Ignoring joins already in the roster: {sorted(duplicates)}")
+        joins = joins[~joins['Name'].isin(duplicates)]
+
+    kept = roster[~roster['Name'].isin(leaves)]
+    roster = pd.concat([kept, joins.drop(columns=['Group'], errors='ignore')], ignore_index=True)
+    data, _, _, _ = preprocess_data(roster.drop(columns=['Group']))
+
+    # Teams: existing groups (stable ids), new empty groups if needed, then newcomers in a holding team
+    group_ids = sorted(int(g) for g in kept['Group'].dropna().unique())
+    team_size = int(project_requirements.get('team_size', 0))
+    if team_size <= 0:
+        team_size = max(1, round(len(kept) / max(1, len(group_ids))))
+    min_size, max_size = max(1, team_size - 1), team_size + 1
+    num_new = 0
+    while len(roster) > (len(group_ids) + num_new) * max_size:
+        num_new += 1
+    group_ids += list(range(max(group_ids, default=0) + 1, max(group_ids, default=0) + 1 + num_new))
+
+    team_of_group = {g: k for k, g in enumerate(group_ids)}
+    teams = [[] for _ in range(len(group_ids) + 1)]
+    holding = len(group_ids)
+    for idx, group in roster['Group'].items():
+        teams[team_of_group[int(group)] if pd.notna(group) else holding].append(idx)
+    state = TeamState(data, project_requirements, teams)
+    real = np.arange(holding)
+    touched = {team_of_group[int(g)] for g in left_groups if int(g) in team_of_group}
+
+    # Newcomers
+    for row in list(state.members[holding]):
+        _place(state, row, real, min_size, team_size, max_size)
+        touched.add(int(state.team_of[row]))
+
+    # Under-sized teams borrow a member or are dissolved
+    for _ in range(len(real)):
+        small = [k for k in real if 0 < state.sizes[k] < min_size]
+        if not small:
+            break
+        target = min(small, key=lambda k: state.sizes[k])
+        donors = [k for k in real if k != target and state.sizes[k] > min_size]
+        if donors:
+            rows = np.concatenate([state.members[k] for k in donors])
+            gains = _removal_gains(state, rows) + _join_gains(state, rows, target)
+            row = int(rows[np.argmax(gains)])
+            touched.add(int(state.team_of[row]))
+            state.apply_move(row, target)
+        else:
+            others = real[(real != target) & (state.sizes[real] > 0)]
+            for row in list(state.members[target]):
+                if not _place(state, row, others, min_size, team_size, max_size):
+                    break
+                touched.add(int(state.team_of[row]))
+        touched.add(target)
+
+    # Bounded swap search around the affected teams
+    events = len(joins) + len(leaves - unknown)
+    max_swaps = max(4, 2 * events) if max_swaps is None else max_swaps
+    deadline = time.perf_counter() + time_budget
+    rng = np.random.default_rng(seed)
+    swaps = 0
+    while swaps < max_swaps and time.perf_counter() < deadline:
+        active = np.array(sorted(k for k in touched if state.sizes[k] > 0))
+        partners = real[state.sizes[real] > 0]
+        if not len(active) or len(partners) < 2:
+            break
+        if len(partners) > partner_teams:
+            partners = rng.choice(partners, size=partner_teams, replace=False)
+        a = np.repeat(active, len(partners))
+        b = np.tile(partners, len(active))
+        a, b = a[a != b], b[a != b]
+        slots = team_slots(state)
+        new_a, new_b, delta = swap_scores(state, slots, a, b)
+        flat = int(np.argmax(delta))
+        if delta.reshape(-1)[flat] <= 1e-12:
+            break
+        p, i, j = np.unravel_index(flat, delta.shape)
+        state.apply_swap(slots[a[p], i], slots[b[p], j], new_a[p, i, j], new_b[p, i, j])
+        swaps += 1
+
+    # Report
+    roster = roster.copy()
+    old_group = roster['Group']
+    roster['Group'] = np.asarray(group_ids)[state.team_of]
+    changed = old_group.notna() & (old_group != roster['Group'])
+    moved = dict(zip(roster.loc[changed, 'Name'],
+                     zip(old_group[changed].astype(int).tolist(), roster.loc[changed, 'Group'].tolist())))
+    is_new = roster['Name'].isin(set(joins['Name'])) & old_group.isna()
+    joined = dict(zip(roster.loc[is_new, 'Name'], roster.loc[is_new, 'Group'].tolist()))
+    changes = {'joined': joined, 'left': sorted(leaves - unknown), 'moved': moved, 'swaps': swaps,
+               'score': float(state.scores.sum()), 'seconds': time.perf_counter() - start}
+    print(f"Roster update: {len(joined)} joined, {len(changes['left'])} left, {len(moved)} moved "
+          f"in {changes['seconds']:.2f}s")
+    return roster, changes
@@ -0,0 +1,456 @@
+"""
+Tests for team formation
+========================
+
+Run with: python -m pytest test_team_formations.py -v
+"""
+
+import importlib
+from itertools import combinations, product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import team_formations
+from contestant_loader import load_contestants, parse_terms, read_contestants
+import decide_personal_trait
+from decide_personal_trait import PERSONALITY_LABELS, TIPI_COLUMNS, assign_personality_label, score_tipi
+import team_optimizer
+from team_assignment import constrained_assignment, pairwise_exchange, resolve_num_teams
+from team_formations import assign_groups, assign_groups_by_preference, compute_weighted_score, preprocess_data
+from project_matching import assign_projects, load_projects, match_projects, project_score_matrix
+from team_optimizer import TeamState, balanced_teams, optimize_teams, score_aggregates
+from team_partitioning import allocate_teams, partition_by_preference
+from team_scoring import TeamScorer, pack_bitmasks, popcount
+from team_updates import load_assignment, update_assignment
+from validate_team_formations import generate_synthetic_dataset
+
+REQUIREMENTS = {
+    "num_teams": 3,
+    "team_size": 4,
+    "required_skills": ["python", "frontend", "design", "ml"],
+    "preferred_interests": ["ai", "web"],
+}
+
+
+def prepared(num_contestants=12):
+    data, features, mlb_skills, mlb_interests = preprocess_data(generate_synthetic_dataset(num_contestants))
+    return data, features, mlb_skills, mlb_interests
+
+
+def reference_score(team, data):
+    return compute_weighted_score(team, REQUIREMENTS, data, None, None)
+
+
+class TestTeamState:
+    """Test aggregate-based team scoring."""
+
+    def test_scores_match_compute_weighted_score(self):
+        data, *_ = prepared(30)
+        state = TeamState(data, REQUIREMENTS, balanced_teams(list(data.index), 4))
+        rng = np.random.default_rng(0)
+
+        for _ in range(200):
+            i, j = rng.integers(len(data), size=2)
+            if state.team_of[i] == state.team_of[j]:
+                continue
+            before = state.scores.sum()
+            delta, _, _ = state.swap_delta(i, j)
+            state.apply_swap(i, j)
+            assert state.scores.sum() - before == pytest.approx(delta, abs=1e-12)
+
+        for k, team in enumerate(state.teams()):
+            assert state.scores[k] == pytest.approx(reference_score(team, data), abs=1e-12)
+
+
+class TestTeamScorer:
+    """Test the batched bitmask scorer."""
+
+    def test_matches_compute_weighted_score_exactly(self):
+        data, *_ = prepared(60)
+        scorer = TeamScorer(data, REQUIREMENTS)
+        rng = np.random.default_rng(1)
+        teams = [list(rng.choice(data.index, size=size, replace=False))
+                 for size in rng.integers(1, 9, size=300)]
+
+        scores = scorer.score_teams(teams)
+        assert list(scores) == [reference_score(team, data) for team in teams]
+
+    def test_many_terms_and_no_requirements(self):
+        data, *_ = prepared(20)
+        vocabulary = [f"skill{t}" for t in range(150)]
+        data['Skills'] = [list(np.random.default_rng(r).choice(vocabulary, size=30)) for r in range(len(data))]
+        requirements = {"required_skills": vocabulary[:100] + ["python", "python"], "preferred_interests": []}
+        teams = [list(data.index[k:k + 5]) for k in range(0, 20, 5)]
+
+        scores = TeamScorer(data, requirements).score_teams(teams)
+        assert list(scores) == [compute_weighted_score(t, requirements, data, None, None) for t in teams]
+
+    def test_popcount(self):
+        masks = pack_bitmasks([["a", "c"], [], ["b", "zz"]], ["a", "b", "c"])
+        assert popcount(masks).sum(axis=1).tolist() == [2, 0, 1]
+        assert popcount(np.array([2 ** 64 - 1], dtype=np.uint64)).tolist() == [64]
+
+
+class TestOptimizeTeams:
+    """Test the swap-based simulated annealing optimizer."""
+
+    def test_finds_brute_force_optimum(self):
+        data, *_ = prepared(8)
+        best = 0.0
+        for team in combinations(data.index, 4):
+            rest = [idx for idx in data.index if idx not in team]
+            best = max(best, reference_score(list(team), data) + reference_score(rest, data))
+
+        teams, score = optimize_teams(data, REQUIREMENTS, 2, time_budget=5.0, restarts=2, max_iterations=20000)
+        assert score == pytest.approx(best, abs=1e-9)
+        assert sum(reference_score(t, data) for t in teams) == pytest.approx(score, abs=1e-9)
+
+    def test_deterministic_for_seed(self):
+        data, *_ = prepared(20)
+        first = optimize_teams(data, REQUIREMENTS, 4, time_budget=30.0, restarts=2, max_iterations=5000, seed=7)
+        second = optimize_teams(data, REQUIREMENTS, 4, time_budget=30.0, restarts=2, max_iterations=5000, seed=7)
+        assert first == second
+
+    def test_default_config_is_deterministic(self):
+        data, *_ = prepared(60)
+        runs = [optimize_teams(data, REQUIREMENTS, 12) for _ in range(2)]
+        assert runs[0] == runs[1]
+
+    def test_interrupt_returns_best_so_far(self, monkeypatch):
+        data, *_ = prepared(20)
+        real_anneal = team_optimizer.anneal
+        calls = []
+
+        def interrupted_anneal(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return real_anneal(*args)
+
+        monkeypatch.setattr(team_optimizer, "anneal", interrupted_anneal)
+        teams, score = optimize_teams(data, REQUIREMENTS, 4, time_budget=5.0, restarts=3, max_iterations=2000)
+        assert sorted(idx for t in teams for idx in t) == list(data.index)
+        assert score > 0
+
+
+class TestConstrainedAssignment:
+    """Test size-constrained assignment with pairwise exchange."""
+
+    def test_resolve_num_teams(self):
+        assert resolve_num_teams(12, 3, 4) == 3
+        assert resolve_num_teams(14, 3, 4) == 3
+        assert resolve_num_teams(100, 3, 4) == 25
+        assert resolve_num_teams(5, 3, 0) == 3
+        assert resolve_num_teams(2, 3, 4) == 1
+
+    def test_score_aggregates_matches_team_scores(self):
+        data, *_ = prepared(30)
+        state = TeamState(data, REQUIREMENTS, balanced_teams(list(data.index), 7))
+        scores = score_aggregates(state, state.skill_counts, state.interest_counts, state.personality_counts,
+                                  state.exp_sum, state.exp_sq, state.sizes)
+        assert np.allclose(scores, state.scores, rtol=0, atol=1e-12)
+
+    def test_exchange_keeps_sizes_and_aggregates_consistent(self):
+        data, *_ = prepared(53)
+        state = TeamState(data, REQUIREMENTS, balanced_teams(list(data.index), 10))
+        sizes, before = state.sizes.copy(), state.scores.sum()
+
+        rounds = pairwise_exchange(state, np.random.default_rng(0), deadline=float("inf"))
+
+        assert rounds > 0
+        assert np.array_equal(state.sizes, sizes)
+        assert state.scores.sum() > before
+        for k, team in enumerate(state.teams()):
+            assert state.scores[k] == pytest.approx(reference_score(team, data), abs=1e-12)
+
+    def test_every_contestant_gets_a_scored_team(self):
+        data, *_ = prepared(103)
+        teams, score = constrained_assignment(data, REQUIREMENTS, resolve_num_teams(103, 3, 4), time_budget=0.5)
+
+        assert len(teams) == 26
+        assert sorted(idx for team in teams for idx in team) == list(data.index)
+        assert {len(team) for team in teams} <= {3, 4, 5}
+        assert sum(reference_score(team, data) for team in teams) == pytest.approx(score, abs=1e-9)
+
+
+class TestFeatures:
+    """Test the sparse feature matrix."""
+
+    def test_features_are_sparse_and_scaled(self):
+        data, features, mlb_skills, mlb_interests = prepared(20)
+        num_terms = len(mlb_skills.classes_) + len(mlb_interests.classes_)
+        dense = features.toarray()
+
+        assert features.format == 'csr' and features.shape[0] == len(data)
+        assert dense.min() >= 0 and dense.max() <= 1
+        assert np.allclose(dense[:, num_terms], (data['ExperienceLevel'] - 1) / 2)
+        assert (dense[:, num_terms + 1:].sum(axis=1) == 1).all()
+        assert (dense[:, num_terms + 1:].argmax(axis=1) == data['PersonalityTrait']).all()
+
+
+class TestAssignGroups:
+    """Test the assign_groups pipeline step."""
+
+    def test_everyone_assigned_in_balanced_teams(self):
+        data, features, mlb_skills, mlb_interests = prepared(14)
+        config = dict(REQUIREMENTS, search_time_budget=1.0)
+
+        result = assign_groups(data, features, config, mlb_skills, mlb_interests)
+
+        counts = result['Group'].value_counts()
+        assert result['Group'].isna().sum() == 0
+        assert len(counts) == 3 and counts.max() - counts.min() <= 1
+
+    def test_constrained_mode_respects_team_size(self):
+        data, features, mlb_skills, mlb_interests = prepared(30)
+        config = dict(REQUIREMENTS, num_teams=2, assignment_mode="constrained", search_time_budget=0.5)
+
+        result = assign_groups(data, features, config, mlb_skills, mlb_interests)
+
+        counts = result['Group'].value_counts()
+        assert len(counts) == 8 and counts.min() >= 3 and counts.max() <= 5
+
+    def test_minibatch_clustering(self):
+        data, features, mlb_skills, mlb_interests = prepared(14)
+        config = dict(REQUIREMENTS, clustering="minibatch", clustering_n_init=2, search_time_budget=0.5)
+
+        result = assign_groups(data, features, config, mlb_skills, mlb_interests)
+        assert result['Group'].nunique() == 3
+
+        with pytest.raises(ValueError, match="clustering"):
+            assign_groups(data, features, dict(config, clustering="dbscan"), mlb_skills, mlb_interests)
+
+
+class TestPreferencePartitions:
+    """Test partitioning by ProjectPreference."""
+
+    def test_partitions_group_compatible_preferences(self):
+        prefs = pd.Series(["Web", "web ", "Mobile", "Health", "Health", "Health", "Games", "", None])
+        partitions = partition_by_preference(prefs, {"Apps": ["web", "Mobile"]}, min_size=2)
+
+        assert partitions == {"Apps": [0, 1, 2], "Health": [3, 4, 5], "Mixed": [6, 7, 8]}
+
+    def test_small_and_excess_partitions_are_pooled(self):
+        prefs = pd.Series(["A"] * 5 + ["B"] * 4 + ["C"] * 3 + ["D"])
+        # A one-member Mixed pool joins the largest partition instead
+        assert partition_by_preference(prefs, min_size=2) == {
+            "A": [0, 1, 2, 3, 4, 12], "B": [5, 6, 7, 8], "C": [9, 10, 11]}
+        assert partition_by_preference(prefs, min_size=2, max_partitions=2) == {
+            "Mixed": list(range(5, 13)), "A": [0, 1, 2, 3, 4]}
+
+    def test_allocate_teams_is_proportional(self):
+        assert allocate_teams({"A": 50, "B": 30, "C": 20}, 10) == {"A": 5, "B": 3, "C": 2}
+        allocation = allocate_teams({"A": 90, "B": 8, "C": 2}, 10)
+        assert sum(allocation.values()) == 10 and min(allocation.values()) == 1
+        assert allocate_teams({"A": 3, "B": 3}, 1) == {"A": 1, "B": 1}
+
+    def test_teams_stay_within_partitions(self, monkeypatch):
+        monkeypatch.setattr(team_formations, "PARALLEL_MIN_CONTESTANTS", 0)
+        raw = generate_synthetic_dataset(40)
+        raw["ProjectPreference"] = ["Health"] * 16 + ["Fintech"] * 24
+        data, features, mlb_skills, mlb_interests = preprocess_data(raw)
+        config = dict(REQUIREMENTS, num_teams=10, partition_workers=2, search_time_budget=0.5)
+
+        result = assign_groups_by_preference(data, features, config, mlb_skills, mlb_interests)
+
+        assert sorted(result['Group'].unique()) == list(range(1, 11))
+        assert (result.groupby('Group')['ProjectPreference'].nunique() == 1).all()
+        assert result.loc[result['ProjectPreference'] == "Health", 'Group'].nunique() == 4
+
+
+class TestRosterUpdates:
+    """Test incremental joins and dropouts."""
+
+    def roster(self, num_contestants=24, num_teams=6):
+        raw = generate_synthetic_dataset(num_contestants + 4)
+        roster, newcomers = raw.iloc[:num_contestants].copy(), raw.iloc[num_contestants:].copy()
+        roster['Group'] = [k % num_teams + 1 for k in range(num_contestants)]
+        return roster, newcomers
+
+    def test_joins_fill_teams_without_moving_others(self):
+        roster, newcomers = self.roster()
+
+        updated, changes = update_assignment(roster, REQUIREMENTS, joins=newcomers.iloc[:2], max_swaps=0)
+
+        assert changes['moved'] == {}
+        assert set(changes['joined']) == set(newcomers['Name'].iloc[:2])
+        assert updated['Group'].value_counts().max() == 5
+
+    def test_dropouts_leave_teams_within_size_bounds(self):
+        roster, _ = self.roster()
+        leaving = list(roster.loc[roster['Group'] == 1, 'Name'].iloc[:3])
+
+        updated, changes = update_assignment(roster, REQUIREMENTS, leaves=leaving + ["Nobody"])
+
+        counts = updated['Group'].value_counts()
+        assert changes['left'] == sorted(leaving)
+        assert not updated['Name'].isin(leaving).any()
+        assert counts.min() >= 3 and counts.max() <= 5
+        assert len(changes['moved']) <= 2 * changes['swaps'] + 4
+
+    def test_full_teams_open_a_new_group(self):
+        roster, newcomers = self.roster(num_contestants=10, num_teams=2)
+
+        updated, changes = update_assignment(roster, REQUIREMENTS, joins=newcomers)
+
+        assert sorted(updated['Group'].unique()) == [1, 2, 3]
+        assert updated['Group'].value_counts().min() >= 3
+        data, *_ = preprocess_data(updated.drop(columns=['Group']))
+        teams = [list(g.index) for _, g in updated.groupby('Group')]
+        assert sum(reference_score(t, data) for t in teams) == pytest.approx(changes['score'], abs=1e-9)
+
+    def test_load_assignment(self, tmp_path):
+        roster, _ = self.roster()
+        roster.drop(columns=['Group']).to_csv(tmp_path / "contestants.csv", index=False)
+        roster[['Name', 'Group']].to_csv(tmp_path / "team_feedback.csv", index=False)
+
+        loaded = load_assignment(tmp_path / "contestants.csv", tmp_path / "team_feedback.csv")
+        assert loaded['Group'].tolist() == roster['Group'].tolist()
+
+
+class TestContestantLoader:
+    """Test columnar loading and vectorized list parsing."""
+
+    def test_parse_terms(self):
+        values = pd.Series([" python , ,ml,python", None, "ml", ["ux", " ai "], "ml"])
+        lists, matrix, vocabulary = parse_terms(values)
+
+        assert lists == [["python", "ml", "python"], [], ["ml"], ["ux", "ai"], ["ml"]]
+        assert vocabulary == ["ai", "ml", "python", "ux"]
+        assert matrix.toarray().tolist() == [[0, 1, 1, 0], [0, 0, 0, 0], [0, 1, 0, 0], [1, 0, 0, 1], [0, 1, 0, 0]]
+
+    def test_preprocess_matches_for_csv_and_frame(self, tmp_path):
+        raw = generate_synthetic_dataset(30)
+        raw.to_csv(tmp_path / "contestants.csv", index=False)
+        from_frame = preprocess_data(raw)
+        from_csv = preprocess_data(read_contestants(tmp_path / "contestants.csv"))
+
+        assert from_csv[0]['Skills'].tolist() == from_frame[0]['Skills'].tolist()
+        assert from_csv[0]['ExperienceLevel'].tolist() == from_frame[0]['ExperienceLevel'].tolist()
+        assert np.array_equal(from_csv[1].toarray(), from_frame[1].toarray())
+
+    def test_cache_is_keyed_by_content(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        path = tmp_path / "contestants.csv"
+        generate_synthetic_dataset(12).to_csv(path, index=False)
+
+        first = load_contestants(str(path), str(tmp_path / "cache"))
+        cached = load_contestants(str(path), str(tmp_path / "cache"))
+        assert [list(v) for v in cached['Skills']] == first['Skills'].tolist()
+
+        generate_synthetic_dataset(13).to_csv(path, index=False)
+        assert len(load_contestants(str(path), str(tmp_path / "cache"))) == 13
+        assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def reference_label(z):
+    """Row-by-row version of the labelling rules in decide_personal_trait."""
+    ez, az, cz, sz, oz = z
+    if ez > 0.6 and cz > 0.3:
+        return "Leader"
+    if oz > 0.6:
+        return "Creative"
+    if cz > 0.6 and ez < 0.2:
+        return "Analytical"
+    if az > 0.5:
+        return "Collaborative"
+    anchors = {"Leader": ez + 0.3 * cz, "Creative": oz, "Analytical": cz - 0.2 * ez, "Collaborative": az}
+    return max(anchors, key=anchors.get)
+
+
+class TestPersonalityLabels:
+    """Test vectorized TIPI scoring and labelling."""
+
+    def test_score_tipi_reverse_scores_and_averages(self):
+        df = pd.DataFrame([[7, 1, 5, 3, 2, 1, 6, 4, 5, 7]], columns=TIPI_COLUMNS)
+        big5 = score_tipi(df)
+        assert big5.iloc[0].tolist() == [7.0, 6.5, 4.5, 5.0, 1.5]
+
+        with pytest.raises(ValueError, match="TIPI10"):
+            score_tipi(df.drop(columns=["TIPI10"]))
+
+    def test_labels_match_row_rules(self):
+        rng = np.random.default_rng(3)
+        df = pd.DataFrame(rng.integers(1, 8, size=(2000, 10)), columns=TIPI_COLUMNS, index=rng.permutation(2000))
+        big5 = score_tipi(df)
+        z = (big5 - big5.mean()) / (big5.std(ddof=0) + 1e-6)
+        labels = assign_personality_label(big5)
+
+        assert labels.index.equals(df.index)
+        assert labels.tolist() == [reference_label(row) for row in z.to_numpy()]
+        assert set(labels) == set(PERSONALITY_LABELS)
+
+    def test_missing_item_matches_row_rules(self):
+        rng = np.random.default_rng(5)
+        df = pd.DataFrame(rng.integers(1, 8, size=(50, 10)), columns=TIPI_COLUMNS).astype(float)
+        df.iloc[::7, :] = df.iloc[::7, :].mask(rng.random((8, 10)) < 0.2)
+        df.loc[0, "TIPI1"] = np.nan  # Leader anchor missing
+        df.loc[1, "TIPI3"] = np.nan
+        big5 = score_tipi(df)
+        values = big5.to_numpy()
+        z = (values - np.nanmean(values, axis=0)) / (np.nanstd(values, axis=0) + 1e-6)
+        labels = assign_personality_label(big5)
+
+        assert np.isnan(z).any(axis=1).sum() >= 2
+        assert labels.tolist() == [reference_label(row) for row in z]
+
+    def test_import_has_no_side_effects(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        importlib.reload(decide_personal_trait)
+        assert list(tmp_path.iterdir()) == []
+
+        df = pd.DataFrame(np.random.default_rng(0).integers(1, 8, size=(6, 10)), columns=TIPI_COLUMNS)
+        df.to_csv("contestants.csv", index=False)
+        decide_personal_trait.main()
+        assert pd.read_csv("contestants.csv")["PersonalityTrait"].isin(PERSONALITY_LABELS).all()
+
+
+class TestProjectMatching:
+    """Test team x project scoring and optimal matching."""
+
+    PROJECTS = {"projects": [
+        {"name": "Vision", "required_skills": ["ml", "python", "python", "cobol"], "preferred_interests": ["ai"]},
+        {"name": "Portal", "required_skills": ["frontend", "design", "ux"], "preferred_interests": ["web"]},
+        {"name": "Infra", "required_skills": ["devops"], "max_teams": 2},
+    ]}
+
+    def test_score_matrix_matches_reference(self):
+        data = prepared(30)[0]
+        projects = load_projects(self.PROJECTS)
+        teams = [list(data.index[k::5]) for k in range(5)] + [[data.index[0]]]
+
+        scores = project_score_matrix(data, teams, projects)
+
+        expected = [[compute_weighted_score(team, project, data, None, None) for project in projects]
+                    for team in teams]
+        assert np.allclose(scores, expected, atol=1e-12)
+
+    def test_matching_is_optimal_and_respects_capacity(self):
+        rng = np.random.default_rng(5)
+        scores = rng.random((4, 3))
+
+        project_of = match_projects(scores, [1, 2, 1])
+
+        best = max(sum(scores[team, project] for team, project in enumerate(choice))
+                   for choice in product(range(3), repeat=4)
+                   if all(choice.count(p) <= cap for p, cap in enumerate([1, 2, 1])))
+        assert scores[np.arange(4), project_of].sum() == pytest.approx(best)
+        assert match_projects(scores[:, :1]).tolist().count(-1) == 3
+
+    def test_assign_projects_labels_each_team(self):
+        data = prepared(12)[0]
+        data['Group'] = np.arange(len(data)) % 4 + 1
+        projects = load_projects(self.PROJECTS)
+
+        result = assign_projects(data, projects)
+
+        per_group = result.groupby('Group')['Project'].nunique(dropna=False)
+        assert (per_group == 1).all()
+        assert result['Project'].value_counts().to_dict() == {"Infra": 6, "Vision": 3, "Portal": 3}
+
+    def test_invalid_projects(self):
+        assert load_projects({"required_skills": ["python"]}) is None
+        with pytest.raises(ValueError, match="Duplicate"):
+            load_projects({"projects": [{"name": "A"}, {"name": "A"}]})